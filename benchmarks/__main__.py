@@ -0,0 +1,104 @@
+""" 認証処理のベンチマーク
+
+使い方
+    python -m benchmarks --db sqlite --iterations 200
+    python -m benchmarks --save-baseline benchmarks/baselines/master.json
+    python -m benchmarks --compare benchmarks/baselines/master.json --threshold 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the authentication views.')
+    parser.add_argument('--db', choices=['sqlite', 'postgresql'], default='sqlite', help='計測に使うDB')
+    parser.add_argument('--iterations', type=int, default=200, help='シナリオごとの計測回数')
+    parser.add_argument('--warmup', type=int, default=10, help='計測前に実行する回数')
+    parser.add_argument('--scenarios', nargs='+', default=None, help='計測するシナリオ 省略時はすべて')
+    parser.add_argument('--fast-hasher', action='store_true', help='ハッシュ計算を除いたオーバーヘッドを計測')
+    parser.add_argument('--save-baseline', default=None, help='問い合わせ数と応答時間の比をベースラインとして保存するパス')
+    parser.add_argument('--compare', default=None, help='比較するベースラインのパス')
+    parser.add_argument('--threshold', type=float, default=10.0, help='悪化と判定する割合(%%)')
+    args = parser.parse_args(argv)
+
+    # 設定はdjango.setup()の前に確定させる
+    os.environ['BENCH_DB'] = args.db
+    os.environ['BENCH_FAST_HASHER'] = '1' if args.fast_hasher else '0'
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from .runner import REFERENCE_SCENARIO, compare, format_table, run_scenario, to_baseline
+    from .scenarios import SCENARIOS
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(unknown)}')
+
+    setup_test_environment()
+    # 計測のたびに空のDBから始める
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        results = {name: run_scenario(SCENARIOS[name](), args.iterations, args.warmup) for name in names}
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    current = {
+        'meta': {
+            'db': args.db,
+            'fast_hasher': args.fast_hasher,
+            'hasher': settings.PASSWORD_HASHERS[0],
+            'iterations': args.iterations,
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'reference_scenario': REFERENCE_SCENARIO,
+        },
+        'scenarios': to_baseline(results),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+        # 条件の異なる計測結果は比較できない
+        if any(baseline['meta'].get(key) != current['meta'][key] for key in ('db', 'fast_hasher', 'hasher')):
+            print('warning: baseline was recorded with different --db/--fast-hasher options or PASSWORD_HASHERS', file=sys.stderr)
+
+    print(format_table(results, baseline))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(current, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+
+    failures = sum(result['failures'] for result in results.values())
+    if failures:
+        print(f'{failures} requests returned an unexpected status code', file=sys.stderr)
+        return 1
+
+    if baseline is not None:
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print('regressions:', *regressions, sep='\n  ', file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+""" ユーザ一覧のページ送りの比較
+OFFSETによるページ送りと、(username, id)によるkeyset paginationを、先頭ページと後方のページで計測する
+
+使い方
+    python -m benchmarks.directory --db postgresql --users 1000000 --pages 1 100 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+from .login_lookup import DUMMY_PASSWORD
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.directory', description='Compare OFFSET and keyset pagination.')
+    parser.add_argument('--db', choices=['sqlite', 'postgresql'], default='sqlite', help='計測に使うDB')
+    parser.add_argument('--users', type=int, default=100000, help='m_userへ登録するユーザ数')
+    parser.add_argument('--page-size', type=int, default=50, help='1ページの件数')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 1000], help='計測するページ番号')
+    parser.add_argument('--repeat', type=int, default=50, help='ページごとの計測回数')
+    parser.add_argument('--batch-size', type=int, default=10000, help='ユーザ登録時のbulk_createの件数')
+    args = parser.parse_args(argv)
+
+    os.environ['BENCH_DB'] = args.db
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from custom_auth.directory import DIRECTORY_FIELDS, encode_cursor, list_users
+    from custom_auth.models import User
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        for offset in range(0, args.users, args.batch_size):
+            User.objects.bulk_create([
+                User(username=f'user{i:09}', password=DUMMY_PASSWORD, is_admin=False)
+                for i in range(offset, min(offset + args.batch_size, args.users))
+            ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM ANALYZE m_user' if connection.vendor == 'postgresql' else 'ANALYZE')
+
+        print(f'{"page":>8}{"offset us":>14}{"keyset us":>14}')
+
+        for page in args.pages:
+            skipped = (page - 1) * args.page_size
+            if skipped >= args.users:
+                continue
+
+            def offset_page() -> object:
+                return list(User.objects.order_by('username', 'id').values_list(*DIRECTORY_FIELDS)[skipped:skipped + args.page_size + 1])
+
+            # 前ページ末尾のユーザをカーソルとする 先頭ページはカーソルなし
+            cursor = encode_cursor(f'user{skipped - 1:09}', skipped) if skipped else None
+
+            def keyset_page() -> object:
+                return list_users(cursor=cursor, page_size=args.page_size)
+
+            print(f'{page:>8}{measure(offset_page, args.repeat):>14.1f}{measure(keyset_page, args.repeat):>14.1f}')
+
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return 0
+
+
+def measure(fetch: Callable[[], object], repeat: int) -> float:
+    """ 1回あたりの所要時間(マイクロ秒) 初回は計測前の準備として除く """
+
+    fetch()
+
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        fetch()
+
+    return (time.perf_counter() - started_at) / repeat * 1_000_000
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+""" ログイン時のユーザ取得の比較
+全列を取得する問い合わせと、AUTHENTICATION_FIELDSのみを取得する問い合わせを、大量のユーザを登録したm_userで計測する
+
+使い方
+    python -m benchmarks.login_lookup --db postgresql --users 1000000 --lookups 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List, Optional
+
+# ハッシュ値の代わりに登録する、実際のハッシュ値と同程度の長さの文字列
+DUMMY_PASSWORD = 'pbkdf2_sha256$260000$' + 'x' * 22 + '$' + 'y' * 44
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.login_lookup', description='Compare full-row and narrow login lookups.')
+    parser.add_argument('--db', choices=['sqlite', 'postgresql'], default='sqlite', help='計測に使うDB')
+    parser.add_argument('--users', type=int, default=100000, help='m_userへ登録するユーザ数')
+    parser.add_argument('--lookups', type=int, default=2000, help='計測する問い合わせ回数')
+    parser.add_argument('--batch-size', type=int, default=10000, help='ユーザ登録時のbulk_createの件数')
+    args = parser.parse_args(argv)
+
+    os.environ['BENCH_DB'] = args.db
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from custom_auth.backend import AUTHENTICATION_FIELDS
+    from custom_auth.models import User
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        # 計測対象のユーザを登録
+        started_at = time.perf_counter()
+        for offset in range(0, args.users, args.batch_size):
+            User.objects.bulk_create([
+                User(username=f'user{i:09}', password=DUMMY_PASSWORD, is_admin=False)
+                for i in range(offset, min(offset + args.batch_size, args.users))
+            ])
+        print(f'inserted {args.users} users in {time.perf_counter() - started_at:.1f}s')
+
+        # Index Only Scanには統計情報・可視性マップの更新が必要
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM ANALYZE m_user' if connection.vendor == 'postgresql' else 'ANALYZE')
+
+        usernames = [f'user{random.randrange(args.users):09}' for _ in range(args.lookups)]
+
+        def full_row(username: str) -> User:
+            return User.objects.filter_username(username).get()
+
+        def narrow(username: str) -> User:
+            return User.objects.filter_username(username).only(*AUTHENTICATION_FIELDS).get()
+
+        for name, lookup in (('full row', full_row), ('narrow', narrow)):
+            print(f'{name}: {measure(lookup, usernames):.1f} us/lookup')
+            print(explain(lookup, usernames[0]))
+
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return 0
+
+
+def measure(lookup: Callable[[str], object], usernames: List[str]) -> float:
+    """ 1回あたりの所要時間(マイクロ秒) 先頭の1割は計測前の準備として除く """
+
+    warmup = len(usernames) // 10
+    for username in usernames[:warmup]:
+        lookup(username)
+
+    started_at = time.perf_counter()
+    for username in usernames[warmup:]:
+        lookup(username)
+
+    return (time.perf_counter() - started_at) / max(1, len(usernames) - warmup) * 1_000_000
+
+
+def explain(lookup: Callable[[str], object], username: str) -> str:
+    """ 問い合わせの実行計画 """
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as context:
+        lookup(username)
+
+    with connection.cursor() as cursor:
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) ' if connection.vendor == 'postgresql' else 'EXPLAIN QUERY PLAN '
+        cursor.execute(prefix + context.captured_queries[-1]['sql'])
+        return '\n'.join('    ' + ' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+
+if __name__ == '__main__':
+    sys.exit(main())
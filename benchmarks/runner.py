@@ -0,0 +1,191 @@
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from custom_auth.query_budget import capture_queries
+
+from .scenarios import Scenario
+
+# ベースラインへ保存し、比較する指標 いずれも値が小さいほど良い
+# 応答時間の絶対値は計測した環境に依存するため保存せず、同じ計測での基準のシナリオに対する比として保存する
+BASELINE_METRICS: List[str] = ['mean_queries', 'max_queries', 'p50_ratio', 'p95_ratio']
+
+# 応答時間の比の基準とするシナリオ
+REFERENCE_SCENARIO = 'top'
+
+
+def percentile(values: List[float], rate: float) -> float:
+    """ 最近傍順位法によるパーセンタイル
+
+    Parameters
+    ----------
+    values: List[float]
+        計測値
+    rate: float
+        0~100の順位
+
+    Returns
+    -------
+    value: float
+        パーセンタイル値
+    """
+
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    index = max(0, math.ceil(rate / 100 * len(ordered)) - 1)
+
+    return ordered[index]
+
+
+def run_scenario(scenario: Scenario, iterations: int, warmup: int) -> Dict[str, Any]:
+    """ シナリオを繰り返し実行し、応答時間・問い合わせ数を集計
+
+    Parameters
+    ----------
+    scenario: Scenario
+        計測対象の操作
+    iterations: int
+        計測する回数
+    warmup: int
+        計測前に実行する回数 テンプレート・URL解決などの初回のみの処理を除外する
+
+    Returns
+    -------
+    result: Dict[str, Any]
+        iterations, failures, requests_per_second, p50_ms, p95_ms, p99_ms, mean_queries, max_queries
+    """
+
+    scenario.setup()
+
+    # 計測用と重複しない番号で実行
+    for i in range(iterations, iterations + warmup):
+        scenario.before_each(i)
+        scenario.run(i)
+
+    latencies: List[float] = []
+    query_counts: List[int] = []
+    failures = 0
+
+    for i in range(iterations):
+        scenario.before_each(i)
+
+        # QUERY_BUDGETと同様に、トランザクション制御を除いて数える
+        with capture_queries() as query_log:
+            started_at = time.perf_counter()
+            response = scenario.run(i)
+            latencies.append(time.perf_counter() - started_at)
+
+        query_counts.append(len(query_log))
+        if not scenario.check(response):
+            failures += 1
+
+    total = sum(latencies)
+
+    return {
+        'iterations': iterations,
+        'failures': failures,
+        'requests_per_second': iterations / total if total else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_queries': sum(query_counts) / len(query_counts) if query_counts else 0.0,
+        'max_queries': max(query_counts, default=0),
+    }
+
+
+def to_baseline(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """ 計測結果から、環境によらず比較できる指標を取り出す
+
+    Parameters
+    ----------
+    results: Dict[str, Dict[str, Any]]
+        シナリオごとの計測結果
+
+    Returns
+    -------
+    baseline: Dict[str, Dict[str, float]]
+        シナリオごとのBASELINE_METRICS 基準のシナリオを計測していない場合、応答時間の比は含まない
+    """
+
+    reference = results.get(REFERENCE_SCENARIO)
+    baseline: Dict[str, Dict[str, float]] = {}
+
+    for name, result in results.items():
+        metrics = {'mean_queries': result['mean_queries'], 'max_queries': result['max_queries']}
+
+        if reference is not None and reference['p50_ms'] and reference['p95_ms']:
+            metrics['p50_ratio'] = result['p50_ms'] / reference['p50_ms']
+            metrics['p95_ratio'] = result['p95_ms'] / reference['p95_ms']
+
+        baseline[name] = metrics
+
+    return baseline
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """ ベースラインと比較し、許容範囲を超えて悪化した指標を列挙
+
+    Parameters
+    ----------
+    baseline: Dict[str, Any]
+        保存済みのベースライン
+    current: Dict[str, Any]
+        今回の計測結果から作成したベースライン
+    threshold: float
+        応答時間の比について許容する悪化の割合(%) 問い合わせ数は1件でも増えれば悪化とする
+
+    Returns
+    -------
+    regressions: List[str]
+        悪化した指標の説明
+    """
+
+    regressions: List[str] = []
+
+    for name, metrics in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+
+        if base is None:
+            continue
+
+        for metric in BASELINE_METRICS:
+            if metric not in base or metric not in metrics:
+                continue
+
+            before, after = base[metric], metrics[metric]
+
+            if metric.endswith('_queries'):
+                worse = after > before
+            else:
+                worse = after > before * (1 + threshold / 100)
+
+            if worse:
+                regressions.append(f'{name}.{metric}: {before:.2f} -> {after:.2f}')
+
+    return regressions
+
+
+def format_table(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]]=None) -> str:
+    """ 計測結果を表形式の文字列へ ベースラインがある場合は、比較する指標の変化を併記 """
+
+    header = f'{"scenario":<16}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}{"failures":>10}'
+    lines = [header, '-' * len(header)]
+    current = to_baseline(results)
+
+    for name, result in results.items():
+        lines.append(
+            f'{name:<16}{result["requests_per_second"]:>10.1f}{result["p50_ms"]:>10.2f}'
+            f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}{result["mean_queries"]:>9.1f}{result["failures"]:>10}'
+        )
+
+        base = (baseline or {}).get('scenarios', {}).get(name)
+        if base is not None:
+            changes = [
+                f'{metric}={base[metric]:.2f}->{current[name][metric]:.2f}'
+                for metric in BASELINE_METRICS if metric in base and metric in current[name]
+            ]
+            lines.append(f'{"":<16}vs baseline: ' + ' '.join(changes))
+
+    return '\n'.join(lines)
@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Type
+
+from django.contrib.auth.hashers import make_password
+from django.http import HttpResponse
+from django.test import Client
+from django.urls import reverse
+
+from custom_auth.models import User
+
+# 計測用ユーザ
+BENCH_USERNAME = 'bench-user01'
+BENCH_PASSWORD = 'bench-password01'
+
+
+class Scenario(ABC):
+    """ 計測対象の操作 runで計測対象の操作を実装する
+    setupは全体で1回、before_eachは各回の計測前に実行され、いずれも計測に含まれない
+    """
+
+    # 一覧・結果に表示する名前
+    name = ''
+    # 期待するステータスコード
+    expected_status = 200
+
+    def __init__(self) -> None:
+        self.client = Client()
+
+    def setup(self) -> None:
+        """ 計測全体の準備 """
+
+    def before_each(self, i: int) -> None:
+        """ 各回の計測前の準備 """
+
+    @abstractmethod
+    def run(self, i: int) -> HttpResponse:
+        """ 計測対象の操作 """
+
+    def check(self, response: HttpResponse) -> bool:
+        """ 期待した応答が得られたか """
+
+        return response.status_code == self.expected_status
+
+    def get_bench_user(self) -> User:
+        """ 計測用ユーザを取得 存在しない場合は作成 """
+
+        user, _ = User.objects.get_or_create(
+            username=BENCH_USERNAME,
+            defaults={'password': make_password(BENCH_PASSWORD), 'is_admin': False},
+        )
+        return user
+
+
+class LoginSuccessScenario(Scenario):
+    """ ログイン成功 """
+
+    name = 'login_success'
+    expected_status = 302
+
+    def setup(self) -> None:
+        self.get_bench_user()
+
+    def before_each(self, i: int) -> None:
+        self.client = Client()
+
+    def run(self, i: int) -> HttpResponse:
+        return self.client.post(reverse('login:login'), {'username': BENCH_USERNAME, 'password': BENCH_PASSWORD})
+
+
+class LoginFailureScenario(Scenario):
+    """ パスワード誤りによるログイン失敗 """
+
+    name = 'login_failure'
+
+    def setup(self) -> None:
+        self.get_bench_user()
+
+    def run(self, i: int) -> HttpResponse:
+        return self.client.post(reverse('login:login'), {'username': BENCH_USERNAME, 'password': 'incorrect-password'})
+
+
+class SignUpScenario(Scenario):
+    """ ユーザ登録 """
+
+    name = 'signup'
+    expected_status = 302
+
+    def run(self, i: int) -> HttpResponse:
+        return self.client.post(reverse('login:signup'), {'username': f'bench-signup{i:08}', 'password': BENCH_PASSWORD})
+
+
+class TopScenario(Scenario):
+    """ ログイン済みユーザによるトップ画面表示 """
+
+    name = 'top'
+
+    def setup(self) -> None:
+        self.client.force_login(self.get_bench_user(), 'custom_auth.backend.AuthBackend')
+
+    def run(self, i: int) -> HttpResponse:
+        return self.client.get(reverse('login:top'))
+
+
+class LogoutScenario(Scenario):
+    """ ログアウト """
+
+    name = 'logout'
+    expected_status = 302
+
+    def setup(self) -> None:
+        self.user = self.get_bench_user()
+
+    def before_each(self, i: int) -> None:
+        self.client.force_login(self.user, 'custom_auth.backend.AuthBackend')
+
+    def run(self, i: int) -> HttpResponse:
+        return self.client.get(reverse('login:logout'))
+
+
+# 計測対象の一覧
+SCENARIOS: Dict[str, Type[Scenario]] = {
+    scenario.name: scenario
+    for scenario in [
+        LoginSuccessScenario,
+        LoginFailureScenario,
+        SignUpScenario,
+        TopScenario,
+        LogoutScenario,
+    ]
+}
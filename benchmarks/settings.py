@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+from config.settings import *
+
+# ベンチマーク用の設定
+# BENCH_DB: sqlite -> 一時ファイルのSQLite postgresql -> config.settingsのPostgreSQL(テスト用DBを作成)
+if os.environ.get('BENCH_DB', 'sqlite') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(tempfile.gettempdir(), 'django_login_bench.sqlite3'),
+            'TEST': {
+                'NAME': os.path.join(tempfile.gettempdir(), 'django_login_bench.sqlite3'),
+            },
+        }
+    }
+
+# マイグレーションを経由せず、モデルから直接テーブルを作成
+MIGRATION_MODULES = {
+    'custom_auth': None,
+    'admin': None,
+    'auth': None,
+    'contenttypes': None,
+    'sessions': None,
+}
+
+# 同一クライアントから繰り返しログインするため、試行回数の制限は無効化
+LOGIN_THROTTLE = {'ENABLED': False}
+
+# SQLの出力は計測結果へ影響するため抑止
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+}
+
+# パスワードのハッシュ計算を除いたオーバーヘッドを計測する場合は、BENCH_FAST_HASHER=1
+if os.environ.get('BENCH_FAST_HASHER') == '1':
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# 開発用の問い合わせ数の検証は本番環境では無効なため、計測からも除く
+QUERY_BUDGET = {**QUERY_BUDGET, 'MODE': 'off'}
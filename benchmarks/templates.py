@@ -0,0 +1,119 @@
+""" ログイン・ユーザ登録画面の描画時間の比較
+テンプレートを毎回解析する構成、キャッシュローダ、Jinja2(インストールされている場合)で計測する
+
+使い方
+    python -m benchmarks.templates --iterations 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.templates', description='Compare template render times.')
+    parser.add_argument('--iterations', type=int, default=1000, help='画面ごとの描画回数')
+    args = parser.parse_args(argv)
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    from custom_auth.forms import LoginForm, SignUpForm
+
+    from .runner import percentile
+
+    engines = build_engines(os.path.join(settings.BASE_DIR, 'templates'), os.path.join(settings.BASE_DIR, 'templates_jinja2'))
+
+    # 入力誤りのメッセージを含む画面も描画する
+    login_form = LoginForm({'username': 'a-pompom', 'password': 'password'})
+    login_form.is_valid()
+    login_form.add_error(None, 'ユーザ名またはパスワードが間違っています。')
+    signup_form = SignUpForm({'username': 'a#', 'password': 'short'})
+    signup_form.is_valid()
+
+    pages = [
+        ('login', 'login/login.html', {'form': LoginForm()}),
+        ('login (error)', 'login/login.html', {'form': login_form}),
+        ('signup (error)', 'signup/signup.html', {'form': signup_form}),
+    ]
+    request = RequestFactory().get('/login/')
+
+    print(f'{"engine":<24}{"page":<18}{"mean us":>10}{"p50 us":>10}{"p95 us":>10}')
+
+    for engine_name, engine in engines.items():
+        for page_name, template_name, context in pages:
+            latencies = []
+
+            for _ in range(args.iterations):
+                started_at = time.perf_counter()
+                engine.get_template(template_name).render(context, request)
+                latencies.append(time.perf_counter() - started_at)
+
+            print(
+                f'{engine_name:<24}{page_name:<18}{sum(latencies) / len(latencies) * 1e6:>10.1f}'
+                f'{percentile(latencies, 50) * 1e6:>10.1f}{percentile(latencies, 95) * 1e6:>10.1f}'
+            )
+
+    return 0
+
+
+def build_engines(template_dir: str, jinja2_dir: str) -> Dict[str, Any]:
+    """ 比較するテンプレートエンジン """
+
+    from django.template.backends.django import DjangoTemplates
+
+    context_processors = [
+        'django.template.context_processors.request',
+        'django.contrib.auth.context_processors.auth',
+        'django.contrib.messages.context_processors.messages',
+    ]
+
+    engines: Dict[str, Any] = {
+        'django (no cache)': DjangoTemplates({
+            'NAME': 'django_no_cache',
+            'DIRS': [template_dir],
+            'APP_DIRS': False,
+            'OPTIONS': {
+                'context_processors': context_processors,
+                'loaders': ['django.template.loaders.filesystem.Loader'],
+            },
+        }),
+        'django (cached loader)': DjangoTemplates({
+            'NAME': 'django_cached',
+            'DIRS': [template_dir],
+            'APP_DIRS': False,
+            'OPTIONS': {
+                'context_processors': context_processors,
+                'loaders': [('django.template.loaders.cached.Loader', ['django.template.loaders.filesystem.Loader'])],
+            },
+        }),
+    }
+
+    try:
+        from django.template.backends.jinja2 import Jinja2
+
+        engines['jinja2'] = Jinja2({
+            'NAME': 'jinja2',
+            'DIRS': [jinja2_dir],
+            'APP_DIRS': False,
+            'OPTIONS': {
+                'environment': 'config.jinja2.environment',
+                'auto_reload': False,
+            },
+        })
+
+    except ImportError:
+        print('jinja2 is not installed; skipping the Jinja2 engine', file=sys.stderr)
+
+    return engines
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+ASGI config for config project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/stable/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+application = get_asgi_application()
+
+# 起動時に構築しておくことで、最初のリクエストで構築処理を待たせない
+from custom_auth.template_warmup import warm_templates  # noqa: E402
+from custom_auth.username_filter import warm_username_filter  # noqa: E402
+warm_username_filter()
+warm_templates()
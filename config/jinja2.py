@@ -0,0 +1,17 @@
+from typing import Any
+
+from django.templatetags.static import static
+from django.urls import reverse
+from jinja2 import Environment
+
+
+def environment(**options: Any) -> Environment:
+    """ Jinja2のテンプレートから、Djangoのテンプレートと同様に静的ファイル・URLを参照できるようにする """
+
+    env = Environment(**options)
+    env.globals.update({
+        'static': static,
+        'url': reverse,
+    })
+
+    return env
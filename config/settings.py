@@ -42,11 +42,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'custom_auth.middleware.MetricsMiddleware',
+    'custom_auth.query_budget.QueryBudgetMiddleware',
+    'custom_auth.middleware.PrimaryPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'custom_auth.middleware.ClaimsAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +74,11 @@ TEMPLATES = [
 
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# ログイン・ユーザ登録などのViewを非同期版へ切り替える
+# ASGI(config.asgi)で稼働させる場合に有効にする
+ASYNC_VIEWS = False
 
 
 # Database
@@ -87,6 +95,23 @@ DATABASES = {
     }
 }
 
+# 読み取り専用のレプリカ DATABASE_REPLICA_HOSTSへカンマ区切りで指定したホストをreplica1, replica2, ...として登録
+# テストではレプリカ用のDBを作成せず、defaultを参照する
+for index, host in enumerate([host for host in os.environ.get('DATABASE_REPLICA_HOSTS', '').split(',') if host], start=1):
+    DATABASES[f'replica{index}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_ROUTERS = ['custom_auth.routers.PrimaryReplicaRouter']
+
+# 読み取りのレプリカへの振り分け
+# REPLICAS: 読み取りを振り分けるDBのエイリアス 空の場合はすべてdefaultで処理する
+# PIN_SECONDS: 書き込んだクライアントの読み取りをプライマリへ固定する時間(秒) レプリカの遅延より長くする
+# COOKIE_NAME: 固定期間の終了時刻を記録するクッキー
+DB_ROUTING = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_SECONDS': 5,
+    'COOKIE_NAME': 'db_primary_pin',
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -106,6 +131,18 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# パスワードのハッシャ 先頭のものでハッシュ値を生成する
+# 計算コストはtune_hashersコマンドの計測結果(PASSWORD_HASHER_PARAMS_FILE)から決定され、
+# 変更後はログイン成功時に新たな計算コストでハッシュ値が更新される
+PASSWORD_HASHERS = [
+    'custom_auth.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'custom_auth.hashers.TunedArgon2PasswordHasher',
+    'custom_auth.hashers.TunedBCryptSHA256PasswordHasher',
+    'custom_auth.hashers.TunedScryptPasswordHasher',
+]
+PASSWORD_HASHER_PARAMS_FILE = os.path.join(BASE_DIR, 'hasher_params.json')
+
 # 認証用ユーザ
 # セッションからも参照される
 AUTH_USER_MODEL = 'custom_auth.User'
@@ -115,26 +152,185 @@ AUTHENTICATION_BACKENDS = ['custom_auth.backend.AuthBackend']
 # ログイン後の遷移先
 LOGIN_SUCCESS_URL = 'login:top'
 
-# SQLをプロット
+# セッション 参照はSESSION_CACHE_ALIASのキャッシュから行い、保存はレスポンス時の1回の書き込みとする
+# 複数プロセスで動かす場合、キャッシュはプロセス間で共有する(config.settings_productionではRedis)
+SESSION_ENGINE = 'custom_auth.sessions'
+
+# get_userで参照するユーザキャッシュ
+# プロセス内のLRUはTIMEOUT秒で失効 ユーザの更新・削除時はシグナルで破棄される
+# CACHE_ALIASへCACHESのエイリアスを指定すると、プロセス間で共有するキャッシュとして併用
+USER_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 1024,
+    'TIMEOUT': 60,
+    'CACHE_ALIAS': None,
+}
+
+# セッションへ署名付きで埋め込むユーザ情報(クレーム)
+# 有効にすると、トップ画面などクレームの項目のみを参照する画面はm_userを参照せず描画される
+# VERSIONを変更すると発行済みのクレームは無効となり、MAX_AGE秒ごとにDBの値で発行し直される
+# ユーザの更新・削除時はCACHE_ALIASのキャッシュへ失効時刻を記録し、発行済みのクレームを即座に無効とする
+# 複数プロセスで動かす場合、CACHE_ALIASにはプロセス間で共有するキャッシュを指定すること(有効時、プロセス内のキャッシュは起動時に警告)
+SESSION_USER_CLAIMS = {
+    'ENABLED': False,
+    'VERSION': 1,
+    'MAX_AGE': 300,
+    'CACHE_ALIAS': 'default',
+}
+
+# プロセスの起動時にすべてのテンプレートを解析する 本番環境の設定(config.settings_production)で有効化
+TEMPLATE_WARMUP = False
+
+# 描画済みのトップ画面をテンプレート・権限ごとに保持するキャッシュ
+# VERSIONはデプロイごとに変更し、以前のテンプレートで描画したページを参照させない
+# 開発中はテンプレートの変更を即時に反映するため無効
+PAGE_CACHE = {
+    'ENABLED': not DEBUG,
+    'VERSION': os.environ.get('DEPLOY_VERSION', '1'),
+    'TIMEOUT': 3600,
+}
+
+# ユーザ登録時に、ユーザ名が登録済みかを登録前にDBへ問い合わせるか
+# 無効(既定)の場合は登録時の一意制約違反で検出し、DBへの問い合わせを登録の1回のみとする
+# 有効にすると問い合わせは増えるが、登録済みのユーザ名ではパスワードのハッシュ計算を省ける
+SIGNUP_USERNAME_PRECHECK = False
+
+# 管理者向けのユーザ一覧のCSV出力
+# CHUNK_SIZE: DBから1度に取得する行数 PostgreSQLではサーバサイドカーソルでこの行数ずつ読み込む
+# GZIP: クライアントがgzipを受け付ける場合に圧縮して送信するか
+USER_EXPORT = {
+    'CHUNK_SIZE': 2000,
+    'GZIP': True,
+}
+
+# 管理者用トップ画面のユーザ一覧
+# PAGE_SIZE: 1ページの件数
+# SEARCH: prefix -> ユーザ名の前方一致 ユニークインデックスを利用
+#         trigram -> ユーザ名の部分一致 PostgreSQLではpg_trgmのGINインデックスm_user_username_trgm_idxを利用
+# 索引はいずれもマイグレーション0004で設定値によらず作成される PostgreSQLではpg_trgm拡張も作成するため、
+# migrateを実行するロールに権限がない場合は、DBの管理者が事前に CREATE EXTENSION pg_trgm を実行しておく
+USER_DIRECTORY = {
+    'PAGE_SIZE': 50,
+    'SEARCH': 'prefix',
+}
+
+# ログイン時にユーザ名の大文字小文字を区別しない ユーザ名をlower(username)の関数インデックスで検索する
+# ユーザ登録の一意性はこの設定値によらず、大文字小文字のみが異なるユーザ名は常に登録できない(m_user_username_lower_uniq)
+USERNAME_CASE_INSENSITIVE = False
+
+# ユーザ登録時のユニークチェックで先に参照する、登録済みユーザ名のBloomフィルタ
+# 確実に登録されていないユーザ名はDBへの問い合わせを省略する
+# 他のプロセスで登録されたユーザ名を取り込むため、REBUILD_INTERVAL秒ごとにバックグラウンドのスレッドでm_userから作り直す
+USERNAME_FILTER = {
+    'ENABLED': False,
+    'ERROR_RATE': 0.01,
+    'MIN_CAPACITY': 100000,
+    'REBUILD_INTERVAL': 3600,
+}
+
+# ログイン試行回数の制限(トークンバケット)
+# クライアントのIPアドレス・ユーザ名ごとに、1秒あたりRATE回・連続BURST回までのログイン試行を許可する
+# BACKEND: local -> プロセス内で保持 cache -> CACHE_ALIASのキャッシュで複数台のサーバ間で共有
+LOGIN_THROTTLE = {
+    'ENABLED': True,
+    'BACKEND': 'local',
+    'CACHE_ALIAS': 'default',
+    'IP_META_KEY': 'REMOTE_ADDR',
+    'IP_RATE': 1.0,
+    'IP_BURST': 30,
+    'USERNAME_RATE': 0.1,
+    'USERNAME_BURST': 10,
+}
+
+# パスワードハッシュ計算用のワーカープール
+# KIND: thread -> GILを解放するハッシャ(PBKDF2など)向け process -> 純Pythonのハッシャ向け inline -> リクエストスレッドで計算
+# 実行中・待機中のハッシュ計算がMAX_WORKERS + MAX_QUEUEに達した場合は、ハッシュ計算を待たず503を返す
+PASSWORD_HASHING_EXECUTOR = {
+    'KIND': 'thread',
+    'MAX_WORKERS': 4,
+    'MAX_QUEUE': 16,
+}
+
+# リクエスト・処理段階ごとの所要時間・問い合わせ数の計測
+# 集計値は/metrics/からPrometheusのテキスト形式で取得 ALLOWED_IPSがNoneの場合は接続元を制限しない
+METRICS = {
+    'ENABLED': True,
+    'ALLOWED_IPS': ['127.0.0.1', '::1'],
+}
+
+# Viewごとの問い合わせ数の上限 URLの名前・HTTPメソッドごとに宣言し、トランザクション制御は数えない
+# MODE: warn -> 超過・重複を警告 raise -> 例外を送出 off -> 検証しない
+# DETECT_DUPLICATES: 1リクエスト内でDUPLICATE_THRESHOLD回以上発行された同じSQL(N+1問い合わせ)も検出
+QUERY_BUDGET = {
+    'MODE': 'warn' if DEBUG else 'off',
+    'DETECT_DUPLICATES': True,
+    'DUPLICATE_THRESHOLD': 2,
+    'BUDGETS': {
+        # ログイン ユーザ取得 + セッションのINSERT + 最終ログイン日時の更新(ユーザ一覧のCSVへ出力するため省かない)
+        'login:login': {'GET': 0, 'POST': 3},
+        # ユーザ登録 登録のみ ユニークチェックは一意制約で行う(SIGNUP_USERNAME_PRECHECK有効時は+1)
+        'login:signup': {'GET': 0, 'POST': 1},
+        # トップ ユーザ(キャッシュ未格納時) + ユーザ一覧(管理者のみ) セッションはキャッシュから参照する
+        'login:top': {'GET': 2},
+        # ログアウト ユーザ(キャッシュ未格納時) + セッションのDELETE
+        'login:logout': {'GET': 2},
+        # ユーザの取得のみ CSVの出力はレスポンスの送信中に行うため含まない
+        'login:export': {'GET': 1},
+        # JSON API HTML版の同じ処理と同数
+        'api:login': {'POST': 3},
+        'api:signup': {'POST': 1},
+        'api:logout': {'POST': 2},
+        # ログイン中のユーザ ユーザ(キャッシュ未格納時)
+        'api:me': {'GET': 1},
+    },
+}
+
+# SQLをプロット 問い合わせ数の確認はQUERY_BUDGETで行うため、全SQLの出力は環境変数DJANGO_LOG_SQL=1の場合のみ
+# ログの出力先への書き込みはバックグラウンドのスレッドで行い、リクエストの処理を待たせない
+# django.db.backends: DJANGO_LOG_SQL=1の場合にSQLを出力
+#   DJANGO_LOG_SQL_SAMPLE_RATEの割合のみ出力し、DJANGO_LOG_SQL_SLOW_MSミリ秒以上かかったSQLは常に出力
+# custom_auth.auth: ログイン・ユーザ登録の結果を1行のJSONで出力
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'custom_auth.log.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sql_sampling': {
+            '()': 'custom_auth.log.SQLSamplingFilter',
+            'rate': float(os.environ.get('DJANGO_LOG_SQL_SAMPLE_RATE', '1.0' if DEBUG else '0.01')),
+            'slow_ms': float(os.environ.get('DJANGO_LOG_SQL_SLOW_MS', '100')),
+        },
+    },
     'handlers': {
         'console': {
             'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
+            'class': 'custom_auth.log.BackgroundStreamHandler',
+        },
+        'json_console': {
+            'level': 'INFO',
+            'class': 'custom_auth.log.BackgroundStreamHandler',
+            'formatter': 'json',
         },
     },
     'loggers': {
         'django.db.backends': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': 'DEBUG' if os.environ.get('DJANGO_LOG_SQL') == '1' else 'INFO',
+            'filters': ['sql_sampling'],
+        },
+        'custom_auth.auth': {
+            'handlers': ['json_console'],
+            'level': 'INFO',
+            'propagate': False,
         },
     },
 }
 
 
-
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 
@@ -154,4 +350,6 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "templates/static/"),
-]
\ No newline at end of file
+]
+# collectstaticの収集先
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+本番環境用の設定 config.settingsを元に、本番環境で異なる値のみを上書きする
+
+DJANGO_SETTINGS_MODULE=config.settings_production で利用する
+"""
+
+import os
+
+from .settings import *
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+# DBへの接続はリクエストごとに確立せず、再利用する
+# DJANGO_DB_POOL=1(既定): プロセス内のコネクションプール(要psycopg[pool])から接続を借り、リクエストの終了時に返却する
+#   最小・最大の接続数、未使用の接続を閉じるまでの時間、接続を待つ上限時間は環境変数で指定
+#   借りる際に接続が有効か確認し、切断された接続は破棄して新たに接続する(CONN_HEALTH_CHECKSでDjangoがcheckを指定する)
+# DJANGO_DB_POOL=0: スレッドごとに接続を保持し、CONN_MAX_AGE秒の間再利用する 利用前に接続が有効か確認する
+if os.environ.get('DJANGO_DB_POOL', '1') == '1':
+    connection_settings = {
+        # プールを利用する場合、接続の保持はプールが行う
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '4')),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '16')),
+                'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+                'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            },
+        },
+    }
+else:
+    connection_settings = {
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+# レプリカを含むすべてのDBへ適用 コネクションプールはpsycopg 3のバックエンドでのみ利用できる
+DATABASES = {
+    alias: {**database, 'ENGINE': 'django.db.backends.postgresql', **connection_settings}
+    for alias, database in DATABASES.items()
+}
+
+# プロセス間で共有するキャッシュ(要redis) クレームの失効時刻などを、すべてのプロセスから参照できるようにする
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('DJANGO_REDIS_URL', 'redis://localhost:6379/0'),
+    },
+}
+
+# テンプレートは起動時に解析し、キャッシュローダでプロセス内に保持する
+# APP_DIRSはloadersと併用できないため、アプリケーションのテンプレートはapp_directories.Loaderで読み込む
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# DJANGO_JINJA2=1の場合、ログイン・ユーザ登録画面をJinja2で描画する(要jinja2)
+# templates_jinja2に存在しないテンプレートは、後続のDjangoテンプレートエンジンで描画される
+if os.environ.get('DJANGO_JINJA2') == '1':
+    TEMPLATES.insert(0, {
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'templates_jinja2')],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'config.jinja2.environment',
+            'auto_reload': False,
+        },
+    })
+
+# 起動時にすべてのテンプレートを解析
+TEMPLATE_WARMUP = True
+
+# 開発用の問い合わせ数の検証は行わない
+QUERY_BUDGET = {**QUERY_BUDGET, 'MODE': 'off'}
+
+# 描画済みのトップ画面を再利用
+PAGE_CACHE = {**PAGE_CACHE, 'ENABLED': True}
+
+# 静的ファイルはハッシュ値付きの名前で収集し、gzip・brotli(要brotli)で圧縮したファイルを併せて生成する
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'custom_auth.storage.CompressedManifestStaticFilesStorage',
+    },
+}
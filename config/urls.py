@@ -1,9 +1,23 @@
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from custom_auth.views import metrics, static_file
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('login/', include('custom_auth.urls')),
+    # Prometheusの収集対象
+    path('metrics/', metrics, name='metrics'),
+    # ASGIで稼働させる場合は非同期版のViewを利用
+    # JSON API テンプレートを描画せず、JSONで応答
+    path('login/api/', include('custom_auth.async_api_urls' if settings.ASYNC_VIEWS else 'custom_auth.api_urls')),
+    path('login/', include('custom_auth.async_urls' if settings.ASYNC_VIEWS else 'custom_auth.urls')),
 ]
 
-handler404 = 'custom_auth.views.handler404'
\ No newline at end of file
+# 収集済みの静的ファイルを配信 開発サーバでは、runserverがSTATICFILES_DIRSから直接配信する
+if settings.STATIC_URL.startswith('/'):
+    urlpatterns.append(re_path(r'^%s(?P<path>.+)$' % re.escape(settings.STATIC_URL.lstrip('/')), static_file, name='static'))
+
+handler404 = 'custom_auth.views.handler404'
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# 起動時に構築しておくことで、最初のリクエストで構築処理を待たせない
+from custom_auth.template_warmup import warm_templates  # noqa: E402
+from custom_auth.username_filter import warm_username_filter  # noqa: E402
+warm_username_filter()
+warm_templates()
@@ -0,0 +1,16 @@
+from django.urls import path
+from . import api_views
+
+app_name = 'api'
+
+# モバイルアプリ・SPA向けのJSON API
+urlpatterns = [
+    # ログイン
+    path('login', api_views.LoginApiView.as_view(), name='login'),
+    # ユーザ登録
+    path('signup', api_views.SignUpApiView.as_view(), name='signup'),
+    # ログアウト
+    path('logout', api_views.LogoutApiView.as_view(), name='logout'),
+    # ログイン中のユーザ
+    path('me', api_views.MeApiView.as_view(), name='me'),
+]
@@ -0,0 +1,372 @@
+from custom_auth.exceptions import HashingPoolSaturatedException, LoginFailureException
+from django.views import View
+from django.contrib.auth import login, logout
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+
+import json
+import logging
+import math
+from typing import Any, Dict, Optional, Tuple
+from typing import cast
+
+try:
+    import orjson
+except ImportError:  # orjsonは任意 未インストールの場合は標準のjsonで変換
+    orjson = None
+
+from .forms import USERNAME_TAKEN_MESSAGE, LoginForm, SignUpForm
+from .backend import AuthBackend
+from .claims import store_claims
+from .hashing import get_hashing_executor
+from .log import form_error_codes, log_auth_event, posted_username
+from .metrics import phase
+from .models import User, is_username_conflict
+from .views import check_login_throttle, insert_user
+
+# リクエスト・レスポンスのContent-Type
+JSON_CONTENT_TYPE = 'application/json'
+
+# ログイン失敗時のメッセージ HTML版のログイン画面と共通
+LOGIN_FAILURE_MESSAGE = 'ユーザ名またはパスワードが間違っています。'
+
+
+def dumps(data: Any) -> bytes:
+    """ レスポンスのJSONへ変換 空白を含めず、日本語はエスケープしない """
+
+    if orjson is not None:
+        return orjson.dumps(data)
+
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(body: bytes) -> Any:
+    """ リクエストのJSONを変換
+
+    Raises
+    ------
+    ValueError
+        JSONとして解釈できない場合に送出
+    """
+
+    if orjson is not None:
+        return orjson.loads(body)
+
+    return json.loads(body)
+
+
+def json_response(data: Any, status: int=200) -> HttpResponse:
+    """ JSONのレスポンス テンプレートを描画せず、変換した文字列をそのまま返す
+
+    Parameters
+    ----------
+    data: Any
+        レスポンスの内容
+    status: int
+        ステータスコード
+
+    Returns
+    -------
+    HttpResponse
+        JSONのレスポンス
+    """
+
+    response = HttpResponse(dumps(data), status=status, content_type=JSON_CONTENT_TYPE)
+    # ユーザごとに内容が異なるため、共有キャッシュに格納させない
+    response['Cache-Control'] = 'private, no-store'
+
+    return response
+
+
+def error_response(error: str, status: int, errors: Optional[Dict[str, Any]]=None) -> HttpResponse:
+    """ エラーのレスポンス {"error": コード, "errors": 項目ごとの入力誤り}
+
+    Parameters
+    ----------
+    error: str
+        エラーのコード invalid_json, invalid_credentials, throttledなど
+    status: int
+        ステータスコード
+    errors: Optional[Dict[str, Any]]
+        項目ごとの入力誤り フォームのerrors.get_json_data()の形式
+    """
+
+    data: Dict[str, Any] = {'error': error}
+
+    if errors is not None:
+        data['errors'] = errors
+
+    return json_response(data, status)
+
+
+def user_data(user: User) -> Dict[str, Any]:
+    """ レスポンスへ含めるユーザの情報 パスワードは含めない """
+
+    return {
+        'id': user.pk,
+        'username': user.username,
+        'is_admin': user.is_admin,
+    }
+
+
+def parse_json_body(request: HttpRequest) -> Tuple[Optional[Dict[str, Any]], Optional[HttpResponse]]:
+    """ リクエストボディのJSONオブジェクトを取得
+
+    Parameters
+    ----------
+    request: HttpRequest
+        リクエスト情報
+
+    Returns
+    -------
+    data, error: Tuple[Optional[Dict[str, Any]], Optional[HttpResponse]]
+        取得できた場合は(JSONオブジェクト, None)
+        Content-TypeがJSONでない場合は(None, 415) JSONオブジェクトとして解釈できない場合は(None, 400)
+    """
+
+    if request.content_type != JSON_CONTENT_TYPE:
+        return None, error_response('unsupported_media_type', 415)
+
+    try:
+        data = loads(request.body)
+    except ValueError:
+        return None, error_response('invalid_json', 400)
+
+    if not isinstance(data, dict):
+        return None, error_response('invalid_json', 400)
+
+    return data, None
+
+
+def api_too_many_requests(retry_after: float) -> HttpResponse:
+    """ ログイン試行回数の上限を超えたときに返す429レスポンス """
+
+    response = error_response('throttled', 429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+
+    return response
+
+
+def api_service_unavailable() -> HttpResponse:
+    """ 混雑時に返す503レスポンス """
+
+    response = error_response('unavailable', 503)
+    response['Retry-After'] = '1'
+
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class JsonApiView(View):
+    """ JSON API用Viewの基底クラス
+
+    モバイルアプリ・SPAからはCSRFトークンを取得せずに呼び出せるよう、CSRFの検証は行わない
+    代わりに更新系のリクエストはContent-Type: application/jsonのみを受け付ける
+    他サイトのフォームからはこのContent-Typeで送信できず、fetchなどで送信する場合はCORSのプリフライトで拒否される
+    """
+
+    def http_method_not_allowed(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        response = error_response('method_not_allowed', 405)
+        response['Allow'] = ', '.join(self._allowed_methods())
+
+        # 非同期版のViewではコルーチンを返す
+        if self.view_is_async:
+
+            async def func() -> HttpResponse:
+                return response
+
+            return func()  # type: ignore[return-value]
+
+        return response
+
+
+class LoginApiView(JsonApiView):
+    """ ログインAPI
+    """
+
+    def post(self, request: HttpRequest) -> HttpResponse:
+        """ ログイン処理 {"username": ユーザ名, "password": パスワード}
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ログイン成功 -> 200 ユーザの情報
+            ログイン失敗 -> 401
+            JSONでないリクエスト -> 400, 415
+            ログイン試行回数の上限を超過 -> 429
+            パスワード検証用のワーカープールが飽和 -> 503
+        """
+
+        data, error = parse_json_body(request)
+        if data is None:
+            return cast(HttpResponse, error)
+
+        # 試行回数の制限 パスワード検証・DBへの問い合わせより先に評価
+        retry_after = check_login_throttle(request, str(data.get('username', '')))
+        if retry_after:
+            log_auth_event('login_throttled', request, logging.WARNING, username=posted_username(request, data), retry_after=retry_after)
+            return api_too_many_requests(retry_after)
+
+        form = LoginForm(data)
+
+        # ユーザ認証
+        try:
+            with phase('form_validation'):
+                if not form.is_valid():
+                    raise LoginFailureException()
+
+            user = AuthBackend().authenticate(
+                request,
+                username=form.cleaned_data['username'],
+                password=form.cleaned_data['password']
+            )
+
+        # ログイン失敗 入力誤り・ユーザの存在・パスワードの誤りを区別しない
+        except LoginFailureException:
+            log_auth_event('login_failure', request, username=posted_username(request, data))
+            return error_response('invalid_credentials', 401, {'__all__': [{'message': LOGIN_FAILURE_MESSAGE, 'code': 'invalid_credentials'}]})
+
+        # 混雑時はハッシュ計算を待たずに応答
+        except HashingPoolSaturatedException:
+            log_auth_event('login_unavailable', request, logging.WARNING, username=posted_username(request, data))
+            return api_service_unavailable()
+
+        with phase('session_write'):
+            login(request, user, 'custom_auth.backend.AuthBackend')
+            store_claims(request, user)
+
+        log_auth_event('login_success', request, user_id=user.pk, username=user.username)
+
+        return json_response(user_data(user))
+
+
+class SignUpApiView(JsonApiView):
+    """ ユーザ登録API
+    """
+
+    def post(self, request: HttpRequest) -> HttpResponse:
+        """ ユーザ登録処理 {"username": ユーザ名, "password": パスワード}
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ユーザ登録成功 -> 201 登録したユーザの情報
+            ユーザ登録失敗 -> 400 項目ごとの入力誤り
+            JSONでないリクエスト -> 400, 415
+            パスワードハッシュ計算用のワーカープールが飽和 -> 503
+        """
+
+        data, error = parse_json_body(request)
+        if data is None:
+            return cast(HttpResponse, error)
+
+        form = SignUpForm(data)
+
+        with phase('form_validation'):
+            is_valid = form.is_valid()
+
+        # 登録失敗
+        if not is_valid:
+            log_auth_event('signup_invalid', request, username=posted_username(request, data), errors=form_error_codes(form))
+            return error_response('invalid', 400, form.errors.get_json_data())
+
+        # パスワードのハッシュ化 同時に計算する数を制限するため、ワーカープールで計算
+        try:
+            with phase('hash_password'):
+                password = get_hashing_executor().make_password(form.cleaned_data['password'])
+
+        except HashingPoolSaturatedException:
+            log_auth_event('signup_unavailable', request, logging.WARNING, username=posted_username(request, data))
+            return api_service_unavailable()
+
+        # ユーザ登録
+        user = User(
+            username=form.cleaned_data['username'],
+            password=password,
+            is_admin=False,
+        )
+
+        # 登録済みのユーザ名は一意制約違反として検出
+        try:
+            with phase('user_insert'):
+                insert_user(user)
+
+        except IntegrityError as integrity_error:
+            if not is_username_conflict(integrity_error):
+                raise
+
+            log_auth_event('signup_duplicate', request, username=posted_username(request, data))
+            form.add_error('username', ValidationError(USERNAME_TAKEN_MESSAGE, code='unique'))
+            return error_response('invalid', 400, form.errors.get_json_data())
+
+        log_auth_event('signup_success', request, user_id=user.pk, username=user.username)
+
+        return json_response(user_data(user), 201)
+
+
+class LogoutApiView(JsonApiView):
+    """ ログアウトAPI
+    """
+
+    def post(self, request: HttpRequest) -> HttpResponse:
+        """ ログアウト処理 ボディは不要 他サイトからログアウトさせられないよう、Content-Typeはログインと同様に検証
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            204 ログインしていない場合も同様
+            Content-TypeがJSONでない場合 -> 415
+        """
+
+        if request.content_type != JSON_CONTENT_TYPE:
+            return error_response('unsupported_media_type', 415)
+
+        with phase('session_write'):
+            logout(request)
+
+        return HttpResponse(status=204)
+
+
+class MeApiView(JsonApiView):
+    """ ログイン中のユーザを取得するAPI
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """ ログイン中のユーザの情報
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            ログイン済み -> 200 ユーザの情報
+            未ログイン -> 401
+        """
+
+        user = cast(User, request.user)
+
+        if not user.is_authenticated:
+            return error_response('unauthenticated', 401)
+
+        return json_response(user_data(user))
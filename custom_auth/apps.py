@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CustomAuthConfig(AppConfig):
     name = 'custom_auth'
+
+    def ready(self) -> None:
+        # キャッシュ破棄などのシグナルハンドラ、起動時の設定値の検証を登録
+        from . import checks, signals  # noqa: F401
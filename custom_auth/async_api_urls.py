@@ -0,0 +1,17 @@
+from django.urls import path
+from . import async_api_views
+
+app_name = 'api'
+
+# ASGIで稼働させる際に利用する非同期版のJSON API
+# URL名はcustom_auth.api_urlsと共通
+urlpatterns = [
+    # ログイン
+    path('login', async_api_views.AsyncLoginApiView.as_view(), name='login'),
+    # ユーザ登録
+    path('signup', async_api_views.AsyncSignUpApiView.as_view(), name='signup'),
+    # ログアウト
+    path('logout', async_api_views.AsyncLogoutApiView.as_view(), name='logout'),
+    # ログイン中のユーザ
+    path('me', async_api_views.AsyncMeApiView.as_view(), name='me'),
+]
@@ -0,0 +1,208 @@
+from custom_auth.exceptions import HashingPoolSaturatedException, LoginFailureException
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, alogout
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.http import HttpRequest, HttpResponse
+
+import logging
+from typing import cast
+
+from .forms import USERNAME_TAKEN_MESSAGE, LoginForm, SignUpForm
+from .api_views import JSON_CONTENT_TYPE, LOGIN_FAILURE_MESSAGE, JsonApiView, api_service_unavailable, api_too_many_requests, error_response, json_response, parse_json_body, user_data
+from .backend import AuthBackend
+from .claims import store_claims
+from .hashing import get_hashing_executor
+from .log import form_error_codes, log_auth_event, posted_username
+from .metrics import phase
+from .models import User, is_username_conflict
+from .views import check_login_throttle, insert_user
+
+
+class AsyncLoginApiView(JsonApiView):
+    """ ログインAPI(非同期版)
+    """
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """ ログイン処理 {"username": ユーザ名, "password": パスワード}
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ログイン成功 -> 200 ユーザの情報
+            ログイン失敗 -> 401
+            JSONでないリクエスト -> 400, 415
+            ログイン試行回数の上限を超過 -> 429
+            パスワード検証用のワーカープールが飽和 -> 503
+        """
+
+        data, error = parse_json_body(request)
+        if data is None:
+            return cast(HttpResponse, error)
+
+        # 試行回数の制限 共有キャッシュを参照し得るため、イベントループ外で評価
+        retry_after = await sync_to_async(check_login_throttle)(request, str(data.get('username', '')))
+        if retry_after:
+            log_auth_event('login_throttled', request, logging.WARNING, username=posted_username(request, data), retry_after=retry_after)
+            return api_too_many_requests(retry_after)
+
+        form = LoginForm(data)
+
+        # ユーザ認証
+        try:
+            with phase('form_validation'):
+                if not form.is_valid():
+                    raise LoginFailureException()
+
+            user = await AuthBackend().aauthenticate(
+                request,
+                username=form.cleaned_data['username'],
+                password=form.cleaned_data['password']
+            )
+
+        # ログイン失敗
+        except LoginFailureException:
+            log_auth_event('login_failure', request, username=posted_username(request, data))
+            return error_response('invalid_credentials', 401, {'__all__': [{'message': LOGIN_FAILURE_MESSAGE, 'code': 'invalid_credentials'}]})
+
+        # 混雑時はハッシュ計算を待たずに応答
+        except HashingPoolSaturatedException:
+            log_auth_event('login_unavailable', request, logging.WARNING, username=posted_username(request, data))
+            return api_service_unavailable()
+
+        with phase('session_write'):
+            await alogin(request, user, 'custom_auth.backend.AuthBackend')
+            await sync_to_async(store_claims)(request, user)
+
+        log_auth_event('login_success', request, user_id=user.pk, username=user.username)
+
+        return json_response(user_data(user))
+
+
+class AsyncSignUpApiView(JsonApiView):
+    """ ユーザ登録API(非同期版)
+    """
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """ ユーザ登録処理 {"username": ユーザ名, "password": パスワード}
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ユーザ登録成功 -> 201 登録したユーザの情報
+            ユーザ登録失敗 -> 400 項目ごとの入力誤り
+            JSONでないリクエスト -> 400, 415
+            パスワードハッシュ計算用のワーカープールが飽和 -> 503
+        """
+
+        data, error = parse_json_body(request)
+        if data is None:
+            return cast(HttpResponse, error)
+
+        form = SignUpForm(data)
+
+        # 登録失敗 ユニークチェックでDBへ問い合わせ得るため、イベントループ外で検証
+        with phase('form_validation'):
+            is_valid = await sync_to_async(form.is_valid)()
+
+        if not is_valid:
+            log_auth_event('signup_invalid', request, username=posted_username(request, data), errors=form_error_codes(form))
+            return error_response('invalid', 400, form.errors.get_json_data())
+
+        # パスワードのハッシュ化
+        try:
+            with phase('hash_password'):
+                password = await get_hashing_executor().amake_password(form.cleaned_data['password'])
+
+        except HashingPoolSaturatedException:
+            log_auth_event('signup_unavailable', request, logging.WARNING, username=posted_username(request, data))
+            return api_service_unavailable()
+
+        # ユーザ登録
+        user = User(
+            username=form.cleaned_data['username'],
+            password=password,
+            is_admin=False,
+        )
+
+        # 登録済みのユーザ名は一意制約違反として検出
+        try:
+            with phase('user_insert'):
+                await sync_to_async(insert_user)(user)
+
+        except IntegrityError as integrity_error:
+            if not is_username_conflict(integrity_error):
+                raise
+
+            log_auth_event('signup_duplicate', request, username=posted_username(request, data))
+            form.add_error('username', ValidationError(USERNAME_TAKEN_MESSAGE, code='unique'))
+            return error_response('invalid', 400, form.errors.get_json_data())
+
+        log_auth_event('signup_success', request, user_id=user.pk, username=user.username)
+
+        return json_response(user_data(user), 201)
+
+
+class AsyncLogoutApiView(JsonApiView):
+    """ ログアウトAPI(非同期版)
+    """
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """ ログアウト処理 ボディは不要 他サイトからログアウトさせられないよう、Content-Typeはログインと同様に検証
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            204 ログインしていない場合も同様
+            Content-TypeがJSONでない場合 -> 415
+        """
+
+        if request.content_type != JSON_CONTENT_TYPE:
+            return error_response('unsupported_media_type', 415)
+
+        with phase('session_write'):
+            await alogout(request)
+
+        return HttpResponse(status=204)
+
+
+class AsyncMeApiView(JsonApiView):
+    """ ログイン中のユーザを取得するAPI(非同期版)
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """ ログイン中のユーザの情報
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            ログイン済み -> 200 ユーザの情報
+            未ログイン -> 401
+        """
+
+        user = cast(User, await request.auser())
+
+        if not user.is_authenticated:
+            return error_response('unauthenticated', 401)
+
+        return json_response(user_data(user))
@@ -0,0 +1,19 @@
+from django.urls import path
+from . import async_views
+
+app_name = 'login'
+
+# ASGIで稼働させる際に利用する非同期版のView
+# URL名はcustom_auth.urlsと共通
+urlpatterns = [
+    # ログイン
+    path('', async_views.AsyncLoginView.as_view(), name='login'),
+    # ユーザ登録
+    path('signup', async_views.AsyncSignUpView.as_view(), name='signup'),
+    # トップ
+    path('top', async_views.AsyncTopView.as_view(), name='top'),
+    # ユーザ一覧のCSV出力(管理者のみ)
+    path('export', async_views.AsyncUserExportView.as_view(), name='export'),
+    # ログアウト
+    path('logout', async_views.AsyncLogoutView.as_view(), name='logout'),
+]
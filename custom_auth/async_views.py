@@ -0,0 +1,258 @@
+from custom_auth.exceptions import HashingPoolSaturatedException, LoginFailureException
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect
+from django.views import View
+from django.contrib.auth import alogin, alogout
+from django.db import IntegrityError
+from django.http import Http404, HttpRequest, HttpResponse
+
+from typing import cast
+
+from .forms import LoginForm, SignUpForm
+from .backend import AuthBackend
+from .claims import store_claims
+from .export import agzip_stream, aiter_users_csv
+from .hashing import get_hashing_executor
+from .metrics import phase
+from .models import User
+from .views import (
+    accepts_gzip_export, build_signup_user, check_login_throttle, export_response, handler404, insert_user,
+    login_failure_response, login_success_response, login_throttled_response, render_top_page,
+    signup_duplicate_response, signup_invalid_response, signup_success_response, unavailable_response,
+)
+
+
+class AsyncLoginView(View):
+    """ ログイン画面用View(非同期版)
+    DBへの問い合わせ・パスワード検証の完了をイベントループ上で待機し、ワーカを占有しない
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """ ログイン画面表示処理
+
+        Parameters
+        ----------
+        request: HttpRequest
+            GETリクエスト情報
+
+        Returns
+        -------
+        response: HttpResponse
+            ログイン画面表示用レスポンス
+        """
+
+        context = {
+            'form': LoginForm()
+        }
+
+        return render(request, 'login/login.html', context)
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """ ログイン処理
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ログイン失敗 -> ログイン画面
+            ログイン成功 -> トップ画面
+            ログイン試行回数の上限を超過 -> 429
+            パスワード検証用のワーカープールが飽和 -> 503
+        """
+
+        # 試行回数の制限 共有キャッシュを参照し得るため、イベントループ外で評価
+        retry_after = await sync_to_async(check_login_throttle)(request)
+        if retry_after:
+            return login_throttled_response(request, retry_after)
+
+        form = LoginForm(request.POST)
+
+        # ユーザ認証
+        try:
+            with phase('form_validation'):
+                if not form.is_valid():
+                    raise LoginFailureException()
+
+            user = await AuthBackend().aauthenticate(
+                request,
+                username=form.cleaned_data['username'],
+                password=form.cleaned_data['password']
+            )
+
+        # ログイン失敗
+        except LoginFailureException:
+            return login_failure_response(request, form)
+
+        # 混雑時はハッシュ計算を待たずに応答
+        except HashingPoolSaturatedException:
+            return unavailable_response(request, 'login_unavailable')
+
+        with phase('session_write'):
+            await alogin(request, user, 'custom_auth.backend.AuthBackend')
+            await sync_to_async(store_claims)(request, user)
+
+        return login_success_response(request, user)
+
+
+class AsyncSignUpView(View):
+    """ ユーザ登録処理用View(非同期版)
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """ ユーザ登録画面表示
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ユーザ登録画面
+        """
+
+        context = {
+            'form': SignUpForm()
+        }
+
+        return render(request, 'signup/signup.html', context)
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        """ ユーザ登録処理
+
+        Parameters
+        ----------
+        request : HttpRequest
+            POSTリクエスト情報
+
+        Returns
+        -------
+        HttpResponse
+            ユーザ登録失敗 -> ユーザ登録画面
+            ユーザ登録成功 -> ログイン画面
+            パスワードハッシュ計算用のワーカープールが飽和 -> 503
+        """
+
+        form = SignUpForm(request.POST)
+
+        # 登録失敗 ユニークチェックでDBへ問い合わせるため、イベントループ外で検証
+        with phase('form_validation'):
+            is_valid = await sync_to_async(form.is_valid)()
+
+        if not is_valid:
+            return signup_invalid_response(request, form)
+
+        # パスワードのハッシュ化
+        try:
+            with phase('hash_password'):
+                password = await get_hashing_executor().amake_password(form.cleaned_data['password'])
+
+        except HashingPoolSaturatedException:
+            return unavailable_response(request, 'signup_unavailable')
+
+        # ユーザ登録
+        user = build_signup_user(form, password)
+
+        # 登録済みのユーザ名は一意制約違反として検出 同時に同じユーザ名で登録された場合も1件のみ登録される
+        try:
+            with phase('user_insert'):
+                await sync_to_async(insert_user)(user)
+
+        except IntegrityError as error:
+            return signup_duplicate_response(request, form, error)
+
+        return signup_success_response(request, user)
+
+
+class AsyncTopView(View):
+    """ トップ画面用View(非同期版)
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """ トップ画面表示
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            未ログイン -> ログイン画面
+            ログイン済み -> トップ画面 権限に応じて出しわけ 描画済みのページがあればそれを返す
+        """
+
+        user = cast(User, await request.auser())
+
+        # 認証済みか
+        if not user.is_authenticated:
+            return redirect('login:login')
+
+        # 管理者用トップ画面はユーザ一覧をDBへ問い合わせ、ユーザトップ画面は共有し得るページキャッシュを参照するため、いずれもスレッド上で描画
+        with phase('render'):
+            return await sync_to_async(render_top_page)(request, user)
+
+
+class AsyncUserExportView(View):
+    """ ユーザ一覧のCSV出力用View(非同期版) 管理者のみ利用できる
+    同期イテレータはASGIでの配信時にすべて読み込まれてしまうため、非同期イテレータで出力する
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """ 全ユーザをCSV形式で出力
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            未ログイン -> ログイン画面
+            管理者以外 -> 404
+            管理者 -> ユーザ一覧のCSV gzipを受け付ける場合は圧縮して送信
+        """
+
+        user = cast(User, await request.auser())
+
+        if not user.is_authenticated:
+            return redirect('login:login')
+
+        if not user.is_admin:
+            return handler404(request, Http404())
+
+        content = aiter_users_csv()
+        gzipped = accepts_gzip_export(request)
+
+        return export_response(agzip_stream(content) if gzipped else content, gzipped)
+
+
+class AsyncLogoutView(View):
+    """ ログアウト処理用View(非同期版)
+    """
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        """ ログアウト処理
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            ログイン画面
+        """
+
+        with phase('session_write'):
+            await alogout(request)
+
+        return redirect('login:login')
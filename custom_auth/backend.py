@@ -1,17 +1,52 @@
 from typing import Any, Optional, Union
-from custom_auth.exceptions import LoginFailureException
+from custom_auth.exceptions import HashingPoolSaturatedException, LoginFailureException
+from asgiref.sync import sync_to_async
 from django.contrib.auth.backends import BaseBackend
-from django.contrib.auth.hashers import check_password
+from django.contrib.auth.hashers import get_hasher, identify_hasher
 from django.http import HttpRequest
 
+from .cache import get_user_cache
+from .hashing import get_hashing_executor
+from .metrics import phase
 from .models import User
 
+# ログイン時に読み込む列 索引m_user_login_covering_idxのみで取得できる列に限る
+# last_loginはログイン時に上書きするのみで参照しないため、読み込まない
+AUTHENTICATION_FIELDS = ('id', 'username', 'password', 'is_admin')
+
+def must_update_password(encoded: str) -> bool:
+    """ 格納済みのハッシュ値が、現在優先されるハッシャ・計算コストで生成されたものか
+
+    Parameters
+    ----------
+    encoded: str
+        DBへ格納されたハッシュ値
+
+    Returns
+    -------
+    bool
+        True -> アルゴリズムまたは計算コストが異なるため、再計算が必要
+        False -> 再計算は不要
+    """
+
+    try:
+        hasher = identify_hasher(encoded)
+
+    except ValueError:
+        return False
+
+    preferred = get_hasher('default')
+
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
 class AuthBackend(BaseBackend):
     """ 認証処理用バックエンド
     """
 
     def get_user(self, user_id: int) -> Union[User, None]:
         """ セッションに格納されているユーザ識別用キーをもとにユーザモデルを取得
+        ユーザキャッシュが有効な場合は、キャッシュに存在しないときのみDBへ問い合わせる
 
         Parameters
         ----------
@@ -24,11 +59,23 @@ class AuthBackend(BaseBackend):
             認証用ユーザ
         """
 
+        user_cache = get_user_cache()
+
+        if user_cache is not None:
+            cached_user = user_cache.get(user_id)
+
+            if cached_user is not None:
+                return cached_user
+
         try:
-            user = User.objects.get(id=user_id)
+            with phase('user_load'):
+                user = User.objects.get(id=user_id)
 
         except (User.DoesNotExist, ValueError):
             return None
+
+        if user_cache is not None:
+            user_cache.set(user)
         
         return user
 
@@ -53,19 +100,125 @@ class AuthBackend(BaseBackend):
         ------
         LoginFailureException
             ログインに失敗した場合に送出される
+        HashingPoolSaturatedException
+            パスワード検証用のワーカープールが飽和している場合に送出される
         """
 
         # ユーザ存在チェック
         try:
-            user = User.objects.get(username=username)
+            with phase('user_lookup'):
+                user = User.objects.filter_username(username or '').only(*AUTHENTICATION_FIELDS).get()
 
         except User.DoesNotExist:
             raise LoginFailureException()
 
-        # パスワード妥当性チェック
-        is_valid_password = check_password(password, user.password)
+        # パスワード妥当性チェック 同時に計算する数を制限するため、ワーカープールで計算
+        with phase('check_password'):
+            is_valid_password = get_hashing_executor().check_password(password, user.password)
 
         if not is_valid_password:
             raise LoginFailureException()
+
+        # 計算コストが変更されていれば、ログインに成功したパスワードでハッシュ値を更新
+        if must_update_password(user.password):
+            try:
+                with phase('rehash_password'):
+                    user.password = get_hashing_executor().make_password(password)
+                    user.save(update_fields=['password'])
+
+            # 混雑時は更新を見送り、次回のログインで更新
+            except HashingPoolSaturatedException:
+                pass
         
-        return user
\ No newline at end of file
+        return user
+
+    async def aget_user(self, user_id: int) -> Union[User, None]:
+        """ get_userの非同期版 DBへの問い合わせはイベントループを止めずに待機
+
+        Parameters
+        ----------
+        user_id: int
+            一意識別子
+
+        Returns
+        -------
+        user: User
+            認証用ユーザ
+        """
+
+        user_cache = get_user_cache()
+
+        if user_cache is not None:
+            # 共有キャッシュはネットワークI/Oを伴うため、イベントループ外で参照
+            if user_cache.is_shared:
+                cached_user = await sync_to_async(user_cache.get)(user_id)
+            else:
+                cached_user = user_cache.get(user_id)
+
+            if cached_user is not None:
+                return cached_user
+
+        try:
+            with phase('user_load'):
+                user = await User.objects.aget(id=user_id)
+
+        except (User.DoesNotExist, ValueError):
+            return None
+
+        if user_cache is not None:
+            await sync_to_async(user_cache.set)(user)
+
+        return user
+
+    async def aauthenticate(self, request: HttpRequest, username: Optional[str]=None, password: Optional[str]=None, **kwargs: Any) -> User:
+        """ authenticateの非同期版 DBへの問い合わせ・パスワード検証はイベントループを止めずに待機
+
+        Parameters
+        ----------
+        request: HttpRequest
+            認証で利用されるリクエスト情報
+        username: str
+            ユーザをDBから取得するためのユーザ名
+        password: str
+            ユーザを認証するためのパスワード
+
+        Returns
+        -------
+        user: User
+            認証に成功した場合は、セッションへ格納するためのユーザモデルを返す
+
+        Raises
+        ------
+        LoginFailureException
+            ログインに失敗した場合に送出される
+        HashingPoolSaturatedException
+            パスワード検証用のワーカープールが飽和している場合に送出される
+        """
+
+        # ユーザ存在チェック
+        try:
+            with phase('user_lookup'):
+                user = await User.objects.filter_username(username or '').only(*AUTHENTICATION_FIELDS).aget()
+
+        except User.DoesNotExist:
+            raise LoginFailureException()
+
+        # パスワード妥当性チェック
+        with phase('check_password'):
+            is_valid_password = await get_hashing_executor().acheck_password(password, user.password)
+
+        if not is_valid_password:
+            raise LoginFailureException()
+
+        # 計算コストが変更されていれば、ログインに成功したパスワードでハッシュ値を更新
+        if must_update_password(user.password):
+            try:
+                with phase('rehash_password'):
+                    user.password = await get_hashing_executor().amake_password(password)
+                    await user.asave(update_fields=['password'])
+
+            # 混雑時は更新を見送り、次回のログインで更新
+            except HashingPoolSaturatedException:
+                pass
+
+        return user
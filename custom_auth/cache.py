@@ -0,0 +1,202 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import User
+
+
+class UserCache:
+    """ AuthBackend.get_user用のユーザキャッシュ
+    プロセス内のLRU(TTL付き)を1次キャッシュとし、
+    キャッシュエイリアスが指定された場合はDjangoのキャッシュフレームワークを2次キャッシュとして併用する
+
+    Attributes
+    ----------
+    max_size: int
+        プロセス内に保持するユーザの最大件数
+    timeout: float
+        エントリの有効期間(秒)
+    hits: int
+        キャッシュヒット数
+    misses: int
+        キャッシュミス数
+    """
+
+    KEY_PREFIX = 'custom_auth:user:'
+
+    def __init__(self, max_size: int=1024, timeout: float=60, cache_alias: Optional[str]=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._cache_alias = cache_alias
+        self._entries: 'OrderedDict[str, Tuple[float, User]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: Any) -> Optional[User]:
+        """ ユーザIDをもとにキャッシュからユーザを取得
+
+        Parameters
+        ----------
+        user_id: Any
+            一意識別子 セッション由来のため、文字列の場合もある
+
+        Returns
+        -------
+        user: User
+            キャッシュに存在しない・有効期限切れの場合はNone
+            呼び出し側で変更されても影響しないよう、複製を返す
+        """
+
+        key = str(user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                expires_at, user = entry
+
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.copy(user)
+
+                del self._entries[key]
+
+        # 共有キャッシュ
+        if self._cache_alias is not None:
+            user = caches[self._cache_alias].get(self.KEY_PREFIX + key)
+
+            if user is not None:
+                self._store_local(key, user)
+                with self._lock:
+                    self.hits += 1
+                return copy.copy(user)
+
+        with self._lock:
+            self.misses += 1
+
+        return None
+
+    def set(self, user: User) -> None:
+        """ ユーザをキャッシュへ格納
+
+        Parameters
+        ----------
+        user: User
+            DBから取得した認証用ユーザ
+        """
+
+        key = str(user.pk)
+        self._store_local(key, copy.copy(user))
+
+        if self._cache_alias is not None:
+            caches[self._cache_alias].set(self.KEY_PREFIX + key, user, self.timeout)
+
+    def invalidate(self, user_id: Any) -> None:
+        """ ユーザをキャッシュから破棄
+
+        Parameters
+        ----------
+        user_id: Any
+            一意識別子
+        """
+
+        key = str(user_id)
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self._cache_alias is not None:
+            caches[self._cache_alias].delete(self.KEY_PREFIX + key)
+
+    @property
+    def is_shared(self) -> bool:
+        """ Djangoのキャッシュフレームワークを併用しているか 参照時にネットワークI/Oを伴い得る """
+
+        return self._cache_alias is not None
+
+    def clear(self) -> None:
+        """ プロセス内のキャッシュ・統計情報を初期化 共有キャッシュのエントリはTTLで失効させる """
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """ キャッシュサイズの見積もりに用いる統計情報
+
+        Returns
+        -------
+        stats: Dict[str, Any]
+            hits, misses, size, max_size, hit_ratio
+        """
+
+        with self._lock:
+            total = self.hits + self.misses
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+    def _store_local(self, key: str, user: User) -> None:
+        """ プロセス内のLRUへ格納 上限を超えた場合は最も参照されていないものから破棄 """
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, user)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_user_cache: Optional[UserCache] = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache() -> Optional[UserCache]:
+    """ 設定値USER_CACHEをもとにユーザキャッシュを取得
+
+    Returns
+    -------
+    user_cache: UserCache
+        キャッシュが無効化されている場合はNone
+    """
+
+    global _user_cache
+
+    config: Dict[str, Any] = getattr(settings, 'USER_CACHE', {})
+
+    if not config.get('ENABLED', False):
+        return None
+
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache(
+                    max_size=config.get('MAX_SIZE', 1024),
+                    timeout=config.get('TIMEOUT', 60),
+                    cache_alias=config.get('CACHE_ALIAS'),
+                )
+
+    return _user_cache
+
+
+def reset_user_cache() -> None:
+    """ 設定変更時などにキャッシュを作り直す """
+
+    global _user_cache
+
+    with _user_cache_lock:
+        _user_cache = None
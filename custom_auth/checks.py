@@ -0,0 +1,39 @@
+from typing import Any, List
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import CheckMessage, Error, Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_claims_cache(app_configs: Any, **kwargs: Any) -> List[CheckMessage]:
+    """ クレームの失効時刻を記録するキャッシュが、プロセス間で共有されるか
+    プロセス内のキャッシュでは、他のプロセスで失効させたクレームがMAX_AGE秒の間有効なままとなる
+    """
+
+    config = getattr(settings, 'SESSION_USER_CLAIMS', {})
+
+    if not config.get('ENABLED', False):
+        return []
+
+    alias = config.get('CACHE_ALIAS', 'default')
+    cache = caches[alias]
+
+    if isinstance(cache, DummyCache):
+        return [Error(
+            f"SESSION_USER_CLAIMS['CACHE_ALIAS'] ({alias!r}) is a DummyCache, so revoked claims stay valid until MAX_AGE.",
+            hint='Point CACHE_ALIAS at a cache shared by every process, such as Redis or Memcached.',
+            id='custom_auth.E001',
+        )]
+
+    if isinstance(cache, LocMemCache):
+        return [Warning(
+            f"SESSION_USER_CLAIMS['CACHE_ALIAS'] ({alias!r}) is a per-process LocMemCache; "
+            'claims revoked in one process stay valid in the others until MAX_AGE.',
+            hint='Point CACHE_ALIAS at a cache shared by every process, such as Redis or Memcached.',
+            id='custom_auth.W001',
+        )]
+
+    return []
@@ -0,0 +1,206 @@
+import time
+from typing import Any, Dict, Optional, Union
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.core.cache import caches
+from django.http import HttpRequest
+
+from .models import User
+
+# セッションへクレームを格納する際のキー
+CLAIMS_SESSION_KEY = '_auth_user_claims'
+# 署名用のソルト
+CLAIMS_SALT = 'custom_auth.claims'
+# ユーザごとのクレームの失効時刻を格納する際のキャッシュキーの接頭辞
+REVOKED_KEY_PREFIX = 'custom_auth:claims_revoked:'
+
+
+def is_claims_enabled() -> bool:
+    """ セッションへユーザ情報(クレーム)を埋め込むモードが有効か """
+
+    return getattr(settings, 'SESSION_USER_CLAIMS', {}).get('ENABLED', False)
+
+
+def _get_claims_version() -> int:
+    """ クレームのバージョン 変更すると発行済みのクレームはすべて無効となる """
+
+    return getattr(settings, 'SESSION_USER_CLAIMS', {}).get('VERSION', 1)
+
+
+def _get_revocation_cache() -> Any:
+    """ ユーザごとの失効時刻を保持するキャッシュ 複数プロセスで動かす場合は共有キャッシュを指定する """
+
+    return caches[getattr(settings, 'SESSION_USER_CLAIMS', {}).get('CACHE_ALIAS', 'default')]
+
+
+def revoke_claims(user_id: Any) -> None:
+    """ ユーザの発行済みのクレームを失効させる
+    失効時刻より前に発行されたクレームは検証に失敗し、次のリクエストでDBの値から発行し直される
+
+    Parameters
+    ----------
+    user_id: Any
+        一意識別子
+    """
+
+    if not is_claims_enabled():
+        return
+
+    # クレームの有効期間を過ぎれば発行済みのクレームは署名の検証で失効するため、それ以上は保持しない
+    max_age = getattr(settings, 'SESSION_USER_CLAIMS', {}).get('MAX_AGE')
+    _get_revocation_cache().set(REVOKED_KEY_PREFIX + str(user_id), time.time(), max_age)
+
+
+def _is_revoked(claims: Dict[str, Any]) -> bool:
+    """ クレームが発行後に失効させられたか """
+
+    revoked_at = _get_revocation_cache().get(REVOKED_KEY_PREFIX + str(claims.get('id')))
+
+    return revoked_at is not None and claims.get('issued_at', 0) <= revoked_at
+
+
+def store_claims(request: HttpRequest, user: User) -> None:
+    """ ログイン済みユーザのクレームを署名付きでセッションへ格納
+
+    Parameters
+    ----------
+    request: HttpRequest
+        セッションを保持するリクエスト情報
+    user: User
+        ログイン済みユーザ
+    """
+
+    if not is_claims_enabled():
+        return
+
+    claims = {
+        'id': user.pk,
+        'username': user.username,
+        'is_admin': user.is_admin,
+        'version': _get_claims_version(),
+        'issued_at': time.time(),
+    }
+    request.session[CLAIMS_SESSION_KEY] = signing.dumps(claims, salt=CLAIMS_SALT, compress=True)
+
+
+def load_claims(request: HttpRequest) -> Optional[Dict[str, Any]]:
+    """ セッションからクレームを取得し、署名・有効期間・バージョン・ユーザID・失効の有無を検証
+
+    Parameters
+    ----------
+    request: HttpRequest
+        セッションを保持するリクエスト情報
+
+    Returns
+    -------
+    claims: Dict[str, Any]
+        検証に失敗した場合はNone
+    """
+
+    token = request.session.get(CLAIMS_SESSION_KEY)
+
+    if token is None:
+        return None
+
+    max_age = getattr(settings, 'SESSION_USER_CLAIMS', {}).get('MAX_AGE')
+
+    try:
+        claims: Dict[str, Any] = signing.loads(token, salt=CLAIMS_SALT, max_age=max_age)
+
+    except signing.BadSignature:
+        return None
+
+    if claims.get('version') != _get_claims_version():
+        return None
+
+    # ログイン中のユーザと一致するか
+    if str(claims.get('id')) != str(request.session.get(auth.SESSION_KEY)):
+        return None
+
+    # パスワードの変更・権限の剥奪・削除によって失効させられたか
+    if _is_revoked(claims):
+        return None
+
+    return claims
+
+
+class ClaimsUser:
+    """ クレームから構築される遅延評価ユーザ
+    クレームに含まれる項目はDBを参照せず返し、それ以外の項目が参照されたときに初めてm_userから取得する
+
+    Attributes
+    ----------
+    id: int
+        一意識別子
+    username: str
+        ユーザ名
+    is_admin: bool
+        管理者か
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, claims: Dict[str, Any]):
+        self.id = claims['id']
+        self.pk = claims['id']
+        self.username = claims['username']
+        self.is_admin = claims['is_admin']
+        self._user: Union[User, AnonymousUser, None] = None
+
+    def _load(self) -> Union[User, AnonymousUser]:
+        """ クレーム外の項目が参照された際に、認証用ユーザを取得 """
+
+        if self._user is None:
+            from .backend import AuthBackend
+
+            self._user = AuthBackend().get_user(self.id) or AnonymousUser()
+
+        return self._user
+
+    def __getattr__(self, name: str) -> Any:
+        # 通常の属性探索で見つからなかった項目のみが対象
+        if name.startswith('__') or name == '_user':
+            raise AttributeError(name)
+
+        return getattr(self._load(), name)
+
+    def __eq__(self, other: object) -> bool:
+        return getattr(other, 'pk', None) == self.pk and getattr(other, 'is_authenticated', False)
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
+
+    def __str__(self) -> str:
+        return f'username: {self.username}, is_admin: {self.is_admin}'
+
+
+def get_claims_user(request: HttpRequest) -> Union[ClaimsUser, User, AnonymousUser]:
+    """ セッションのクレームからユーザを構築
+    クレームが存在しない・無効な場合は通常どおり認証バックエンドから取得し、クレームを発行し直す
+
+    Parameters
+    ----------
+    request: HttpRequest
+        セッションを保持するリクエスト情報
+
+    Returns
+    -------
+    user: ClaimsUser | User | AnonymousUser
+        リクエストを送信したユーザ
+    """
+
+    claims = load_claims(request)
+
+    if claims is not None:
+        return ClaimsUser(claims)
+
+    user = auth.get_user(request)
+
+    if user.is_authenticated:
+        store_claims(request, user)
+
+    return user
@@ -0,0 +1,42 @@
+from typing import Any, Dict, List, Tuple
+
+from django.db import connections
+
+
+def get_connection_pools() -> List[Tuple[str, Any]]:
+    """ DATABASESのOPTIONSのpoolで有効化された、DBごとのコネクションプール(psycopg_pool.ConnectionPool)
+
+    Returns
+    -------
+    pools: List[Tuple[str, Any]]
+        DBのエイリアスとコネクションプールの組 プールを利用しないDBは含まない
+    """
+
+    pools: List[Tuple[str, Any]] = []
+
+    for alias in connections:
+        # PostgreSQL以外のバックエンドはpoolを持たない
+        pool = getattr(connections[alias], 'pool', None)
+
+        if pool is not None:
+            pools.append((alias, pool))
+
+    return pools
+
+
+def pool_stats(pool: Any) -> Dict[str, Any]:
+    """ コネクションプールの統計情報
+
+    Parameters
+    ----------
+    pool: Any
+        psycopg_pool.ConnectionPool
+
+    Returns
+    -------
+    stats: Dict[str, Any]
+        pool_size, pool_available, requests_num, requests_queued, requests_wait_ms, requests_errorsなど
+        requests_wait_msは、接続の取得を待機した時間(ミリ秒)の累計
+    """
+
+    return {key: value for key, value in pool.get_stats().items() if isinstance(value, (int, float))}
@@ -0,0 +1,152 @@
+from typing import Any, List, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.db.models.functions import Lower
+from django.db.models.lookups import IContains
+
+from .models import User, is_case_insensitive_username
+
+# 一覧に表示する列
+DIRECTORY_FIELDS = ('id', 'username', 'is_admin')
+
+# カーソルの署名用のsalt 他の用途で署名した値をカーソルとして受け付けない
+CURSOR_SALT = 'custom_auth.directory.cursor'
+
+
+class UserPage:
+    """ ユーザ一覧の1ページ分
+
+    Attributes
+    ----------
+    users: List[Tuple[int, str, bool]]
+        DIRECTORY_FIELDSの順に値を持つユーザ
+    next_cursor: Optional[str]
+        次のページを取得するためのカーソル 最終ページの場合はNone
+    """
+
+    def __init__(self, users: List[Tuple[int, str, bool]], next_cursor: Optional[str]):
+        self.users = users
+        self.next_cursor = next_cursor
+
+
+class TrigramIContains(IContains):
+    """ 大文字小文字を区別しない部分一致
+    標準のicontainsはPostgreSQLではUPPER(username::text) LIKE UPPER(%s)となり、pg_trgmのGIN索引を利用できないため、
+    username ILIKE %sとする PostgreSQL以外では標準のicontainsと同じ
+    """
+
+    lookup_name = 'trigram_icontains'
+
+    def as_sql(self, compiler: Any, connection: Any) -> Any:
+        return IContains(self.lhs, self.rhs).as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler: Any, connection: Any) -> Any:
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+
+        return f'{lhs_sql} ILIKE {rhs_sql}', (*lhs_params, *rhs_params)
+
+
+User._meta.get_field('username').register_lookup(TrigramIContains)
+
+
+def get_directory_settings() -> Any:
+    """ 設定値USER_DIRECTORY """
+
+    return getattr(settings, 'USER_DIRECTORY', {})
+
+
+def encode_cursor(username: str, user_id: int) -> str:
+    """ ページ末尾のユーザの(username, id)を、クライアントが解釈・改ざんできないカーソルへ変換 """
+
+    return signing.dumps([username, user_id], salt=CURSOR_SALT)
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    """ カーソルから(username, id)を復元
+
+    Returns
+    -------
+    Optional[Tuple[str, int]]
+        不正なカーソルの場合はNone
+    """
+
+    try:
+        username, user_id = signing.loads(cursor, salt=CURSOR_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+    if not isinstance(username, str) or not isinstance(user_id, int):
+        return None
+
+    return username, user_id
+
+
+def search_users(query: str) -> Any:
+    """ ユーザ名で絞り込んだユーザ
+
+    SEARCHが'prefix'の場合は前方一致 PostgreSQLではLIKE用のpattern_opsのインデックスを範囲検索する
+    (大文字小文字を区別する場合はunique=Trueによるvarchar_pattern_opsの索引、区別しない場合はm_user_username_lower_like_idx)
+    SEARCHが'trigram'の場合は部分一致 PostgreSQLではpg_trgmのGINインデックスm_user_username_trgm_idxを利用する
+
+    Parameters
+    ----------
+    query: str
+        検索文字列 空文字の場合は絞り込まない
+    """
+
+    users = User.objects.all()
+
+    if not query:
+        return users
+
+    if get_directory_settings().get('SEARCH', 'prefix') == 'trigram':
+        return users.filter(username__trigram_icontains=query) if is_case_insensitive_username() else users.filter(username__contains=query)
+
+    if is_case_insensitive_username():
+        return users.alias(username_lower=Lower('username')).filter(username_lower__startswith=query.lower())
+
+    return users.filter(username__startswith=query)
+
+
+def list_users(query: str='', cursor: Optional[str]=None, page_size: Optional[int]=None) -> UserPage:
+    """ ユーザ名・IDの順に並べたユーザ一覧の1ページを取得
+
+    OFFSETで読み飛ばすと後ろのページほど読み込む行数が増えるため、前ページ末尾の(username, id)より後ろを
+    インデックスから直接読み始める(keyset pagination) どのページでも読み込む行数はpage_size + 1件で一定
+
+    Parameters
+    ----------
+    query: str
+        ユーザ名の検索文字列
+    cursor: Optional[str]
+        前ページのnext_cursor Noneもしくは不正な値の場合は先頭ページ
+    page_size: Optional[int]
+        1ページの件数 Noneの場合は設定値PAGE_SIZE
+
+    Returns
+    -------
+    UserPage
+        ユーザ一覧の1ページ
+    """
+
+    page_size = page_size or get_directory_settings().get('PAGE_SIZE', 50)
+    users = search_users(query)
+    position = decode_cursor(cursor) if cursor else None
+
+    if position is not None:
+        username, user_id = position
+        # (username, id) > (カーソルのusername, id)を、usernameのインデックスの範囲検索となる形で表現
+        users = users.filter(username__gte=username).exclude(username=username, id__lte=user_id)
+
+    # 次のページの有無を判定するため、1件多く取得
+    rows = list(users.order_by('username', 'id').values_list(*DIRECTORY_FIELDS)[:page_size + 1])
+
+    if len(rows) <= page_size:
+        return UserPage(rows, None)
+
+    rows = rows[:page_size]
+    last_id, last_username, _ = rows[-1]
+
+    return UserPage(rows, encode_cursor(last_username, last_id))
@@ -1,3 +1,11 @@
 class LoginFailureException(Exception):
     """ ログインに失敗したことを表す ログイン画面へと再度遷移させる """
-    pass
\ No newline at end of file
+    pass
+
+class HashingPoolSaturatedException(Exception):
+    """ パスワードハッシュ計算用のワーカープールが飽和していることを表す 503を返し、再試行を促す """
+    pass
+
+class QueryBudgetExceededException(Exception):
+    """ Viewが宣言された上限を超えて、もしくは同じSQLを繰り返しDBへ問い合わせたことを表す 開発環境でのみ送出される """
+    pass
@@ -0,0 +1,168 @@
+import csv
+import zlib
+from itertools import islice
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Sequence
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import User
+
+# 出力する列 パスワードのハッシュ値は出力しない
+EXPORT_FIELDS = ('id', 'username', 'is_admin', 'last_login')
+
+# 1回の書き出しにまとめる行のバイト数の目安 1行ごとに書き出すとソケットへの書き込み回数が増えるため、まとめて送る
+FLUSH_BYTES = 64 * 1024
+
+
+class Echo:
+    """ csv.writerが書き込んだ1行をそのまま返す擬似ファイル
+    行をメモリ上に溜めず、1行ずつ文字列として得るために利用する
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def get_chunk_size() -> int:
+    """ DBから1度に取得する行数 """
+
+    return getattr(settings, 'USER_EXPORT', {}).get('CHUNK_SIZE', 2000)
+
+
+def export_queryset() -> Any:
+    """ 出力対象のユーザ 主キー順に、出力する列のみを取得 """
+
+    return User.objects.order_by('pk').values_list(*EXPORT_FIELDS)
+
+
+def format_row(writer: Any, row: Sequence[Any]) -> str:
+    """ 1行をCSV形式の文字列へ変換 """
+
+    user_id, username, is_admin, last_login = row
+
+    return writer.writerow([user_id, username, int(is_admin), last_login.isoformat() if last_login is not None else ''])
+
+
+def iter_csv(rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """ ユーザをCSV形式で、一定のバイト数ごとにまとめて出力
+
+    Parameters
+    ----------
+    rows: Iterable[Sequence[Any]]
+        EXPORT_FIELDSの順に値を持つ行
+
+    Returns
+    -------
+    Iterator[bytes]
+        UTF-8でエンコードしたCSV ヘッダ行を含む
+    """
+
+    writer = csv.writer(Echo())
+    buffer: List[str] = [writer.writerow(EXPORT_FIELDS)]
+    size = 0
+
+    for row in rows:
+        line = format_row(writer, row)
+        buffer.append(line)
+        size += len(line)
+
+        if size >= FLUSH_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer.clear()
+            size = 0
+
+    yield ''.join(buffer).encode('utf-8')
+
+
+async def aiter_csv(rows: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    """ iter_csvの非同期版 ASGIでの配信時に、すべての行をメモリへ読み込まずに出力する """
+
+    writer = csv.writer(Echo())
+    buffer: List[str] = [writer.writerow(EXPORT_FIELDS)]
+    size = 0
+
+    async for row in rows:
+        line = format_row(writer, row)
+        buffer.append(line)
+        size += len(line)
+
+        if size >= FLUSH_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer.clear()
+            size = 0
+
+    yield ''.join(buffer).encode('utf-8')
+
+
+def iter_users_csv() -> Iterator[bytes]:
+    """ 全ユーザをCSV形式で出力
+    iterator()により、PostgreSQLではサーバサイドカーソルでCHUNK_SIZE行ずつ取得し、テーブルの件数によらず使用メモリを一定に保つ
+    """
+
+    return iter_csv(export_queryset().iterator(chunk_size=get_chunk_size()))
+
+
+async def aiter_rows(rows: Iterator[Sequence[Any]], chunk_size: int) -> AsyncIterator[Sequence[Any]]:
+    """ 同期イテレータからchunk_size行ずつ、スレッド上で取得
+
+    values_list()のaiterator()は最初の問い合わせをイベントループ上で実行してしまうため、
+    iterator()をsync_to_asyncで読み進める 同じカーソルを扱えるよう、常に同じスレッドで実行する
+    """
+
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)), thread_sensitive=True)
+
+    while True:
+        chunk = await next_chunk()
+
+        for row in chunk:
+            yield row
+
+        if len(chunk) < chunk_size:
+            return
+
+
+def aiter_users_csv() -> AsyncIterator[bytes]:
+    """ iter_users_csvの非同期版 """
+
+    chunk_size = get_chunk_size()
+
+    return aiter_csv(aiter_rows(export_queryset().iterator(chunk_size=chunk_size), chunk_size))
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """ 出力をgzip形式で逐次圧縮
+
+    Parameters
+    ----------
+    chunks: Iterable[bytes]
+        圧縮前の出力
+
+    Returns
+    -------
+    Iterator[bytes]
+        gzip形式の出力 全体を溜めずに、入力ごとに圧縮済みの部分を返す
+    """
+
+    # wbits=31でgzipのヘッダ・フッタを付与
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+async def agzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """ gzip_streamの非同期版 """
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
@@ -1,8 +1,24 @@
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
 from .validator import * 
 from .models import User
+from .username_filter import get_username_filter
+
+# 検証エラーの種別ごとのメッセージ
+USERNAME_ERROR_MESSAGES = {
+    INVALID_CHARSET: 'ユーザ名は半角英数または「-_」のみ使えます。',
+    TOO_SHORT: f'ユーザ名は{USERNAME_MIN_LENGTH}文字以上で入力してください。',
+    TOO_LONG: f'ユーザ名は{USERNAME_MAX_LENGTH}文字以下で入力してください。',
+}
+PASSWORD_ERROR_MESSAGES = {
+    INVALID_CHARSET: 'パスワードは半角英数または「-_」のみ使えます。',
+    TOO_SHORT: f'パスワードは{PASSWORD_MIN_LENGTH}文字以上で入力してください。',
+    TOO_LONG: f'パスワードは{PASSWORD_MAX_LENGTH}文字以下で入力してください。',
+}
+# 登録済みのユーザ名 事前の確認・登録時の一意制約違反のいずれで検出した場合も同じメッセージとする
+USERNAME_TAKEN_MESSAGE = 'ユーザ名はすでに使用されています。'
 
 class LoginForm(forms.Form):
     """ ログイン画面で利用するForm
@@ -64,26 +80,27 @@ class SignUpForm(forms.Form):
             文字種別・ユニーク性を満たさなかったときに送出される
         """
 
-        USERNAME_MIN_LENGTH = 5
-        USERNAME_MAX_LENGTH = 32
         value: str = self.cleaned_data['username']
 
         if not value:
             return value
 
-        # 文字種別
-        if not is_valid_alpha_numeric(value):
-            raise ValidationError('ユーザ名は半角英数または「-_」のみ使えます。')
+        # 文字種別・文字長
+        error = USERNAME_RULES.check(value)
+        if error is not None:
+            raise ValidationError(USERNAME_ERROR_MESSAGES[error], code=error)
 
-        # 文字長
-        if not is_valid_min_length(value, USERNAME_MIN_LENGTH):
-            raise ValidationError(f'ユーザ名は{USERNAME_MIN_LENGTH}文字以上で入力してください。')
-        if not is_valid_max_length(value, USERNAME_MAX_LENGTH):
-            raise ValidationError(f'ユーザ名は{USERNAME_MAX_LENGTH}文字以下で入力してください。')
+        # ユニーク 既定では登録時の一意制約違反として検出し、DBへの問い合わせを登録の1回のみとする
+        # SIGNUP_USERNAME_PRECHECKが有効な場合は、登録済みのユーザ名に対するパスワードのハッシュ計算を省くため事前に確認
+        if not getattr(settings, 'SIGNUP_USERNAME_PRECHECK', False):
+            return value
+
+        # 確実に登録されていないユーザ名はDBへの問い合わせを省略
+        username_filter = get_username_filter()
+        might_exist = username_filter is None or username_filter.might_exist(value)
 
-        # ユニーク
-        if User.objects.filter(username=value).exists():
-            raise ValidationError(f'ユーザ名はすでに使用されています。')
+        if might_exist and User.objects.filter_username_taken(value).exists():
+            raise ValidationError(USERNAME_TAKEN_MESSAGE, code='unique')
 
         return value
 
@@ -102,21 +119,14 @@ class SignUpForm(forms.Form):
             文字種別を満たさなかったときに送出される
         """
 
-        PASSWORD_MIN_LENGTH = 10
-        PASSWORD_MAX_LENGTH = 64
         value: str = self.cleaned_data['password']
 
         if not value:
             return value
 
-        # 文字種別
-        if not is_valid_alpha_numeric(value):
-            raise ValidationError('パスワードは半角英数または「-_」のみ使えます。')
-
-        # 文字長
-        if not is_valid_min_length(value, PASSWORD_MIN_LENGTH):
-            raise ValidationError(f'パスワードは{PASSWORD_MIN_LENGTH}文字以上で入力してください。')
-        if not is_valid_max_length(value, PASSWORD_MAX_LENGTH):
-            raise ValidationError(f'パスワードは{PASSWORD_MAX_LENGTH}文字以下で入力してください。')
+        # 文字種別・文字長
+        error = PASSWORD_RULES.check(value)
+        if error is not None:
+            raise ValidationError(PASSWORD_ERROR_MESSAGES[error], code=error)
 
         return value
\ No newline at end of file
@@ -0,0 +1,121 @@
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+@lru_cache(maxsize=None)
+def load_tuned_params() -> Dict[str, Dict[str, int]]:
+    """ tune_hashersコマンドが出力した計測結果ファイルを読み込む
+
+    Returns
+    -------
+    tuned_params: Dict[str, Dict[str, int]]
+        アルゴリズム名 -> パラメータ名 -> 値
+        ファイルが存在しない場合は空の辞書
+    """
+
+    path: Optional[str] = getattr(settings, 'PASSWORD_HASHER_PARAMS_FILE', None)
+
+    if path is None or not os.path.exists(path):
+        return {}
+
+    with open(path, encoding='utf-8') as f:
+        tuned_params: Dict[str, Any] = json.load(f)
+
+    return {
+        algorithm: entry.get('params', {})
+        for algorithm, entry in tuned_params.items()
+    }
+
+
+class TunedParameter:
+    """ 計測結果ファイルの値を優先して返すハッシャのパラメータ
+    計測結果が存在しない場合は、Django標準のハッシャの値を返す
+    インスタンス属性で上書きできるため、計測時は値を直接差し替える
+    """
+
+    def __init__(self, default: int):
+        self.default = default
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+
+        return load_tuned_params().get(instance.algorithm, {}).get(self.name, self.default)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """ 反復回数を計測結果から決定するPBKDF2ハッシャ 反復回数に比例して計算時間が伸びる """
+
+    iterations = TunedParameter(PBKDF2PasswordHasher.iterations)
+
+    tuning_parameter = 'iterations'
+    tuning_scale = 'linear'
+    tuning_probe = 10000
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """ 反復回数(time_cost)を計測結果から決定するArgon2ハッシャ メモリ使用量は固定 """
+
+    time_cost = TunedParameter(Argon2PasswordHasher.time_cost)
+
+    tuning_parameter = 'time_cost'
+    tuning_scale = 'linear'
+    tuning_probe = 1
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    """ ラウンド数を計測結果から決定するBCryptハッシャ ラウンド数が1増えるごとに計算時間が倍になる """
+
+    rounds = TunedParameter(BCryptSHA256PasswordHasher.rounds)
+
+    tuning_parameter = 'rounds'
+    tuning_scale = 'log2'
+    tuning_probe = 4
+
+
+def scrypt_maxmem(work_factor: int, block_size: int) -> int:
+    """ scryptの計算に許容するメモリ量(バイト)
+    必要量はおよそ128 * block_size * work_factor 余裕を持たせて2倍とする
+    maxmem=0の場合はOpenSSLの既定の上限(32MiB)となり、work_factorが2 ** 15以上では計算できない
+    """
+
+    return 256 * work_factor * block_size
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """ CPU・メモリコスト(work_factor)を計測結果から決定するScryptハッシャ 値は2の累乗に限られる
+    メモリの使用量はwork_factorに比例するため、許容するメモリ量もwork_factorから決定する
+    """
+
+    work_factor = TunedParameter(ScryptPasswordHasher.work_factor)
+
+    tuning_parameter = 'work_factor'
+    tuning_scale = 'power_of_2'
+    tuning_probe = 2 ** 10
+
+    @property  # type: ignore[override]
+    def maxmem(self) -> int:
+        return scrypt_maxmem(self.work_factor, self.block_size)
+
+    def encode(self, password: str, salt: str, n: Optional[int]=None, r: Optional[int]=None, p: Optional[int]=None) -> str:
+        # 保存済みのハッシュ値の検証では、現在と異なるwork_factorが渡されうるため、渡された値から許容するメモリ量を決定
+        n = n or self.work_factor
+        r = r or self.block_size
+
+        hasher = ScryptPasswordHasher()
+        hasher.maxmem = scrypt_maxmem(n, r)
+
+        return hasher.encode(password, salt, n, r, p or self.parallelism)
@@ -0,0 +1,254 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from .exceptions import HashingPoolSaturatedException
+
+
+class HashingExecutor:
+    """ パスワードハッシュ計算用のワーカープール
+    実行中・待機中のタスク数に上限を設け、上限を超えた場合は待たずに例外を送出する
+
+    Attributes
+    ----------
+    kind: str
+        thread -> スレッドプール PBKDF2など、計算中にGILを解放するハッシャ向け
+        process -> プロセスプール 純Pythonで実装されたハッシャ向け
+        inline -> 呼び出し元のスレッドで実行
+    max_workers: int
+        同時にハッシュを計算するワーカ数
+    max_queue: int
+        ワーカの空きを待つことができるタスク数
+    """
+
+    KINDS = ('thread', 'process', 'inline')
+
+    def __init__(self, kind: str='thread', max_workers: int=4, max_queue: int=16):
+        if kind not in self.KINDS:
+            raise ValueError(f'Unknown hashing executor kind: {kind}')
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._executor: Optional[Executor] = None
+        if kind == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hasher')
+        elif kind == 'process':
+            # 子プロセスでもハッシャの設定を参照できるよう、Djangoを初期化
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=django.setup)
+
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> 'Future[Any]':
+        """ ハッシュ計算をワーカへ投入
+
+        Parameters
+        ----------
+        fn: Callable
+            ワーカで実行する関数 プロセスプールの場合はpickle可能である必要がある
+        args: Any
+            関数へ渡す引数
+
+        Returns
+        -------
+        future: Future
+            計算結果
+
+        Raises
+        ------
+        HashingPoolSaturatedException
+            実行中・待機中のタスク数が上限に達している場合に送出される
+        """
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingPoolSaturatedException()
+
+        with self._lock:
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+
+        started_at = time.perf_counter()
+
+        if self._executor is None:
+            future: 'Future[Any]' = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            self._on_done(started_at)
+            return future
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._on_done(started_at)
+            raise
+
+        future.add_done_callback(lambda _: self._on_done(started_at))
+        return future
+
+    def check_password(self, password: Optional[str], encoded: str) -> bool:
+        """ ワーカでパスワードを検証
+
+        Parameters
+        ----------
+        password: str
+            平文のパスワード
+        encoded: str
+            DBへ格納されたハッシュ値
+
+        Returns
+        -------
+        bool
+            True -> パスワードが一致
+            False -> パスワードが不一致
+        """
+
+        return self.submit(hashers.check_password, password, encoded).result()
+
+    def make_password(self, password: Optional[str]) -> str:
+        """ ワーカでパスワードのハッシュ値を生成
+
+        Parameters
+        ----------
+        password: str
+            平文のパスワード
+
+        Returns
+        -------
+        str
+            DBへ格納するハッシュ値
+        """
+
+        return self.submit(hashers.make_password, password).result()
+
+    async def asubmit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """ イベントループを止めずにハッシュ計算の完了を待つ submitの非同期版
+
+        Parameters
+        ----------
+        fn: Callable
+            ワーカで実行する関数
+        args: Any
+            関数へ渡す引数
+
+        Returns
+        -------
+        Any
+            計算結果
+
+        Raises
+        ------
+        HashingPoolSaturatedException
+            実行中・待機中のタスク数が上限に達している場合に送出される
+        """
+
+        # 呼び出し元のスレッドで実行する場合も、イベントループ外のスレッドで計算
+        if self._executor is None:
+            return await sync_to_async(lambda: self.submit(fn, *args).result(), thread_sensitive=False)()
+
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    async def acheck_password(self, password: Optional[str], encoded: str) -> bool:
+        """ check_passwordの非同期版 """
+
+        return await self.asubmit(hashers.check_password, password, encoded)
+
+    async def amake_password(self, password: Optional[str]) -> str:
+        """ make_passwordの非同期版 """
+
+        return await self.asubmit(hashers.make_password, password)
+
+    def stats(self) -> Dict[str, Any]:
+        """ キュー長・ハッシュ計算時間(待機時間を含む)の統計情報
+
+        Returns
+        -------
+        stats: Dict[str, Any]
+            in_flight, max_in_flight, completed, rejected, latency_avg, latency_max
+        """
+
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'max_in_flight': self._max_in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'latency_avg': self._latency_total / self._completed if self._completed else 0.0,
+                'latency_max': self._latency_max,
+            }
+
+    def shutdown(self) -> None:
+        """ ワーカを停止 """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _on_done(self, started_at: float) -> None:
+        """ タスク完了時に枠を解放し、計算時間を記録 """
+
+        latency = time.perf_counter() - started_at
+
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+        self._slots.release()
+
+
+_hashing_executor: Optional[HashingExecutor] = None
+_hashing_executor_lock = threading.Lock()
+
+
+def get_hashing_executor() -> HashingExecutor:
+    """ 設定値PASSWORD_HASHING_EXECUTORをもとにワーカープールを取得
+
+    Returns
+    -------
+    hashing_executor: HashingExecutor
+        プロセス内で共有されるワーカープール
+    """
+
+    global _hashing_executor
+
+    if _hashing_executor is None:
+        with _hashing_executor_lock:
+            if _hashing_executor is None:
+                config: Dict[str, Any] = getattr(settings, 'PASSWORD_HASHING_EXECUTOR', {})
+                _hashing_executor = HashingExecutor(
+                    kind=config.get('KIND', 'inline'),
+                    max_workers=config.get('MAX_WORKERS', 4),
+                    max_queue=config.get('MAX_QUEUE', 16),
+                )
+
+    return _hashing_executor
+
+
+def reset_hashing_executor() -> None:
+    """ 設定変更時などにワーカープールを作り直す """
+
+    global _hashing_executor
+
+    with _hashing_executor_lock:
+        if _hashing_executor is not None:
+            _hashing_executor.shutdown()
+        _hashing_executor = None
@@ -0,0 +1,210 @@
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+from typing import Any, Callable, Dict, List, Mapping, Optional, TextIO
+
+from django.http import HttpRequest
+
+from .validator import USERNAME_MAX_LENGTH
+
+# ログイン・ユーザ登録の結果を出力するロガー
+auth_logger = logging.getLogger('custom_auth.auth')
+# DEBUG時以外にSQLを出力する場合のロガー Django標準のSQLのログと同じ名前とし、同じフィルタ・出力先を利用する
+sql_logger = logging.getLogger('django.db.backends')
+
+
+class BackgroundStreamHandler(logging.Handler):
+    """ 書き込みをバックグラウンドのスレッドで行うハンドラ
+    リクエストを処理するスレッドでは書式化してキューへ積むのみとし、標準エラー出力などへの書き込みを待たない
+    キューが溢れた場合はリクエストを待たせず、ログを破棄して件数を数える
+
+    Attributes
+    ----------
+    dropped: int
+        キューが溢れて破棄したログの件数
+    """
+
+    def __init__(self, stream: Optional[TextIO]=None, max_size: int=10000):
+        super().__init__()
+        self.queue: queue.Queue = queue.Queue(max_size)
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self) -> None:
+        """ 書き込み用のスレッドを開始
+        fork後の子プロセスにはスレッドが引き継がれず、キューには親プロセスの未書き込みのログ・件数が残るため、プロセスごとにキューから作り直す
+        """
+
+        if self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+
+            if self._pid is not None:
+                self.queue = queue.Queue(self.queue.maxsize)
+
+            self._listener = QueueListener(self.queue, self.target)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            # 書式化はこのハンドラのフォーマッタで行い、書き込み用のスレッドでは整形済みの文字列を出力するのみとする
+            message = self.format(record)
+            record = copy.copy(record)
+            record.message = message
+            record.msg = message
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            record.stack_info = None
+
+            self._ensure_listener()
+            self.queue.put_nowait(record)
+
+        except queue.Full:
+            self.dropped += 1
+
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        """ キューに積まれたログがすべて書き込まれるまで待機 書き込み用のスレッドは止めない """
+
+        if self._listener is not None and self._pid == os.getpid():
+            self.queue.join()
+
+        self.target.flush()
+
+    def close(self) -> None:
+        """ キューに積まれたログを書き込んでから、書き込み用のスレッドを停止 """
+
+        with self._start_lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+        self.target.flush()
+        self.target.close()
+        super().close()
+
+
+class SQLSamplingFilter(logging.Filter):
+    """ SQLのログのうち、一定の割合のみを出力するフィルタ 実行に時間のかかったSQLは常に出力する
+
+    Attributes
+    ----------
+    rate: float
+        出力する割合 0.0 ~ 1.0
+    slow_ms: float
+        常に出力する実行時間(ミリ秒)の下限
+    """
+
+    def __init__(self, rate: float=1.0, slow_ms: float=100.0, name: str=''):
+        super().__init__(name)
+        self.rate = rate
+        self.slow_ms = slow_ms
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        duration = getattr(record, 'duration', None)
+
+        # SQL以外のログ(スキーマ変更など)はそのまま出力
+        if duration is None:
+            return True
+
+        if duration * 1000 >= self.slow_ms:
+            return True
+
+        return random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """ ログを1行のJSONへ変換するフォーマッタ
+    extraのfieldsへ指定した項目を、時刻・レベル・ロガー名・メッセージと併せて出力する
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def log_auth_event(event: str, request: HttpRequest, level: int=logging.INFO, **fields: Any) -> None:
+    """ ログイン・ユーザ登録の結果を構造化されたログとして出力
+
+    Parameters
+    ----------
+    event: str
+        login_success, login_failure, login_throttled, signup_success, signup_invalidなど
+    request: HttpRequest
+        処理中のリクエスト 接続元を併せて出力
+    level: int
+        ログレベル
+    fields: Any
+        イベントごとの項目 user_id, usernameなど パスワードは渡さない
+    """
+
+    if not auth_logger.isEnabledFor(level):
+        return
+
+    auth_logger.log(level, event, extra={'fields': {'event': event, 'remote_addr': request.META.get('REMOTE_ADDR'), **fields}})
+
+
+def posted_username(request: HttpRequest, data: Optional[Mapping[str, Any]]=None) -> str:
+    """ ログに出力する、入力されたユーザ名 長すぎる値は切り詰める dataを省略した場合はPOSTの値 """
+
+    if data is None:
+        data = request.POST
+
+    return str(data.get('username', ''))[:USERNAME_MAX_LENGTH]
+
+
+def form_error_codes(form: Any) -> Dict[str, List[Optional[str]]]:
+    """ ログに出力する、フォームの項目ごとの入力誤りのコード 入力値・メッセージは含めない """
+
+    return {field: [error.code for error in errors] for field, errors in form.errors.as_data().items()}
+
+
+def log_queries(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """ SQLと実行時間をdjango.db.backendsへ出力するDB接続のexecute_wrapper
+    Django標準のSQLのログはDEBUG時のみ出力されるため、DJANGO_LOG_SQL=1の場合は本番環境でもこのwrapperで出力する
+    """
+
+    connection = context['connection']
+
+    # DEBUG時はDjango標準のログが出力される
+    if connection.queries_logged or not sql_logger.isEnabledFor(logging.DEBUG):
+        return execute(sql, params, many, context)
+
+    started_at = time.monotonic()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.monotonic() - started_at
+        sql_logger.debug(
+            '(%.3f) %s; args=%s; alias=%s', duration, sql, params, connection.alias,
+            extra={'duration': duration, 'sql': sql, 'params': params, 'alias': connection.alias},
+        )
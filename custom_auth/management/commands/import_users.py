@@ -0,0 +1,246 @@
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import IntegrityError, transaction
+
+from ...models import User, is_username_conflict, normalize_username_key
+from ...username_filter import get_username_filter
+from ...validator import *
+
+# 入力行 (行番号, 項目)
+Row = Tuple[int, Dict[str, Any]]
+
+
+class Command(BaseCommand):
+    """ CSV・JSONLのユーザ一覧を逐次読み込み、一括登録する
+    入力は一定件数ごとに処理し、ファイル全体をメモリへ展開しない
+    パスワードのハッシュ化はプロセスプールで並列に計算する
+    """
+
+    help = 'Stream users from a CSV/JSONL file, hash passwords in parallel and bulk insert them.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help='入力ファイル 「-」で標準入力 列はusername, password, is_admin(任意)')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None, help='入力形式 省略時は拡張子から判定')
+        parser.add_argument('--batch-size', type=int, default=1000, help='1回のbulk_createで登録する件数')
+        parser.add_argument('--workers', type=int, default=None, help='ハッシュ計算のプロセス数 0でプロセスプールを利用しない')
+        parser.add_argument('--rejected', default=None, help='登録しなかった行の出力先 省略時は標準エラー出力')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        input_format = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.ndjson')) else 'csv')
+        batch_size = options['batch_size']
+
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        executor = None if options['workers'] == 0 else ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup)
+        input_file = sys.stdin if options['path'] == '-' else open(options['path'], encoding='utf-8', newline='')
+        rejected_file = open(options['rejected'], 'w', encoding='utf-8') if options['rejected'] else self.stderr
+
+        created_count = 0
+        rejected_count = 0
+        started_at = time.perf_counter()
+
+        try:
+            rows = self._read_rows(input_file, input_format)
+
+            while True:
+                batch = list(islice(rows, batch_size))
+
+                if not batch:
+                    break
+
+                batch_started_at = time.perf_counter()
+                entries, rejected = self._build_users(batch, executor)
+                users, conflicts = self._insert_users(entries, batch_size)
+                rejected = sorted(rejected + conflicts)
+
+                # bulk_createではシグナルが送出されないため、ユーザ名のフィルタへ直接反映
+                username_filter = get_username_filter()
+                if username_filter is not None:
+                    for user in users:
+                        username_filter.add(user.username)
+
+                for line_number, reason in rejected:
+                    rejected_file.write(f'{line_number}: {reason}\n')
+
+                created_count += len(users)
+                rejected_count += len(rejected)
+                elapsed = time.perf_counter() - batch_started_at
+                self.stdout.write(
+                    f'batch: created={len(users)} rejected={len(rejected)} '
+                    f'{len(batch) / elapsed:.1f} rows/s'
+                )
+
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if input_file is not sys.stdin:
+                input_file.close()
+            if options['rejected']:
+                rejected_file.close()
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'created={created_count} rejected={rejected_count} '
+            f'elapsed={elapsed:.1f}s ({(created_count + rejected_count) / elapsed if elapsed else 0:.1f} rows/s)'
+        ))
+
+    def _read_rows(self, input_file: TextIO, input_format: str) -> Iterator[Row]:
+        """ 入力ファイルを1行ずつ読み込む
+
+        Parameters
+        ----------
+        input_file: TextIO
+            入力ファイル
+        input_format: str
+            csv or jsonl
+
+        Returns
+        -------
+        rows: Iterator[Row]
+            行番号と項目の組
+        """
+
+        if input_format == 'csv':
+            reader = csv.DictReader(input_file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_number, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = {}
+
+            yield line_number, row if isinstance(row, dict) else {}
+
+    def _build_users(self, batch: List[Row], executor: Optional[ProcessPoolExecutor]) -> Tuple[List[Tuple[int, User]], List[Tuple[int, str]]]:
+        """ 入力行を検証し、登録するユーザを生成
+
+        Parameters
+        ----------
+        batch: List[Row]
+            一括登録する入力行
+        executor: ProcessPoolExecutor
+            ハッシュ計算用のプロセスプール Noneの場合は呼び出し元のプロセスで計算
+
+        Returns
+        -------
+        entries, rejected: Tuple[List[Tuple[int, User]], List[Tuple[int, str]]]
+            登録するユーザの行番号・ユーザの組と、登録しなかった行番号・理由の組
+        """
+
+        rejected: List[Tuple[int, str]] = []
+        valid_rows: Dict[str, Row] = {}
+
+        # ユーザ登録画面と同じ規則で、バッチ単位でまとめて検証
+        usernames = [str(row.get('username') or '') for _, row in batch]
+        username_errors = USERNAME_RULES.check_many(usernames)
+        password_errors = PASSWORD_RULES.check_many(str(row.get('password') or '') for _, row in batch)
+
+        for (line_number, row), username, username_error, password_error in zip(batch, usernames, username_errors, password_errors):
+            reason = (
+                f'username {username_error}' if username_error is not None
+                else f'password {password_error}' if password_error is not None
+                else None
+            )
+
+            # 大文字小文字のみが異なるユーザ名も重複とみなす
+            key = normalize_username_key(username)
+
+            if reason is None and key in valid_rows:
+                reason = 'duplicate username in input'
+
+            if reason is not None:
+                rejected.append((line_number, reason))
+                continue
+
+            valid_rows[key] = (line_number, row)
+
+        # ユニーク 先行するバッチで登録したユーザも含めて、1回の問い合わせで検証
+        existing = {
+            normalize_username_key(username)
+            for username in User.objects.filter_username_taken_in(valid_rows.keys()).values_list('username', flat=True)
+        }
+
+        for key in existing:
+            line_number, _ = valid_rows.pop(key)
+            rejected.append((line_number, 'username already exists'))
+
+        passwords = [str(row['password']) for _, row in valid_rows.values()]
+        if executor is None:
+            hashed_passwords = [make_password(password) for password in passwords]
+        else:
+            hashed_passwords = list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 64)))
+
+        entries = [
+            (line_number, User(
+                username=str(row['username']),
+                password=hashed_password,
+                is_admin=str(row.get('is_admin', '')).lower() in ('1', 'true'),
+            ))
+            for (line_number, row), hashed_password in zip(valid_rows.values(), hashed_passwords)
+        ]
+
+        return entries, sorted(rejected)
+
+    def _insert_users(self, entries: List[Tuple[int, User]], batch_size: int) -> Tuple[List[User], List[Tuple[int, str]]]:
+        """ ユーザを一括登録
+        検証後にユーザ登録画面などから同じユーザ名が登録された場合は一意制約違反となるため、
+        1件ずつ登録し直し、違反した行のみを登録しない
+
+        Parameters
+        ----------
+        entries: List[Tuple[int, User]]
+            行番号と登録するユーザの組
+        batch_size: int
+            1回のbulk_createで登録する件数
+
+        Returns
+        -------
+        users, rejected: Tuple[List[User], List[Tuple[int, str]]]
+            登録したユーザと、登録しなかった行番号・理由の組
+        """
+
+        users = [user for _, user in entries]
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=batch_size)
+            return users, []
+
+        except IntegrityError as error:
+            if not is_username_conflict(error):
+                raise
+
+        created: List[User] = []
+        rejected: List[Tuple[int, str]] = []
+
+        for line_number, user in entries:
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+
+            except IntegrityError as error:
+                if not is_username_conflict(error):
+                    raise
+
+                rejected.append((line_number, 'username already exists'))
+                continue
+
+            created.append(user)
+
+        return created, rejected
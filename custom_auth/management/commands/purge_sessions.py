@@ -0,0 +1,100 @@
+import time
+from importlib import import_module
+from typing import Any, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """ 有効期限切れのセッションを一定件数ずつ削除する
+    clearsessionsは1文ですべて削除するため、件数が多いとテーブルを長時間ロックする
+    削除は主キーを指定した小さなDELETE文に分け、バッチの間に待機してほかの更新を妨げない
+    """
+
+    help = 'Delete expired database sessions in small batches, optionally in a continuous loop.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000, help='1回のDELETE文で削除する件数')
+        parser.add_argument('--pause', type=float, default=0.1, help='バッチ間の待機時間(秒)')
+        parser.add_argument('--max-batches', type=int, default=None, help='1回の実行で処理するバッチ数の上限 省略時は期限切れのセッションがなくなるまで')
+        parser.add_argument('--loop', action='store_true', help='終了せず、--intervalごとに削除を繰り返す')
+        parser.add_argument('--interval', type=float, default=60, help='--loop指定時、期限切れのセッションを削除し終えてから次に確認するまでの待機時間(秒)')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        session_model = self._get_session_model()
+
+        try:
+            while True:
+                deleted, batches, elapsed = self._purge(session_model, options)
+                self.stdout.write(self.style.SUCCESS(f'deleted={deleted} batches={batches} elapsed={elapsed:.1f}s'))
+
+                if not options['loop']:
+                    return
+
+                time.sleep(options['interval'])
+
+        except KeyboardInterrupt:
+            self.stdout.write('interrupted')
+
+    def _get_session_model(self) -> Any:
+        """ セッションを格納するモデル DBにセッションを格納しない設定の場合は中断 """
+
+        session_store = import_module(settings.SESSION_ENGINE).SessionStore
+
+        if not hasattr(session_store, 'get_model_class'):
+            raise CommandError(f'{settings.SESSION_ENGINE} does not store sessions in the database.')
+
+        return session_store.get_model_class()
+
+    def _purge(self, session_model: Any, options: Any) -> Tuple[int, int, float]:
+        """ 期限切れのセッションをバッチごとに削除
+
+        Parameters
+        ----------
+        session_model: Any
+            セッションを格納するモデル
+        options: Any
+            コマンドの引数
+
+        Returns
+        -------
+        deleted, batches, elapsed: Tuple[int, int, float]
+            削除した件数、バッチ数、所要時間(秒)
+        """
+
+        batch_size = options['batch_size']
+        deleted = 0
+        batches = 0
+        started_at = time.perf_counter()
+
+        while options['max_batches'] is None or batches < options['max_batches']:
+            batch_started_at = time.perf_counter()
+            now = timezone.now()
+
+            # expire_dateのインデックスで期限切れのセッションの主キーのみを取得
+            keys = list(
+                session_model.objects.filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:batch_size]
+            )
+
+            if not keys:
+                break
+
+            # 取得後に更新されたセッションは削除しない
+            count, _ = session_model.objects.filter(session_key__in=keys, expire_date__lt=now).delete()
+            deleted += count
+            batches += 1
+
+            self.stdout.write(f'batch: deleted={count} elapsed={(time.perf_counter() - batch_started_at) * 1000:.1f}ms')
+
+            if len(keys) < batch_size:
+                break
+
+            time.sleep(options['pause'])
+
+        return deleted, batches, time.perf_counter() - started_at
@@ -0,0 +1,145 @@
+import json
+import math
+import statistics
+import time
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.contrib.auth.hashers import BasePasswordHasher
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils.module_loading import import_string
+
+from ...hashers import load_tuned_params
+
+
+class Command(BaseCommand):
+    """ 設定済みのハッシャを実行環境で計測し、目標時間に収まる計算コストを決定する
+    結果はPASSWORD_HASHER_PARAMS_FILEへ出力され、custom_auth.hashersのハッシャが参照する
+    """
+
+    help = 'Benchmark the configured password hashers and pick work factors that fit a latency budget.'
+
+    # 計測に用いるパスワード
+    SAMPLE_PASSWORD = 'tune_hashers-sample-password'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--target-ms', type=float, default=250.0, help='1回のハッシュ計算に許容する時間(ミリ秒)')
+        parser.add_argument('--repeat', type=int, default=3, help='1つの値あたりの計測回数 中央値を採用する')
+        parser.add_argument('--hashers', nargs='*', default=None, help='計測対象のアルゴリズム名 省略時は計測可能なものすべて')
+        parser.add_argument('--output', default=None, help='出力先 省略時はPASSWORD_HASHER_PARAMS_FILE')
+        parser.add_argument('--allow-weaker', action='store_true', help='Django標準値より小さい計算コストを許容する')
+        parser.add_argument('--dry-run', action='store_true', help='計測結果を出力するのみで、ファイルへは書き込まない')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        target = options['target_ms'] / 1000
+        output = options['output'] or getattr(settings, 'PASSWORD_HASHER_PARAMS_FILE', None)
+
+        if output is None and not options['dry_run']:
+            raise CommandError('PASSWORD_HASHER_PARAMS_FILE is not configured. Use --output or --dry-run.')
+
+        tuned_params: Dict[str, Any] = {}
+
+        for hasher in self._get_tunable_hashers(options['hashers']):
+            # ライブラリ(argon2-cffi, bcrypt)が導入されていないハッシャは対象外
+            try:
+                if hasher.library is not None:
+                    hasher._load_library()
+            except ValueError as e:
+                self.stderr.write(f'{hasher.algorithm}: skipped ({e})')
+                continue
+
+            try:
+                value, elapsed = self._tune(hasher, target, options['repeat'], options['allow_weaker'])
+            except ValueError as e:
+                raise CommandError(f'{hasher.algorithm}: {e}') from e
+
+            tuned_params[hasher.algorithm] = {
+                'params': {hasher.tuning_parameter: value},
+                'elapsed_ms': round(elapsed * 1000, 2),
+                'target_ms': options['target_ms'],
+            }
+            self.stdout.write(f'{hasher.algorithm}: {hasher.tuning_parameter}={value} ({elapsed * 1000:.1f}ms)')
+
+        if options['dry_run']:
+            return
+
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(tuned_params, f, indent=2, sort_keys=True)
+
+        load_tuned_params.cache_clear()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}'))
+
+    def _get_tunable_hashers(self, algorithms: Any) -> List[BasePasswordHasher]:
+        """ PASSWORD_HASHERSのうち、計算コストを調整できるハッシャを取得
+        計測時にパラメータを差し替えるため、認証処理と共有するインスタンスとは別に生成する
+        """
+
+        hashers = [
+            hasher for hasher in (import_string(path)() for path in settings.PASSWORD_HASHERS)
+            if hasattr(hasher, 'tuning_parameter')
+        ]
+
+        if algorithms:
+            hashers = [hasher for hasher in hashers if hasher.algorithm in algorithms]
+
+        if not hashers:
+            raise CommandError('No tunable hasher found in PASSWORD_HASHERS.')
+
+        return hashers
+
+    def _measure(self, hasher: BasePasswordHasher, value: int, repeat: int) -> float:
+        """ 指定した計算コストでハッシュ計算に要する時間(秒)の中央値を計測 """
+
+        setattr(hasher, hasher.tuning_parameter, value)
+        elapsed_list = []
+
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            hasher.encode(self.SAMPLE_PASSWORD, hasher.salt())
+            elapsed_list.append(time.perf_counter() - started_at)
+
+        return statistics.median(elapsed_list)
+
+    def _estimate(self, hasher: BasePasswordHasher, value: int, elapsed: float, target: float) -> int:
+        """ 計測結果から、目標時間に収まる計算コストを見積もる """
+
+        ratio = target / elapsed
+
+        if hasher.tuning_scale == 'linear':
+            return max(1, int(value * ratio))
+
+        if hasher.tuning_scale == 'log2':
+            return max(hasher.tuning_probe, value + math.floor(math.log2(ratio)))
+
+        # power_of_2
+        return max(2, 2 ** math.floor(math.log2(value * ratio)))
+
+    def _tune(self, hasher: BasePasswordHasher, target: float, repeat: int, allow_weaker: bool) -> Any:
+        """ 小さな計算コストで計測して見積もり、見積もった値で再計測して補正する
+
+        Returns
+        -------
+        value, elapsed: Tuple[int, float]
+            決定した計算コストと、その値でのハッシュ計算時間(秒)
+        """
+
+        default = type(hasher).__dict__[hasher.tuning_parameter].default
+
+        probe = hasher.tuning_probe
+        value = self._estimate(hasher, probe, self._measure(hasher, probe, repeat), target)
+        elapsed = self._measure(hasher, value, repeat)
+
+        # 線形に伸びるものは再計測の結果で補正
+        if hasher.tuning_scale == 'linear':
+            value = self._estimate(hasher, value, elapsed, target)
+            elapsed = self._measure(hasher, value, repeat)
+
+        if value < default and not allow_weaker:
+            self.stderr.write(
+                f'{hasher.algorithm}: {hasher.tuning_parameter}={value} is weaker than the default {default}; '
+                'keeping the default (use --allow-weaker to override)'
+            )
+            value = default
+            elapsed = self._measure(hasher, value, repeat)
+
+        return value, elapsed
@@ -0,0 +1,28 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from ...template_warmup import compile_templates
+
+
+class Command(BaseCommand):
+    """ テンプレートディレクトリ配下のすべてのテンプレートを読み込み、解析に失敗するものを報告する
+    キャッシュローダを有効にした本番環境の設定で実行すると、テンプレートの誤りをデプロイ前に検出できる
+    """
+
+    help = 'Pre-compile every template with each configured template engine.'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        started_at = time.perf_counter()
+        compiled, failed = compile_templates()
+        elapsed = time.perf_counter() - started_at
+
+        if options['verbosity'] > 1:
+            for template_name in compiled:
+                self.stdout.write(f'compiled {template_name}')
+
+        for template_name, reason in failed:
+            self.stderr.write(f'skipped {template_name}: {reason}')
+
+        self.stdout.write(self.style.SUCCESS(f'compiled={len(compiled)} skipped={len(failed)} elapsed={elapsed * 1000:.1f}ms'))
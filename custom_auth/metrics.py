@@ -0,0 +1,327 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from .cache import get_user_cache
+from .db_pool import get_connection_pools, pool_stats
+from .hashing import get_hashing_executor
+from .page_cache import get_page_cache
+from .username_filter import get_username_filter
+
+# 処理時間(秒)のヒストグラムの区切り
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 問い合わせ数のヒストグラムの区切り
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+# ラベルの組 ((名前, 値), ...)
+Labels = Tuple[Tuple[str, str], ...]
+
+# ラベルへそのまま出力するHTTPメソッド それ以外はOTHER_METHODへまとめ、任意の値でラベルの種類が増えないようにする
+KNOWN_METHODS = frozenset(('GET', 'POST', 'HEAD', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+OTHER_METHOD = 'other'
+# URLが解決できなかったリクエストのviewラベル
+UNMATCHED_VIEW = 'unmatched'
+
+
+class Histogram:
+    """ Prometheusのhistogram型に相当する集計値
+    観測値は保持せず、区切りごとの件数・合計のみを保持する
+
+    Attributes
+    ----------
+    buckets: Tuple[float, ...]
+        区切りの上限値 昇順
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # 末尾は上限なし(+Inf)の区切り
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """ 観測値を追加 """
+
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """ 区切りごとの累積件数・合計・件数 """
+
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+
+        return cumulative, total, running
+
+
+class RequestRecorder:
+    """ 1リクエスト内の処理段階ごとの所要時間・問い合わせ数
+
+    Attributes
+    ----------
+    queries: int
+        リクエスト全体で発行した問い合わせ数
+    phases: Dict[str, List[float]]
+        処理段階ごとの[所要時間(秒), 問い合わせ数]
+    """
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.phases: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """ ブロック内の所要時間・問い合わせ数を処理段階として記録 """
+
+        queries = self.queries
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started_at
+            recorded = self.phases.setdefault(name, [0.0, 0])
+            recorded[0] += elapsed
+            recorded[1] += self.queries - queries
+
+
+# 処理中のリクエストの記録 sync_to_asyncで実行される処理にも引き継がれる
+_current_recorder: ContextVar[Optional[RequestRecorder]] = ContextVar('custom_auth_request_recorder', default=None)
+
+
+@contextmanager
+def recording() -> Iterator[RequestRecorder]:
+    """ ブロック内の処理を1リクエストとして記録 """
+
+    recorder = RequestRecorder()
+    token = _current_recorder.set(recorder)
+
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+@contextmanager
+def _null_phase() -> Iterator[None]:
+    yield
+
+
+def phase(name: str) -> Any:
+    """ 処理段階の計測 計測が無効な場合は何もしない
+
+    Parameters
+    ----------
+    name: str
+        処理段階の名前 form_validation, user_lookup, check_password, session_write, renderなど
+
+    Returns
+    -------
+    context_manager
+        ブロック内を計測するコンテキストマネージャ
+    """
+
+    recorder = _current_recorder.get()
+
+    if recorder is None:
+        return _null_phase()
+
+    return recorder.phase(name)
+
+
+def count_queries(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """ 処理中のリクエストの問い合わせ数を数えるDB接続のexecute_wrapper
+    DEBUG時のようにSQLを保持しないため、本番環境でも有効にできる
+    """
+
+    recorder = _current_recorder.get()
+
+    if recorder is not None:
+        recorder.queries += 1
+
+    return execute(sql, params, many, context)
+
+
+class MetricsRegistry:
+    """ リクエスト・処理段階ごとのヒストグラムをプロセス内で集計し、Prometheusのテキスト形式で出力する
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...], **labels: str) -> None:
+        """ ラベルに対応するヒストグラムへ観測値を追加
+
+        Parameters
+        ----------
+        name: str
+            メトリクス名
+        value: float
+            観測値
+        buckets: Tuple[float, ...]
+            ヒストグラムを作成する場合の区切り
+        labels: str
+            ラベル 値の種類が増え続けないものに限る
+        """
+
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+
+        histogram.observe(value)
+
+    def record_request(self, request: HttpRequest, response: HttpResponse, recorder: RequestRecorder, elapsed: float) -> None:
+        """ 1リクエスト分の記録を集計 """
+
+        view, method = _request_labels(request)
+        status = f'{response.status_code // 100}xx'
+
+        self.observe('custom_auth_request_seconds', elapsed, SECONDS_BUCKETS, view=view, method=method, status=status)
+        self.observe('custom_auth_request_queries', recorder.queries, QUERIES_BUCKETS, view=view, method=method, status=status)
+
+        for name, (seconds, queries) in recorder.phases.items():
+            self.observe('custom_auth_phase_seconds', seconds, SECONDS_BUCKETS, view=view, phase=name)
+            self.observe('custom_auth_phase_queries', queries, QUERIES_BUCKETS, view=view, phase=name)
+
+    def render(self) -> str:
+        """ Prometheusのテキスト形式へ変換 ユーザキャッシュなどの統計情報はgaugeとして併せて出力 """
+
+        with self._lock:
+            items = sorted(self._histograms.items())
+
+        lines: List[str] = []
+        described = set()
+
+        for (name, labels), histogram in items:
+            if name not in described:
+                lines.append(f'# TYPE {name} histogram')
+                described.add(name)
+
+            cumulative, total, count = histogram.snapshot()
+            bounds = [_format_value(bound) for bound in histogram.buckets] + ['+Inf']
+
+            for bound, bucket_count in zip(bounds, cumulative):
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {bucket_count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        for component, stats in _component_stats():
+            for key, value in sorted(stats.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    name = f'custom_auth_{component}_{key}'
+                    lines.append(f'# TYPE {name} gauge')
+                    lines.append(f'{name} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _request_labels(request: HttpRequest) -> Tuple[str, str]:
+    """ リクエストのview・methodラベル
+    クライアントが任意の値を送れる部分はそのまま使わず、取り得る値を限定する
+
+    Parameters
+    ----------
+    request: HttpRequest
+        集計対象のリクエスト
+
+    Returns
+    -------
+    labels: Tuple[str, str]
+        URL定義の名前(解決できない場合はUNMATCHED_VIEW)・HTTPメソッド(KNOWN_METHODS以外はOTHER_METHOD)
+    """
+
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match is not None and match.view_name else UNMATCHED_VIEW
+    method = request.method if request.method in KNOWN_METHODS else OTHER_METHOD
+
+    return view, method
+
+
+def _component_stats() -> List[Tuple[str, Dict[str, Any]]]:
+    """ 有効化されている部品の統計情報 """
+
+    components: List[Tuple[str, Any]] = [
+        ('user_cache', get_user_cache()),
+        ('hashing', get_hashing_executor()),
+        ('username_filter', get_username_filter()),
+        ('page_cache', get_page_cache()),
+    ]
+
+    stats = [(name, component.stats()) for name, component in components if component is not None]
+    # 接続の取得待ち時間などを、DBごとに出力
+    stats += [(f'db_pool_{alias}', pool_stats(pool)) for alias, pool in get_connection_pools()]
+
+    return stats
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+
+    escaped = (
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_metrics_registry: Optional[MetricsRegistry] = None
+_metrics_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> Optional[MetricsRegistry]:
+    """ 設定値METRICSをもとに集計先を取得
+
+    Returns
+    -------
+    metrics_registry: MetricsRegistry
+        計測が無効化されている場合はNone
+    """
+
+    global _metrics_registry
+
+    config: Dict[str, Any] = getattr(settings, 'METRICS', {})
+
+    if not config.get('ENABLED', False):
+        return None
+
+    if _metrics_registry is None:
+        with _metrics_registry_lock:
+            if _metrics_registry is None:
+                _metrics_registry = MetricsRegistry()
+
+    return _metrics_registry
+
+
+def reset_metrics_registry() -> None:
+    """ 設定変更時などに集計値を破棄 """
+
+    global _metrics_registry
+
+    with _metrics_registry_lock:
+        _metrics_registry = None
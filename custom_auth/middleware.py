@@ -0,0 +1,143 @@
+import time
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.http import HttpRequest, HttpResponse
+from django.utils.functional import SimpleLazyObject
+
+from .claims import get_claims_user, is_claims_enabled
+from .metrics import get_metrics_registry, recording
+from .routers import PIN_COOKIE_SALT, RoutingState, get_replicas, get_routing_settings, is_pinned, routing
+
+
+class ClaimsAuthenticationMiddleware(AuthenticationMiddleware):
+    """ セッションのクレームからrequest.userを構築する認証ミドルウェア
+    クレームモードが無効な場合は、Django標準の認証ミドルウェアと同様に振る舞う
+    """
+
+    def process_request(self, request: HttpRequest) -> None:
+        super().process_request(request)
+
+        if not is_claims_enabled():
+            return
+
+        def get_user() -> object:
+            if not hasattr(request, '_cached_user'):
+                request._cached_user = get_claims_user(request)
+            return request._cached_user
+
+        # 非同期版のViewから参照される
+        async def auser() -> object:
+            if not hasattr(request, '_acached_user'):
+                request._acached_user = await sync_to_async(get_claims_user)(request)
+            return request._acached_user
+
+        request.user = SimpleLazyObject(get_user)
+        request.auser = auser
+
+
+class MetricsMiddleware:
+    """ リクエストの所要時間・問い合わせ数を計測し、設定値METRICSで有効化された集計先へ記録するミドルウェア
+    セッションの読み書き・認証も計測範囲へ含めるよう、MIDDLEWAREの先頭へ配置する
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        registry = get_metrics_registry()
+
+        if registry is None:
+            return self.get_response(request)
+
+        started_at = time.perf_counter()
+
+        with recording() as recorder:
+            response = self.get_response(request)
+
+        registry.record_request(request, response, recorder, time.perf_counter() - started_at)
+
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        registry = get_metrics_registry()
+
+        if registry is None:
+            return await self.get_response(request)
+
+        started_at = time.perf_counter()
+
+        with recording() as recorder:
+            response = await self.get_response(request)
+
+        registry.record_request(request, response, recorder, time.perf_counter() - started_at)
+
+        return response
+
+
+class PrimaryPinningMiddleware:
+    """ 書き込んだクライアントの読み取りを、一定時間プライマリへ固定するミドルウェア
+    セッションの保存も書き込みとして扱うよう、SessionMiddlewareより前へ配置する
+    レプリカが設定されていない場合は何もしない
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not get_replicas():
+            return self.get_response(request)
+
+        with routing(is_pinned(request)) as state:
+            response = self.get_response(request)
+
+        return self._pin(response, state)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not get_replicas():
+            return await self.get_response(request)
+
+        with routing(is_pinned(request)) as state:
+            response = await self.get_response(request)
+
+        return self._pin(response, state)
+
+    def _pin(self, response: HttpResponse, state: RoutingState) -> HttpResponse:
+        """ 書き込んだ場合は、固定期間の終了時刻を署名付きでクッキーへ記録 """
+
+        if not state.wrote:
+            return response
+
+        routing_settings = get_routing_settings()
+        pin_seconds = routing_settings.get('PIN_SECONDS', 5)
+        response.set_signed_cookie(
+            routing_settings.get('COOKIE_NAME', 'db_primary_pin'),
+            f'{time.time() + pin_seconds:.0f}',
+            salt=PIN_COOKIE_SALT,
+            max_age=pin_seconds,
+            httponly=True,
+            secure=settings.SESSION_COOKIE_SECURE,
+            samesite='Lax',
+        )
+
+        return response
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('username', models.CharField(max_length=255, unique=True)),
+                ('password', models.CharField(max_length=255)),
+                ('is_admin', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'm_user',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_variant_duplicates(apps, schema_editor):
+    """ 大文字小文字のみが異なるユーザ名が登録済みの場合は、一意制約を追加できないため中断する """
+
+    User = apps.get_model('custom_auth', 'User')
+    duplicates = list(
+        User.objects.annotate(username_lower=Lower('username'))
+        .values('username_lower')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('username_lower', flat=True)[:20]
+    )
+
+    if duplicates:
+        raise RuntimeError(
+            'm_user contains usernames that differ only in case; rename them before migrating: '
+            + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_variant_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('username'), name='m_user_username_lower_uniq'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0002_username_lower_uniq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['username'], include=('id', 'password', 'is_admin'), name='m_user_login_covering_idx'),
+        ),
+    ]
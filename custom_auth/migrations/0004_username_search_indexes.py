@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    """ ユーザ一覧の検索用のインデックスを作成する PostgreSQL以外では何もしない
+    USER_DIRECTORYのSEARCHによらず作成し、設定値を切り替えても索引が存在するようにする
+
+    m_user_username_lower_like_idx: 大文字小文字を区別しない前方一致(LOWER(username) LIKE 'q%')用
+        照合順序がCでないDBでも範囲検索とできるよう、text_pattern_opsで作成する
+    m_user_username_trgm_idx: 部分一致(SEARCH='trigram')用のpg_trgmのGINインデックス
+
+    pg_trgm拡張の作成には拡張を作成できる権限が必要 migrateを実行するロールに権限がない場合は、
+    DBの管理者が事前に CREATE EXTENSION pg_trgm を実行しておく(導入済みの場合は作成しない)
+    """
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE INDEX IF NOT EXISTS m_user_username_lower_like_idx ON m_user (lower(username) text_pattern_ops)')
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        installed = cursor.fetchone() is not None
+
+    if not installed:
+        schema_editor.execute('CREATE EXTENSION pg_trgm')
+
+    schema_editor.execute('CREATE INDEX IF NOT EXISTS m_user_username_trgm_idx ON m_user USING gin (username gin_trgm_ops)')
+
+
+def drop_search_indexes(apps, schema_editor):
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('DROP INDEX IF EXISTS m_user_username_trgm_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS m_user_username_lower_like_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0003_login_covering_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
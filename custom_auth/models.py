@@ -1,16 +1,96 @@
 from __future__ import annotations
 
-from django.db import models
+from typing import Iterable
+
+from django.conf import settings
+from django.db import IntegrityError, models
 from django.db.models import CharField, BooleanField
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractBaseUser
 
 
+def is_case_insensitive_username() -> bool:
+    """ 設定値USERNAME_CASE_INSENSITIVEにより、ログイン時のユーザ名の大文字小文字を区別しないか """
+
+    return getattr(settings, 'USERNAME_CASE_INSENSITIVE', False)
+
+
+def normalize_username_key(username: str) -> str:
+    """ ユーザ名の重複を判定するためのキー
+    大文字小文字のみが異なるユーザ名は設定値によらず登録できないため(m_user_username_lower_uniq)、常に小文字へ揃える
+    """
+
+    return username.lower()
+
+
+def is_username_conflict(error: IntegrityError) -> bool:
+    """ 一意制約違反が、ユーザ名の重複によるものか
+    ユーザ名のunique(PostgreSQLではm_user_username_key)・m_user_username_lower_uniqのいずれかの違反を対象とする
+
+    Parameters
+    ----------
+    error: IntegrityError
+        登録時に送出された例外
+
+    Returns
+    -------
+    bool
+        ユーザ名の重複による場合はTrue
+    """
+
+    # psycopgは違反した制約名を保持する
+    constraint_name = getattr(getattr(error.__cause__, 'diag', None), 'constraint_name', None)
+    if constraint_name:
+        return constraint_name.startswith('m_user_username')
+
+    # SQLite: UNIQUE constraint failed: m_user.username / index 'm_user_username_lower_uniq'
+    message = str(error)
+    return 'm_user.username' in message or 'm_user_username' in message
+
+
+class UserQuerySet(models.QuerySet):
+    """ ユーザ名による検索
+    ログインは大文字小文字を区別するかに応じて切り替え、重複の判定は常にlower(username)で比較する
+    lower(username)での比較には、関数インデックスm_user_username_lower_uniqを利用する
+    """
+
+    def filter_username(self, username: str) -> UserQuerySet:
+        """ ログインするユーザ名に一致するユーザへ絞り込む """
+
+        if is_case_insensitive_username():
+            return self.filter_username_taken(username)
+
+        return self.filter(username=username)
+
+    def filter_username_taken(self, username: str) -> UserQuerySet:
+        """ 大文字小文字のみが異なるユーザも含めて、ユーザ名が重複するユーザへ絞り込む """
+
+        return self.alias(username_lower=Lower('username')).filter(username_lower=normalize_username_key(username))
+
+    def filter_username_taken_in(self, usernames: Iterable[str]) -> UserQuerySet:
+        """ いずれかのユーザ名と重複するユーザへ絞り込む """
+
+        return self.alias(username_lower=Lower('username')).filter(username_lower__in=[normalize_username_key(username) for username in usernames])
+
+
 class User(AbstractBaseUser):
     """ 認証用ユーザ
     """
 
     class Meta:
         db_table = 'm_user'
+        constraints = [
+            # 大文字小文字のみが異なるユーザ名を登録させない USERNAME_CASE_INSENSITIVEによらず常に有効
+            # 重複の判定・大文字小文字を区別しないログインでの検索でも利用
+            models.UniqueConstraint(Lower('username'), name='m_user_username_lower_uniq'),
+        ]
+        indexes = [
+            # ログイン時のユーザ取得をテーブルへアクセスしないIndex Only Scanとする INCLUDEに対応しないDB(SQLiteなど)では作成されない
+            # 一意性の検証・前方一致検索は、unique=Trueによる索引(PostgreSQLではLIKE用のvarchar_pattern_opsの索引も)で行う
+            models.Index(fields=['username'], include=['id', 'password', 'is_admin'], name='m_user_login_covering_idx'),
+        ]
+
+    objects = models.Manager.from_queryset(UserQuerySet)()
 
     USERNAME_FIELD = 'username'
 
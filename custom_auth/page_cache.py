@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+
+class PageCache:
+    """ 描画済みのページをテンプレート・権限ごとに保持するキャッシュ
+    ユーザ・リクエストごとに内容が変わらないページ(CSRFトークンなどを含まないもの)に限って利用する
+    テンプレートと権限の組は限られるため、プロセス内に保持する
+
+    Attributes
+    ----------
+    version: str
+        デプロイごとに変更し、以前のテンプレートで描画したページを参照させないためのキー
+    timeout: float
+        エントリの有効期間(秒)
+    hits: int
+        キャッシュヒット数
+    misses: int
+        キャッシュミス数
+    """
+
+    def __init__(self, version: str='1', timeout: float=3600):
+        self.version = version
+        self.timeout = timeout
+        self._entries: Dict[Tuple[str, str, str], Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, template_name: str, role: str) -> Optional[bytes]:
+        """ 描画済みのページを取得
+
+        Parameters
+        ----------
+        template_name: str
+            テンプレート名
+        role: str
+            ページを表示する権限 admin or user
+
+        Returns
+        -------
+        content: bytes
+            キャッシュに存在しない・有効期限切れの場合はNone
+        """
+
+        key = (self.version, template_name, role)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < now:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[1]
+
+    def set(self, template_name: str, role: str, content: bytes) -> None:
+        """ 描画したページを格納 """
+
+        with self._lock:
+            self._entries[(self.version, template_name, role)] = (time.monotonic() + self.timeout, content)
+
+    def clear(self) -> None:
+        """ すべてのページを破棄 """
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """ 統計情報
+
+        Returns
+        -------
+        stats: Dict[str, Any]
+            hits, misses, size
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+            }
+
+
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """ 設定値PAGE_CACHEをもとにページキャッシュを取得
+
+    Returns
+    -------
+    page_cache: PageCache
+        キャッシュが無効化されている場合はNone
+    """
+
+    global _page_cache
+
+    config: Dict[str, Any] = getattr(settings, 'PAGE_CACHE', {})
+
+    if not config.get('ENABLED', False):
+        return None
+
+    if _page_cache is None:
+        with _page_cache_lock:
+            if _page_cache is None:
+                _page_cache = PageCache(
+                    version=str(config.get('VERSION', '1')),
+                    timeout=config.get('TIMEOUT', 3600),
+                )
+
+    return _page_cache
+
+
+def reset_page_cache() -> None:
+    """ 設定変更時などにキャッシュを作り直す """
+
+    global _page_cache
+
+    with _page_cache_lock:
+        _page_cache = None
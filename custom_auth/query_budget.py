@@ -0,0 +1,224 @@
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from .exceptions import QueryBudgetExceededException
+
+logger = logging.getLogger(__name__)
+
+# トランザクション制御はDBごとに発行のされ方が異なるため、問い合わせ数へ含めない
+TRANSACTION_STATEMENT = re.compile(r'^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+
+
+class QueryLog:
+    """ 1リクエスト内で発行したSQL
+    SQLはパラメータを埋め込む前の形で保持するため、値のみが異なる問い合わせは同一のものとして扱う
+
+    Attributes
+    ----------
+    statements: List[str]
+        発行したSQL トランザクション制御は除く
+    """
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def duplicates(self, threshold: int=2) -> List[Tuple[str, int]]:
+        """ 繰り返し発行されたSQL N+1問い合わせの検出に用いる
+
+        Parameters
+        ----------
+        threshold: int
+            重複とみなす発行回数
+
+        Returns
+        -------
+        duplicates: List[Tuple[str, int]]
+            SQLと発行回数の組
+        """
+
+        return [(sql, count) for sql, count in Counter(self.statements).most_common() if count >= threshold]
+
+
+# 記録中のSQL テストのヘルパとミドルウェアのように入れ子で記録できるよう、記録先を複数保持する
+# sync_to_asyncで実行される処理にも引き継がれる
+_current_logs: ContextVar[Tuple[QueryLog, ...]] = ContextVar('custom_auth_query_logs', default=())
+
+
+def collect_queries(execute: Callable[..., Any], sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """ 記録中のSQLを保持するDB接続のexecute_wrapper """
+
+    query_logs = _current_logs.get()
+
+    if query_logs and not TRANSACTION_STATEMENT.match(sql):
+        for query_log in query_logs:
+            query_log.statements.append(sql)
+
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """ ブロック内で発行したSQLを記録 """
+
+    query_log = QueryLog()
+    token = _current_logs.set(_current_logs.get() + (query_log,))
+
+    try:
+        yield query_log
+    finally:
+        _current_logs.reset(token)
+
+
+def get_query_budget(view_name: str, method: str) -> Optional[int]:
+    """ 設定値QUERY_BUDGETに宣言された、Viewの問い合わせ数の上限
+
+    Parameters
+    ----------
+    view_name: str
+        URLの名前 login:loginなど
+    method: str
+        HTTPメソッド
+
+    Returns
+    -------
+    budget: int
+        上限 宣言されていない場合はNone
+    """
+
+    budgets: Dict[str, Dict[str, int]] = getattr(settings, 'QUERY_BUDGET', {}).get('BUDGETS', {})
+
+    return budgets.get(view_name, {}).get(method.upper())
+
+
+def check_query_budget(view_name: str, method: str, query_log: QueryLog) -> List[str]:
+    """ 問い合わせ数の上限・重複を検証
+
+    Parameters
+    ----------
+    view_name: str
+        URLの名前
+    method: str
+        HTTPメソッド
+    query_log: QueryLog
+        リクエスト内で発行したSQL
+
+    Returns
+    -------
+    violations: List[str]
+        上限の超過・重複の内容 問題がない場合は空
+    """
+
+    config: Dict[str, Any] = getattr(settings, 'QUERY_BUDGET', {})
+    violations: List[str] = []
+    budget = get_query_budget(view_name, method)
+
+    if budget is not None and len(query_log) > budget:
+        violations.append(f'{method} {view_name} issued {len(query_log)} queries (budget {budget})')
+
+    if config.get('DETECT_DUPLICATES', True):
+        for sql, count in query_log.duplicates(config.get('DUPLICATE_THRESHOLD', 2)):
+            violations.append(f'{method} {view_name} repeated {count} times: {sql}')
+
+    return violations
+
+
+@contextmanager
+def assert_query_budget(view_name: str, method: str) -> Iterator[QueryLog]:
+    """ ブロック内の問い合わせ数が、Viewに宣言された上限以内かを検証するテスト用のヘルパ
+
+    Parameters
+    ----------
+    view_name: str
+        URLの名前
+    method: str
+        HTTPメソッド
+
+    Raises
+    ------
+    AssertionError
+        上限を超過した、もしくは同じSQLを繰り返し発行した場合
+    """
+
+    if get_query_budget(view_name, method) is None:
+        raise AssertionError(f'No query budget is declared for {method} {view_name}')
+
+    with capture_queries() as query_log:
+        yield query_log
+
+    violations = check_query_budget(view_name, method, query_log)
+
+    if violations:
+        raise AssertionError('\n'.join(violations + ['Queries:'] + query_log.statements))
+
+
+class QueryBudgetMiddleware:
+    """ 開発環境でViewの問い合わせ数の上限超過・重複を検出するミドルウェア
+    設定値QUERY_BUDGETのMODEが、warn -> 警告を出力 raise -> 例外を送出 off -> 何もしない
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]):
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if self._mode() == 'off':
+            return self.get_response(request)
+
+        with capture_queries() as query_log:
+            response = self.get_response(request)
+
+        self._report(request, query_log)
+
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if self._mode() == 'off':
+            return await self.get_response(request)
+
+        with capture_queries() as query_log:
+            response = await self.get_response(request)
+
+        self._report(request, query_log)
+
+        return response
+
+    def _mode(self) -> str:
+        return getattr(settings, 'QUERY_BUDGET', {}).get('MODE', 'off')
+
+    def _report(self, request: HttpRequest, query_log: QueryLog) -> None:
+        """ 上限の超過・重複を設定に応じて警告・例外として通知 """
+
+        match = getattr(request, 'resolver_match', None)
+
+        if match is None or not match.view_name:
+            return
+
+        violations = check_query_budget(match.view_name, request.method or '', query_log)
+
+        if not violations:
+            return
+
+        if self._mode() == 'raise':
+            raise QueryBudgetExceededException('\n'.join(violations))
+
+        for violation in violations:
+            logger.warning(violation)
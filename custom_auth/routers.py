@@ -0,0 +1,129 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest
+
+
+class RoutingState:
+    """ 1リクエスト内のDBの振り分け状態
+
+    Attributes
+    ----------
+    pinned: bool
+        読み取りもプライマリで行うか 直前に書き込んだクライアント・書き込み後の読み取りではTrue
+    wrote: bool
+        リクエスト内でプライマリへ書き込んだか
+    """
+
+    def __init__(self, pinned: bool=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+# 固定期間を記録するクッキーの署名用のソルト
+PIN_COOKIE_SALT = 'custom_auth.routers.pin'
+
+_current_state: ContextVar[Optional[RoutingState]] = ContextVar('custom_auth_routing_state', default=None)
+
+
+def get_routing_settings() -> Any:
+    """ 設定値DB_ROUTING """
+
+    return getattr(settings, 'DB_ROUTING', {})
+
+
+def get_replicas() -> List[str]:
+    """ 読み取りを振り分けるレプリカのエイリアス """
+
+    return get_routing_settings().get('REPLICAS', [])
+
+
+@contextmanager
+def routing(pinned: bool=False) -> Iterator[RoutingState]:
+    """ ブロック内の処理を1リクエストとして振り分ける
+
+    Parameters
+    ----------
+    pinned: bool
+        リクエストの開始時点から、読み取りもプライマリで行うか
+    """
+
+    state = RoutingState(pinned)
+    token = _current_state.set(state)
+
+    try:
+        yield state
+    finally:
+        _current_state.reset(token)
+
+
+def is_pinned(request: HttpRequest) -> bool:
+    """ 直前に書き込んだクライアントからのリクエストか クッキーへ記録した固定期間の終了時刻で判定
+    クライアントがクッキーを書き換えてプライマリへ読み取りを集中させられないよう、署名を検証する
+    """
+
+    routing_settings = get_routing_settings()
+
+    try:
+        pinned_until = float(request.get_signed_cookie(
+            routing_settings.get('COOKIE_NAME', 'db_primary_pin'),
+            default=0,
+            salt=PIN_COOKIE_SALT,
+            max_age=routing_settings.get('PIN_SECONDS', 5),
+        ))
+    except ValueError:
+        return False
+
+    return pinned_until > time.time()
+
+
+class PrimaryReplicaRouter:
+    """ 読み取りをレプリカへ、書き込みをプライマリ(default)へ振り分けるDBルータ
+
+    レプリカは非同期に複製されるため、書き込んだ直後は変更が反映されていない場合がある
+    書き込んだリクエストの以降の読み取り、およびPIN_SECONDSの間は同じクライアントの読み取りもプライマリで行い、
+    登録直後のユーザがログインできるようにする(read-your-writes)
+    """
+
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        replicas = get_replicas()
+
+        if not replicas:
+            return None
+
+        state = _current_state.get()
+
+        # トランザクション内の読み取りは、書き込みと同じ接続で行う
+        if (state is not None and state.pinned) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return random.choice(replicas)
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        state = _current_state.get()
+
+        if state is not None:
+            state.wrote = True
+            state.pinned = True
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Any, obj2: Any, **hints: Any) -> Optional[bool]:
+        aliases = {DEFAULT_DB_ALIAS, *get_replicas()}
+
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, model_name: Optional[str]=None, **hints: Any) -> Optional[bool]:
+        # レプリカへはプライマリから複製される
+        if db in get_replicas():
+            return False
+
+        return None
@@ -0,0 +1,87 @@
+from typing import Optional
+
+from django.contrib.sessions.backends.base import VALID_KEY_CHARS, CreateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils.crypto import get_random_string
+
+
+class SessionStore(CachedDBStore):
+    """ ログイン・ログアウトで発行する問い合わせを減らしたセッション
+
+    Django標準のcached_dbを元に、以下を変更する
+    ・セッションの参照はキャッシュから行い、キャッシュに存在しない場合のみDBを参照する
+    ・鍵の発行時に既存の鍵と重複しないかを問い合わせず、INSERT時の一意制約違反で検出して発行し直す
+    ・ログイン時の鍵の発行(cycle_key)ではINSERTせず、レスポンス時の保存で1回のINSERTとする
+    ・削除は取得してから削除せず、1回のDELETEで行う
+
+    キャッシュにはSESSION_CACHE_ALIASを利用する 複数プロセスで動かす場合は、プロセス間で共有するキャッシュを指定する
+    """
+
+    def __init__(self, session_key: Optional[str]=None):
+        super().__init__(session_key)
+        # 鍵のみを発行し、まだDBへ保存していないか
+        self._pending_insert = False
+
+    def _get_new_session_key(self) -> str:
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    async def _aget_new_session_key(self) -> str:
+        return self._get_new_session_key()
+
+    def create(self) -> None:
+        self._session_key = self._get_new_session_key()
+        self._pending_insert = True
+        self.modified = True
+
+    async def acreate(self) -> None:
+        self.create()
+
+    def save(self, must_create: bool=False) -> None:
+        if self.session_key is None:
+            self.create()
+
+        if not self._pending_insert:
+            return super().save(must_create)
+
+        while True:
+            try:
+                super().save(must_create=True)
+                break
+            except CreateError:
+                self._session_key = self._get_new_session_key()
+
+        self._pending_insert = False
+
+    async def asave(self, must_create: bool=False) -> None:
+        if self.session_key is None:
+            self.create()
+
+        if not self._pending_insert:
+            return await super().asave(must_create)
+
+        while True:
+            try:
+                await super().asave(must_create=True)
+                break
+            except CreateError:
+                self._session_key = self._get_new_session_key()
+
+        self._pending_insert = False
+
+    def delete(self, session_key: Optional[str]=None) -> None:
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+
+        self.model.objects.filter(session_key=session_key).delete()
+        self._cache.delete(self.cache_key_prefix + session_key)
+
+    async def adelete(self, session_key: Optional[str]=None) -> None:
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+
+        await self.model.objects.filter(session_key=session_key).adelete()
+        await self._cache.adelete(self.cache_key_prefix + session_key)
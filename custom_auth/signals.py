@@ -0,0 +1,97 @@
+from typing import Any
+
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import get_user_cache, reset_user_cache
+from .claims import revoke_claims
+from .hashers import load_tuned_params
+from .hashing import reset_hashing_executor
+from .log import log_queries
+from .metrics import count_queries, reset_metrics_registry
+from .models import User
+from .page_cache import reset_page_cache
+from .query_budget import collect_queries
+from .throttle import reset_login_throttle
+from .username_filter import get_username_filter, reset_username_filter
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender: Any, instance: User, **kwargs: Any) -> None:
+    """ ユーザの更新・削除時にキャッシュを破棄
+    コミット前に他のリクエストが古い値を再格納し得るため、コミット後にも再度破棄する
+    """
+
+    user_cache = get_user_cache()
+
+    if user_cache is None:
+        return
+
+    user_id = instance.pk
+    user_cache.invalidate(user_id)
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def revoke_user_claims(sender: Any, instance: User, created: bool=False, update_fields: Any=None, **kwargs: Any) -> None:
+    """ ユーザの更新・削除時に、セッションへ埋め込んだクレームを失効させる
+    キャッシュと同様に、コミット前に古い値で発行し直され得るため、コミット後にも再度失効させる
+    """
+
+    # 登録時は発行済みのクレームが存在せず、最終ログイン日時の更新はクレームの項目に影響しない
+    if created or (update_fields is not None and set(update_fields) == {'last_login'}):
+        return
+
+    user_id = instance.pk
+    revoke_claims(user_id)
+    transaction.on_commit(lambda: revoke_claims(user_id))
+
+
+@receiver(post_save, sender=User)
+def add_username_to_filter(sender: Any, instance: User, created: bool, **kwargs: Any) -> None:
+    """ 登録したユーザ名をユーザ名のフィルタへ反映 """
+
+    username_filter = get_username_filter()
+
+    if created and username_filter is not None:
+        username_filter.add(instance.username)
+
+
+@receiver(connection_created)
+def install_query_counter(sender: Any, connection: Any, **kwargs: Any) -> None:
+    """ リクエストごとの問い合わせ数の計測・上限の検証、SQLの出力のため、DB接続へexecute_wrapperを登録 """
+
+    for wrapper in (count_queries, collect_queries, log_queries):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+@receiver(setting_changed)
+def reset_on_setting_changed(setting: str, **kwargs: Any) -> None:
+    """ テストなどで設定値が差し替えられた場合に、設定値から構築したオブジェクトを作り直す """
+
+    if setting == 'USER_CACHE':
+        reset_user_cache()
+
+    if setting == 'PASSWORD_HASHING_EXECUTOR':
+        reset_hashing_executor()
+
+    if setting == 'PASSWORD_HASHER_PARAMS_FILE':
+        load_tuned_params.cache_clear()
+
+    if setting == 'USERNAME_FILTER':
+        reset_username_filter()
+
+    if setting == 'LOGIN_THROTTLE':
+        reset_login_throttle()
+
+    if setting == 'METRICS':
+        reset_metrics_registry()
+
+    if setting == 'PAGE_CACHE':
+        reset_page_cache()
@@ -0,0 +1,162 @@
+import gzip
+import os
+from typing import Any, Iterator, Optional, Set, Tuple
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # brotliは任意 未インストールの場合はgzipのみ生成
+    brotli = None
+
+# 圧縮する拡張子 画像・フォントなど圧縮済みの形式は除く
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map')
+# 圧縮しても転送量がほとんど変わらない小さなファイルは除く
+MIN_COMPRESS_SIZE = 256
+
+# 圧縮形式ごとの拡張子
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ 内容のハッシュ値をファイル名へ付与し、gzip・brotliで圧縮したファイルを併せて生成するストレージ
+    圧縮はcollectstaticの実行時に1度だけ行い、リクエストごとには圧縮しない
+    """
+
+    def post_process(self, paths: Any, dry_run: bool=False, **options: Any) -> Iterator[Tuple[str, Optional[str], Any]]:
+        compress_names: Set[str] = set()
+
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                compress_names.update((name, hashed_name))
+
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        # ハッシュ値の付与は複数回に分けて行われるため、すべて完了した後に圧縮
+        for name in sorted(compress_names):
+            self.compress(name)
+
+    def compress(self, name: str) -> None:
+        """ ファイルのgzip・brotli版を生成 圧縮しても小さくならない場合は生成しない
+
+        Parameters
+        ----------
+        name: str
+            STATIC_ROOTからの相対パス
+        """
+
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+
+        with self.open(name) as original:
+            content = original.read()
+
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+
+        # 同じ内容からは同じファイルが生成されるよう、更新日時を含めない
+        variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(content, quality=11)
+
+        for encoding, compressed in variants.items():
+            if len(compressed) >= len(content):
+                continue
+
+            compressed_name = name + ENCODING_SUFFIXES[encoding]
+
+            # 既存のファイルは別名で保存されないよう、先に削除
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+
+            self._save(compressed_name, ContentFile(compressed))
+
+
+def parse_accept_encoding(header: str) -> Set[str]:
+    """ Accept-Encodingヘッダから、クライアントが受け付ける圧縮形式を取得
+
+    Parameters
+    ----------
+    header: str
+        Accept-Encodingヘッダの値 例: 'gzip, deflate, br;q=0.9'
+
+    Returns
+    -------
+    Set[str]
+        受け付ける圧縮形式 q=0で拒否された形式は含まない
+    """
+
+    accepted: Set[str] = set()
+
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if coding and quality > 0:
+            accepted.add(coding)
+
+    return accepted
+
+
+def select_encoding(header: str, full_path: str) -> Tuple[Optional[str], str]:
+    """ クライアントが受け付け、かつ事前に生成された圧縮ファイルを選択 brotli・gzipの順で優先する
+
+    Parameters
+    ----------
+    header: str
+        Accept-Encodingヘッダの値
+    full_path: str
+        圧縮前のファイルの絶対パス
+
+    Returns
+    -------
+    Tuple[Optional[str], str]
+        Content-Encodingの値(圧縮しない場合はNone)と、配信するファイルの絶対パス
+    """
+
+    accepted = parse_accept_encoding(header)
+
+    for encoding in ('br', 'gzip'):
+        if encoding not in accepted and '*' not in accepted:
+            continue
+
+        compressed_path = full_path + ENCODING_SUFFIXES[encoding]
+        if os.path.isfile(compressed_path):
+            return encoding, compressed_path
+
+    return None, full_path
+
+
+def is_hashed_name(storage: Any, name: str) -> bool:
+    """ 内容のハッシュ値が付与されたファイル名か判定
+    ハッシュ値付きのファイルは内容が変わると名前も変わるため、期限を設けずにキャッシュさせられる
+
+    Parameters
+    ----------
+    storage: Any
+        静的ファイルのストレージ ManifestStaticFilesStorage以外では常にFalse
+    name: str
+        STATIC_ROOTからの相対パス
+
+    Returns
+    -------
+    bool
+        マニフェストへハッシュ値付きの名前として記録されている場合はTrue
+    """
+
+    hashed_files = getattr(storage, 'hashed_files', None)
+
+    return bool(hashed_files) and name in hashed_files.values()
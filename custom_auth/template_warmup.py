@@ -0,0 +1,73 @@
+import os
+from typing import Any, List, Tuple
+
+from django.conf import settings
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+
+
+def compile_templates() -> Tuple[List[str], List[Tuple[str, str]]]:
+    """ テンプレートディレクトリ配下のすべてのテンプレートを、各テンプレートエンジンで読み込む
+    キャッシュローダ・Jinja2の環境が、解析済みのテンプレートをプロセス内に保持する
+
+    Returns
+    -------
+    compiled, failed: Tuple[List[str], List[Tuple[str, str]]]
+        読み込んだテンプレート名と、読み込めなかったテンプレート名・理由の組
+    """
+
+    compiled: List[str] = []
+    failed: List[Tuple[str, str]] = []
+
+    for engine in engines.all():
+        directories = [str(directory) for directory in engine.dirs]
+        if _uses_app_directories(engine):
+            directories += [str(directory) for directory in get_app_template_dirs(engine.app_dirname)]
+
+        for template_name in _find_templates(directories):
+            try:
+                engine.get_template(template_name)
+
+            # 他のエンジン向けのテンプレート・静的ファイルは読み込めないため、理由を記録して続行
+            except Exception as exception:
+                failed.append((f'{engine.name}:{template_name}', str(exception)))
+                continue
+
+            compiled.append(f'{engine.name}:{template_name}')
+
+    return compiled, failed
+
+
+def _uses_app_directories(engine: Any) -> bool:
+    """ アプリケーションのテンプレートディレクトリを参照するか loadersを明示した場合はapp_directories.Loaderの有無で判定 """
+
+    if engine.app_dirs:
+        return True
+
+    loaders = getattr(getattr(engine, 'engine', None), 'loaders', [])
+
+    return 'django.template.loaders.app_directories.Loader' in repr(loaders)
+
+
+def _find_templates(directories: List[str]) -> List[str]:
+    """ ディレクトリ配下のHTMLファイルを、ディレクトリからの相対パスで列挙 """
+
+    template_names = set()
+
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+
+            for file_name in files:
+                if file_name.endswith('.html'):
+                    template_names.add(os.path.relpath(os.path.join(root, file_name), directory).replace(os.sep, '/'))
+
+    return sorted(template_names)
+
+
+def warm_templates() -> None:
+    """ 設定値TEMPLATE_WARMUPが有効な場合、プロセスの起動時にテンプレートを読み込み、最初のリクエストで解析処理を待たせない """
+
+    if not getattr(settings, 'TEMPLATE_WARMUP', False):
+        return
+
+    compile_templates()
@@ -0,0 +1,267 @@
+from django.http import HttpResponse
+from django.test import Client
+from django.urls import include, path, reverse_lazy
+
+import json
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..api_views import dumps
+from ..models import User
+
+# 非同期版のAPIを検証するためのURL
+urlpatterns = [
+    path('login/api/', include('custom_auth.async_api_urls')),
+    path('login/', include('custom_auth.async_urls')),
+]
+
+
+def post_json(client: Client, name: str, data: dict) -> HttpResponse:
+    """ JSONのボディでPOST """
+
+    return client.post(reverse_lazy(name), data, content_type='application/json')
+
+
+class TestDumps:
+    """ レスポンスのJSONへの変換 """
+
+    def test_空白を含まず日本語をエスケープしないこと(self):
+
+        # WHEN
+        actual = dumps({'error': 'invalid', 'message': 'ユーザ名'})
+
+        # THEN
+        assert actual == '{"error":"invalid","message":"ユーザ名"}'.encode('utf-8')
+
+
+@pytest.mark.django_db(transaction=False)
+class TestApiView:
+
+    class TestLoginApiView:
+        """ ログインAPI """
+
+        def test_ログイン成功するとユーザの情報が得られること(self, multiple_users):
+
+            # WHEN
+            response: HttpResponse = post_json(Client(), 'api:login', {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+            # THEN
+            assert response.status_code == 200
+            assert response['Content-Type'] == 'application/json'
+            assert json.loads(response.content) == {'id': multiple_users[0].id, 'username': 'a-pompom0107', 'is_admin': True}
+
+        def test_ログイン後はログイン中のユーザが得られること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            post_json(client, 'api:login', {'username': 'johnDoe__9807', 'password': 'mYPoWErfUl00PaSSwoRd'})
+
+            # WHEN
+            response: HttpResponse = client.get(reverse_lazy('api:me'))
+
+            # THEN
+            assert json.loads(response.content)['username'] == 'johnDoe__9807'
+
+        def test_パスワードが誤っていると401が返ること(self, multiple_users):
+
+            # WHEN
+            response: HttpResponse = post_json(Client(), 'api:login', {'username': 'a-pompom0107', 'password': 'validButIncorrectPassword'})
+
+            # THEN
+            assert response.status_code == 401
+            assert json.loads(response.content)['error'] == 'invalid_credentials'
+
+        def test_フォームから送信すると415が返ること(self, multiple_users):
+
+            # WHEN
+            response: HttpResponse = Client().post(reverse_lazy('api:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+            # THEN
+            assert response.status_code == 415
+            assert '_auth_user_id' not in Client().session
+
+        def test_JSONとして解釈できないと400が返ること(self):
+
+            # WHEN
+            response: HttpResponse = Client().post(reverse_lazy('api:login'), '{"username": ', content_type='application/json')
+
+            # THEN
+            assert response.status_code == 400
+            assert json.loads(response.content) == {'error': 'invalid_json'}
+
+        def test_CSRFトークンなしでログインできること(self, multiple_users):
+
+            # GIVEN
+            client = Client(enforce_csrf_checks=True)
+
+            # WHEN
+            response: HttpResponse = post_json(client, 'api:login', {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+            # THEN
+            assert response.status_code == 200
+
+        def test_GETリクエストには405が返ること(self):
+
+            # WHEN
+            response: HttpResponse = Client().get(reverse_lazy('api:login'))
+
+            # THEN
+            assert response.status_code == 405
+            assert response['Allow'] == 'POST, OPTIONS'
+
+        def test_試行回数の上限を超えると429が返ること(self, settings, multiple_users):
+
+            # GIVEN
+            settings.LOGIN_THROTTLE = {'ENABLED': True, 'BACKEND': 'local', 'IP_RATE': 0.01, 'IP_BURST': 3, 'USERNAME_RATE': 0.01, 'USERNAME_BURST': 1}
+            client = Client()
+            post_json(client, 'api:login', {'username': 'a-pompom0107', 'password': 'validButIncorrectPassword'})
+
+            # WHEN
+            response: HttpResponse = post_json(client, 'api:login', {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+            # THEN
+            assert response.status_code == 429
+            assert json.loads(response.content) == {'error': 'throttled'}
+            assert int(response['Retry-After']) > 0
+
+    class TestSignUpApiView:
+        """ ユーザ登録API """
+
+        def test_登録したユーザの情報が201で得られること(self):
+
+            # WHEN
+            response: HttpResponse = post_json(Client(), 'api:signup', {'username': 'testUser01', 'password': 'testPassword01'})
+
+            # THEN
+            user = User.objects.get(username='testUser01')
+            assert response.status_code == 201
+            assert json.loads(response.content) == {'id': user.id, 'username': 'testUser01', 'is_admin': False}
+
+        def test_入力誤りが項目ごとに得られること(self):
+
+            # WHEN
+            response: HttpResponse = post_json(Client(), 'api:signup', {'username': 'testUser01', 'password': ''})
+
+            # THEN
+            content = json.loads(response.content)
+            assert response.status_code == 400
+            assert content['error'] == 'invalid'
+            assert list(content['errors'].keys()) == ['password']
+
+        def test_登録済みのユーザ名を指定するとユーザ名の入力誤りが得られること(self, multiple_users):
+
+            # WHEN
+            response: HttpResponse = post_json(Client(), 'api:signup', {'username': 'a-pompom0107', 'password': 'testPassword01'})
+
+            # THEN
+            assert response.status_code == 400
+            assert json.loads(response.content)['errors']['username'] == [{'message': 'ユーザ名はすでに使用されています。', 'code': 'unique'}]
+
+    class TestLogoutApiView:
+        """ ログアウトAPI """
+
+        def test_ログアウトするとログイン中のユーザが得られないこと(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+            # WHEN
+            response: HttpResponse = client.post(reverse_lazy('api:logout'), content_type='application/json')
+
+            # THEN
+            assert response.status_code == 204
+            assert client.get(reverse_lazy('api:me')).status_code == 401
+
+        def test_フォームから送信するとログアウトしないこと(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+            # WHEN
+            response: HttpResponse = client.post(reverse_lazy('api:logout'))
+
+            # THEN
+            assert response.status_code == 415
+            assert client.get(reverse_lazy('api:me')).status_code == 200
+
+    class TestMeApiView:
+        """ ログイン中のユーザを取得するAPI """
+
+        def test_未ログインの場合は401が返ること(self):
+
+            # WHEN
+            response: HttpResponse = Client().get(reverse_lazy('api:me'))
+
+            # THEN
+            assert response.status_code == 401
+            assert json.loads(response.content) == {'error': 'unauthenticated'}
+
+        def test_ユーザの情報が共有キャッシュに格納されないこと(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+            # WHEN
+            response: HttpResponse = client.get(reverse_lazy('api:me'))
+
+            # THEN
+            assert 'no-store' in response['Cache-Control']
+            assert 'password' not in json.loads(response.content)
+
+
+@pytest.mark.django_db(transaction=False)
+class TestAsyncApiView:
+    """ 非同期版のAPI """
+
+    # 非同期版のAPIへ切り替え
+    @pytest.fixture(autouse=True)
+    def async_urlconf(self, settings):
+        settings.ROOT_URLCONF = __name__
+
+    def test_ログインしたユーザをログイン中のユーザとして取得できること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+
+        # WHEN
+        login_response: HttpResponse = post_json(client, 'api:login', {'username': 'johnDoe__9807', 'password': 'mYPoWErfUl00PaSSwoRd'})
+        me_response: HttpResponse = client.get(reverse_lazy('api:me'))
+
+        # THEN
+        assert login_response.status_code == 200
+        assert json.loads(me_response.content)['id'] == multiple_users[1].id
+
+    def test_ユーザ登録後にログアウトできること(self):
+
+        # GIVEN
+        client = Client()
+
+        # WHEN
+        signup_response: HttpResponse = post_json(client, 'api:signup', {'username': 'testUser01', 'password': 'testPassword01'})
+        logout_response: HttpResponse = client.post(reverse_lazy('api:logout'), content_type='application/json')
+
+        # THEN
+        assert signup_response.status_code == 201
+        assert logout_response.status_code == 204
+        assert User.objects.filter(username='testUser01').exists()
+
+    def test_パスワードが誤っていると401が返ること(self, multiple_users):
+
+        # WHEN
+        response: HttpResponse = post_json(Client(), 'api:login', {'username': 'a-pompom0107', 'password': 'validButIncorrectPassword'})
+
+        # THEN
+        assert response.status_code == 401
+
+    def test_GETリクエストには405が返ること(self):
+
+        # WHEN
+        response: HttpResponse = Client().get(reverse_lazy('api:logout'))
+
+        # THEN
+        assert response.status_code == 405
+        assert json.loads(response.content) == {'error': 'method_not_allowed'}
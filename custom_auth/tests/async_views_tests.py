@@ -0,0 +1,199 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, HttpResponseRedirect
+from django.test import Client
+from django.urls import include, path, reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..backend import AuthBackend
+from ..exceptions import LoginFailureException
+from ..models import User
+
+# 非同期版のViewを検証するためのURL
+urlpatterns = [
+    path('login/', include('custom_auth.async_urls')),
+]
+
+
+async def read_streaming(response) -> bytes:
+    """ 非同期イテレータで出力されるレスポンスを、ASGIサーバと同様に非同期で読み込む """
+
+    return b''.join([chunk async for chunk in response])
+
+
+# 非同期版のViewへ切り替え
+@pytest.fixture(autouse=True)
+def async_urlconf(settings):
+    settings.ROOT_URLCONF = __name__
+
+
+@pytest.mark.django_db(transaction=False)
+class TestAsyncView:
+
+    class TestAsyncLoginView:
+        """ ログイン画面View(非同期版) """
+
+        def test_ログイン画面のテンプレートが得られること(self):
+
+            # WHEN
+            response: HttpResponse = Client().get(reverse_lazy('login:login'))
+
+            # THEN
+            assert '<title>ログイン</title>' in response.content.decode('utf-8')
+
+        def test_ログイン成功するとTop画面へ遷移しTOP画面が得られること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            post_params = {
+                'username': 'johnDoe__9807',
+                'password': 'mYPoWErfUl00PaSSwoRd',
+            }
+
+            # WHEN
+            response: HttpResponseRedirect = client.post(reverse_lazy('login:login'), post_params)
+            top_response: HttpResponse = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert reverse_lazy('login:top') == response['Location']
+            assert '<title>ユーザTOP</title>' in top_response.content.decode('utf-8')
+
+        def test_存在するユーザ名で間違ったパスワードを指定するとログイン画面へ遷移すること(self, multiple_users):
+
+            # GIVEN
+            post_params = {
+                'username': 'a-pompom0107',
+                'password': 'validButIncorrectPassword',
+            }
+
+            # WHEN
+            response: HttpResponse = Client().post(reverse_lazy('login:login'), post_params)
+
+            # THEN
+            assert '<title>ログイン</title>' in response.content.decode('utf-8')
+
+    class TestAsyncSignUpView:
+        """ ユーザ登録画面View(非同期版) """
+
+        def test_ユーザ登録に成功するとDBへユーザが登録されること(self):
+
+            # GIVEN
+            post_params = {
+                'username': 'a-pompom_User',
+                'password': 'veryStrong-Password0001',
+            }
+
+            # WHEN
+            response: HttpResponseRedirect = Client().post(reverse_lazy('login:signup'), post_params)
+
+            # THEN
+            assert reverse_lazy('login:login') == response['Location']
+            assert User.objects.filter(username=post_params['username']).exists()
+
+        def test_存在するユーザ名で登録するとユーザ登録画面へ遷移すること(self, multiple_users):
+
+            # GIVEN
+            post_params = {
+                'username': 'a-pompom0107',
+                'password': 'strongMockPassword_1234'
+            }
+
+            # WHEN
+            response: HttpResponse = Client().post(reverse_lazy('login:signup'), post_params)
+
+            # THEN
+            assert '<title>ユーザ登録</title>' in response.content.decode('utf-8')
+
+    class TestAsyncTopView:
+        """ トップ画面View(非同期版) """
+
+        @pytest.mark.parametrize('username, password', [
+            ('a-pompom0107', 'strong_password1234'),
+            ('johnDoe__9807', 'mYPoWErfUl00PaSSwoRd'),
+        ])
+        def test_権限によらずトップ画面はイベントループ外で描画されること(self, multiple_users, monkeypatch, username, password):
+
+            # GIVEN
+            client = Client()
+            client.login(username=username, password=password)
+            on_event_loop = []
+
+            def render_top_page(request, user):
+                try:
+                    asyncio.get_running_loop()
+                    on_event_loop.append(True)
+                except RuntimeError:
+                    on_event_loop.append(False)
+                return HttpResponse()
+
+            monkeypatch.setattr('custom_auth.async_views.render_top_page', render_top_page)
+
+            # WHEN
+            client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert on_event_loop == [False]
+
+    class TestAsyncLogoutView:
+        """ ログアウトView(非同期版) """
+
+        def test_ログアウト後にTOP画面へアクセスするとログイン画面へ遷移すること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            client.login(username='a-pompom0107', password='strong_password1234')
+
+            # WHEN
+            client.get(reverse_lazy('login:logout'))
+            response: HttpResponseRedirect = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert reverse_lazy('login:login') == response['Location']
+
+    class TestAsyncUserExportView:
+        """ ユーザ一覧のCSV出力用View(非同期版) """
+
+        def test_管理者には全ユーザのCSVが非同期に出力されること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+            # WHEN
+            response = client.get(reverse_lazy('login:export'))
+
+            # THEN
+            assert response.is_async
+            assert async_to_sync(read_streaming)(response).decode('utf-8').count('\r\n') == 4
+
+
+@pytest.mark.django_db(transaction=False)
+class TestAsyncAuthBackend:
+    """ 認証バックエンド(非同期版)テストコード """
+
+    def test_妥当なユーザ名とパスワードでUserが得られること(self, multiple_users):
+
+        # GIVEN
+        sut = AuthBackend()
+        user_info = get_user_info_fixture()
+
+        # WHEN
+        actual = async_to_sync(sut.aauthenticate)(None, username=user_info[0]['username'], password=user_info[0]['password'])
+
+        # THEN
+        assert actual == multiple_users[0]
+        assert async_to_sync(sut.aget_user)(actual.pk) == multiple_users[0]
+
+    def test_存在しないユーザ名でLoginFailureExceptionが送出されること(self, multiple_users):
+
+        # GIVEN
+        sut = AuthBackend()
+
+        # THEN
+        with pytest.raises(LoginFailureException):
+            # WHEN
+            async_to_sync(sut.aauthenticate)(None, username='Nobody', password='mockPassword')
@@ -84,4 +84,17 @@ class TestAuthBackend:
             # THEN
             with pytest.raises(LoginFailureException):
                 # WHEN
-                sut.authenticate(None, username=user_info[0]['username'], password='invalidPassword')
\ No newline at end of file
+                sut.authenticate(None, username=user_info[0]['username'], password='invalidPassword')
+
+        def test_ログインに必要な列のみが読み込まれること(self, multiple_users):
+
+            # GIVEN
+            sut = AuthBackend()
+            user_info = get_user_info_fixture()
+
+            # WHEN
+            actual: User = sut.authenticate(None, username=user_info[0]['username'], password=user_info[0]['password'])
+
+            # THEN
+            assert actual.get_deferred_fields() == {'last_login'}
+            assert actual.is_admin == user_info[0]['is_admin']
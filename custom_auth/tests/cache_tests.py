@@ -0,0 +1,130 @@
+import pytest # type: ignore
+from django.test import override_settings
+
+from .fixture import *
+
+from ..backend import AuthBackend
+from ..cache import UserCache, get_user_cache
+from ..models import User
+
+
+@pytest.mark.django_db(transaction=False)
+class TestUserCache:
+    """ ユーザキャッシュテストコード
+    """
+
+    class TestGet:
+        """ getメソッドの検証 """
+
+        def test_格納済みのユーザが得られヒット数が加算されること(self, multiple_users):
+
+            # GIVEN
+            sut = UserCache()
+            sut.set(multiple_users[0])
+
+            # WHEN
+            actual = sut.get(multiple_users[0].pk)
+
+            # THEN
+            assert actual == multiple_users[0]
+            assert sut.stats()['hits'] == 1
+
+        def test_未格納のユーザIDでNoneが返りミス数が加算されること(self):
+
+            # GIVEN
+            sut = UserCache()
+
+            # WHEN
+            actual = sut.get(999)
+
+            # THEN
+            assert actual is None
+            assert sut.stats()['misses'] == 1
+
+        def test_有効期限切れのユーザでNoneが返ること(self, multiple_users):
+
+            # GIVEN
+            sut = UserCache(timeout=-1)
+            sut.set(multiple_users[0])
+
+            # WHEN
+            actual = sut.get(multiple_users[0].pk)
+
+            # THEN
+            assert actual is None
+
+        def test_最大件数を超えると最も参照されていないユーザが破棄されること(self, multiple_users):
+
+            # GIVEN
+            sut = UserCache(max_size=2)
+            sut.set(multiple_users[0])
+            sut.set(multiple_users[1])
+            sut.get(multiple_users[0].pk)
+
+            # WHEN
+            sut.set(multiple_users[2])
+
+            # THEN
+            assert sut.get(multiple_users[1].pk) is None
+            assert sut.get(multiple_users[0].pk) == multiple_users[0]
+            assert sut.stats()['size'] == 2
+
+    class TestInvalidate:
+        """ シグナルによる破棄の検証 """
+
+        def test_ユーザを更新するとキャッシュから破棄されること(self, multiple_users):
+
+            # GIVEN
+            user_cache = get_user_cache()
+            user_cache.set(multiple_users[0])
+
+            # WHEN
+            multiple_users[0].is_admin = False
+            multiple_users[0].save()
+
+            # THEN
+            assert user_cache.get(multiple_users[0].pk) is None
+
+        def test_ユーザを削除するとキャッシュから破棄されること(self, multiple_users):
+
+            # GIVEN
+            user_cache = get_user_cache()
+            user_id = multiple_users[0].pk
+            user_cache.set(multiple_users[0])
+
+            # WHEN
+            multiple_users[0].delete()
+
+            # THEN
+            assert user_cache.get(user_id) is None
+
+    class TestAuthBackend:
+        """ get_userメソッドからの利用の検証 """
+
+        def test_キャッシュ済みのユーザはDBへ問い合わせず得られること(self, multiple_users, django_assert_num_queries):
+
+            # GIVEN
+            sut = AuthBackend()
+            sut.get_user(multiple_users[0].pk)
+
+            # WHEN
+            with django_assert_num_queries(0):
+                actual = sut.get_user(multiple_users[0].pk)
+
+            # THEN
+            assert actual == multiple_users[0]
+
+        def test_キャッシュを無効化するとDBから取得されること(self, multiple_users, django_assert_num_queries):
+
+            # GIVEN
+            sut = AuthBackend()
+
+            with override_settings(USER_CACHE={'ENABLED': False}):
+                sut.get_user(multiple_users[0].pk)
+
+                # WHEN
+                with django_assert_num_queries(1):
+                    actual = sut.get_user(multiple_users[0].pk)
+
+            # THEN
+            assert actual == multiple_users[0]
@@ -0,0 +1,101 @@
+from django.db import IntegrityError, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..backend import AuthBackend
+from ..exceptions import LoginFailureException
+from ..forms import SignUpForm
+from ..models import User
+
+
+@pytest.mark.django_db(transaction=False)
+class TestCaseInsensitiveUsername:
+    """ ユーザ名の大文字小文字を区別しないモードの検証 """
+
+    @pytest.fixture(autouse=True)
+    def case_insensitive(self, settings):
+        settings.USERNAME_CASE_INSENSITIVE = True
+
+    def test_大文字小文字のみが異なるユーザ名でログインできること(self, multiple_users):
+
+        # GIVEN
+        sut = AuthBackend()
+
+        # WHEN
+        actual = sut.authenticate(None, username='A-POMPOM0107', password='strong_password1234')
+
+        # THEN
+        assert actual == multiple_users[0]
+
+    def test_ユーザ名の検索にlowerの関数インデックスが利用されること(self, multiple_users):
+
+        # GIVEN
+        sut = AuthBackend()
+
+        # WHEN
+        with CaptureQueriesContext(connection) as context:
+            sut.authenticate(None, username='A-POMPOM0107', password='strong_password1234')
+
+        # THEN
+        assert 'LOWER("m_user"."username") = ' in context.captured_queries[0]['sql']
+
+    def test_大文字小文字のみが異なるユーザ名は登録済みとして扱われること(self, multiple_users, settings):
+
+        # GIVEN
+        settings.SIGNUP_USERNAME_PRECHECK = True
+        sut = SignUpForm({'username': 'JohnDoe__9807', 'password': 'testPassword01'})
+
+        # WHEN
+        actual = sut.is_valid()
+
+        # THEN
+        assert actual == False
+        assert sut.errors['username'] == ['ユーザ名はすでに使用されています。']
+
+    def test_事前確認が無効な場合も大文字小文字のみが異なるユーザ名は一意制約で登録されないこと(self, multiple_users):
+
+        # WHEN
+        response = Client().post(reverse_lazy('login:signup'), {'username': 'JohnDoe__9807', 'password': 'testPassword01'})
+
+        # THEN
+        assert 'ユーザ名はすでに使用されています。' in response.content.decode('utf-8')
+        assert User.objects.filter_username('johndoe__9807').count() == 1
+
+
+@pytest.mark.django_db(transaction=False)
+class TestCaseSensitiveUsername:
+    """ 大文字小文字を区別する既定のモードの検証 """
+
+    def test_大文字小文字のみが異なるユーザ名ではログインできないこと(self, multiple_users):
+
+        # GIVEN
+        sut = AuthBackend()
+
+        # WHEN
+        with pytest.raises(LoginFailureException):
+            sut.authenticate(None, username='A-POMPOM0107', password='strong_password1234')
+
+    def test_大文字小文字のみが異なるユーザ名は一意制約により登録できないこと(self, multiple_users):
+
+        # WHEN
+        with pytest.raises(IntegrityError):
+            with transaction.atomic():
+                User.objects.create(username='JOHNDOE__9807', password='password', is_admin=False)
+
+    def test_大文字小文字のみが異なるユーザ名は事前確認で登録済みとして扱われること(self, multiple_users, settings):
+
+        # GIVEN
+        settings.SIGNUP_USERNAME_PRECHECK = True
+        sut = SignUpForm({'username': 'JohnDoe__9807', 'password': 'testPassword01'})
+
+        # WHEN
+        actual = sut.is_valid()
+
+        # THEN
+        assert actual == False
+        assert sut.errors['username'] == ['ユーザ名はすでに使用されています。']
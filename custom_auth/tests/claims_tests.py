@@ -0,0 +1,206 @@
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..checks import check_claims_cache
+from ..claims import ClaimsUser
+from ..models import User
+
+CLAIMS_ENABLED = {'ENABLED': True, 'VERSION': 1, 'MAX_AGE': 300}
+
+
+def login_with_post(client: Client) -> None:
+    """ ログイン画面からログインし、クレームを発行させる """
+
+    client.post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+
+# クレームを有効化
+@pytest.fixture(autouse=True)
+def enable_claims(settings):
+    settings.SESSION_USER_CLAIMS = CLAIMS_ENABLED
+
+
+@pytest.mark.django_db(transaction=False)
+class TestClaims:
+    """ セッションへ埋め込むクレームのテストコード
+    """
+
+    class TestTopView:
+        """ クレームによるトップ画面表示の検証 """
+
+        def test_クレームが有効な場合m_userからログインユーザを取得せずトップ画面が得られること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+
+            # WHEN
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert '<title>管理者TOP</title>' in response.content.decode('utf-8')
+            # 管理者用トップ画面のユーザ一覧はパスワードを取得しない
+            assert all('"m_user"."password"' not in query['sql'] for query in context.captured_queries)
+
+        def test_バージョンが変わるとDBの値でトップ画面が得られること(self, multiple_users, settings):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+            User.objects.filter(username='a-pompom0107').update(is_admin=False)
+            settings.SESSION_USER_CLAIMS = {**CLAIMS_ENABLED, 'VERSION': 2}
+            settings.USER_CACHE = {'ENABLED': False}
+
+            # WHEN
+            response = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert '<title>ユーザTOP</title>' in response.content.decode('utf-8')
+
+    class TestRevocation:
+        """ ユーザの更新・削除によるクレームの失効の検証 """
+
+        def test_管理者権限を剥奪すると次のリクエストからユーザのトップ画面が得られること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+            user = User.objects.get(username='a-pompom0107')
+            user.is_admin = False
+            user.save()
+
+            # WHEN
+            response = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert '<title>ユーザTOP</title>' in response.content.decode('utf-8')
+
+        def test_管理者権限を剥奪するとユーザ一覧を出力できないこと(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+            user = User.objects.get(username='a-pompom0107')
+            user.is_admin = False
+            user.save()
+
+            # WHEN
+            response = client.get(reverse_lazy('login:export'))
+
+            # THEN
+            assert response.status_code == 404
+
+        def test_パスワードを変更するとログイン画面へ遷移すること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+            user = User.objects.get(username='a-pompom0107')
+            user.set_password('changed_password5678')
+            user.save()
+
+            # WHEN
+            response = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert response.status_code == 302
+            assert response.url == reverse_lazy('login:login')
+
+        def test_ユーザを削除するとログイン画面へ遷移すること(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+            User.objects.get(username='a-pompom0107').delete()
+
+            # WHEN
+            response = client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert response.status_code == 302
+
+        def test_最終ログイン日時の更新ではクレームが失効しないこと(self, multiple_users):
+
+            # GIVEN
+            client = Client()
+            login_with_post(client)
+            login_with_post(Client())
+
+            # WHEN
+            with CaptureQueriesContext(connection) as context:
+                client.get(reverse_lazy('login:top'))
+
+            # THEN
+            assert all('"m_user"."password"' not in query['sql'] for query in context.captured_queries)
+
+    class TestClaimsUser:
+        """ 遅延評価ユーザの検証 """
+
+        def test_クレーム外の項目を参照するとm_userから取得されること(self, multiple_users):
+
+            # GIVEN
+            user = multiple_users[0]
+            sut = ClaimsUser({'id': user.pk, 'username': user.username, 'is_admin': user.is_admin, 'version': 1})
+
+            # WHEN
+            actual = sut.password
+
+            # THEN
+            assert actual == user.password
+            assert sut == user
+
+
+class TestClaimsCacheCheck:
+    """ クレームの失効時刻を記録するキャッシュの起動時の検証 """
+
+    def test_プロセス内のキャッシュを指定すると警告されること(self, settings):
+
+        # GIVEN
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+        # WHEN
+        actual = check_claims_cache(None)
+
+        # THEN
+        assert [message.id for message in actual] == ['custom_auth.W001']
+
+    def test_ダミーのキャッシュを指定するとエラーとなること(self, settings):
+
+        # GIVEN
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        # WHEN
+        actual = check_claims_cache(None)
+
+        # THEN
+        assert [message.id for message in actual] == ['custom_auth.E001']
+
+    def test_共有するキャッシュを指定すると警告されないこと(self, settings, tmp_path):
+
+        # GIVEN
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': str(tmp_path)}}
+
+        # WHEN
+        actual = check_claims_cache(None)
+
+        # THEN
+        assert actual == []
+
+    def test_クレームが無効な場合は検証しないこと(self, settings):
+
+        # GIVEN
+        settings.SESSION_USER_CLAIMS = {**CLAIMS_ENABLED, 'ENABLED': False}
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        # WHEN
+        actual = check_claims_cache(None)
+
+        # THEN
+        assert actual == []
@@ -1,8 +1,19 @@
 import django
 import os
+import pytest # type: ignore
 
 # importを解決する段階で設定ファイルが読み込み済である必要があるため、
 # conftestのグローバル、すなわちテスト全体で最初に実行される部分に
 # 依存モジュールの解決を定義
 os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
-django.setup()
\ No newline at end of file
+# 読み取りの振り分けを検証するため、defaultを参照するレプリカreplica1を登録
+os.environ.setdefault('DATABASE_REPLICA_HOSTS', 'localhost')
+django.setup()
+
+
+# ログイン試行回数の制限はプロセス内で状態を保持するため、テストごとに初期化
+@pytest.fixture(autouse=True)
+def reset_login_throttle():
+    from custom_auth.throttle import reset_login_throttle
+
+    reset_login_throttle()
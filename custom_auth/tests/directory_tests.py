@@ -0,0 +1,215 @@
+import importlib
+from unittest.mock import MagicMock
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..directory import decode_cursor, encode_cursor, list_users, search_users
+from ..models import User
+
+
+def create_users(*usernames: str):
+    User.objects.bulk_create([User(username=username, password='password', is_admin=False) for username in usernames])
+
+
+@pytest.mark.django_db(transaction=False)
+class TestListUsers:
+    """ ユーザ一覧のkeyset paginationのテストコード
+    """
+
+    def test_ユーザ名順に1ページ分のユーザと次ページのカーソルが得られること(self):
+
+        # GIVEN
+        create_users('carol', 'alice', 'dave', 'bob')
+
+        # WHEN
+        actual = list_users(page_size=3)
+
+        # THEN
+        assert [username for _, username, _ in actual.users] == ['alice', 'bob', 'carol']
+        assert actual.next_cursor is not None
+
+    def test_カーソルを指定すると続きのページが得られること(self):
+
+        # GIVEN
+        create_users('carol', 'alice', 'dave', 'bob', 'erin')
+        first = list_users(page_size=2)
+
+        # WHEN
+        second = list_users(cursor=first.next_cursor, page_size=2)
+        third = list_users(cursor=second.next_cursor, page_size=2)
+
+        # THEN
+        assert [username for _, username, _ in second.users] == ['carol', 'dave']
+        assert [username for _, username, _ in third.users] == ['erin']
+        assert third.next_cursor is None
+
+    def test_OFFSETを使わずに問い合わせること(self):
+
+        # GIVEN
+        create_users('alice', 'bob', 'carol')
+        first = list_users(page_size=1)
+
+        # WHEN
+        with CaptureQueriesContext(connection) as context:
+            list_users(cursor=first.next_cursor, page_size=1)
+
+        # THEN
+        assert 'OFFSET' not in context.captured_queries[-1]['sql'].upper()
+
+    def test_改ざんされたカーソルは先頭ページとして扱うこと(self):
+
+        # GIVEN
+        create_users('alice', 'bob')
+        cursor = encode_cursor('alice', 1)
+
+        # WHEN
+        actual = list_users(cursor=cursor[:-1] + ('A' if cursor[-1] != 'A' else 'B'), page_size=1)
+
+        # THEN
+        assert decode_cursor('invalid') is None
+        assert [username for _, username, _ in actual.users] == ['alice']
+
+    def test_前方一致で検索できること(self):
+
+        # GIVEN
+        create_users('alice', 'alfred', 'bob', 'malice')
+
+        # WHEN
+        actual = list_users('al')
+
+        # THEN
+        assert [username for _, username, _ in actual.users] == ['alfred', 'alice']
+
+    def test_trigramを指定すると部分一致で検索できること(self, settings):
+
+        # GIVEN
+        settings.USER_DIRECTORY = {'PAGE_SIZE': 50, 'SEARCH': 'trigram'}
+        create_users('alice', 'alfred', 'bob', 'malice')
+
+        # WHEN
+        actual = list_users('lic')
+
+        # THEN
+        assert [username for _, username, _ in actual.users] == ['alice', 'malice']
+
+    def test_大文字小文字を区別しない部分一致はPostgreSQLではILIKEで比較すること(self, settings):
+
+        # GIVEN
+        settings.USER_DIRECTORY = {'PAGE_SIZE': 50, 'SEARCH': 'trigram'}
+        settings.USERNAME_CASE_INSENSITIVE = True
+        query = search_users('Li%').query
+        compiler = query.get_compiler(using='default')
+
+        # WHEN
+        sql, params = query.where.children[0].as_postgresql(compiler, compiler.connection)
+
+        # THEN
+        assert sql == '"m_user"."username" ILIKE %s'
+        assert params == ('%Li\\%%',)
+
+    def test_大文字小文字を区別しない前方一致はlowerのLIKEで比較すること(self, settings):
+
+        # GIVEN
+        settings.USERNAME_CASE_INSENSITIVE = True
+        query = search_users('Al').query
+        compiler = query.get_compiler(using='default')
+
+        # WHEN
+        sql, params = query.where.children[0].as_sql(compiler, compiler.connection)
+
+        # THEN
+        # m_user_username_lower_like_idx(lower(username) text_pattern_ops)の範囲検索となる
+        assert sql.startswith('LOWER("m_user"."username") LIKE ')
+        assert params == ['al%']
+
+    def test_大文字小文字を区別しない部分一致で検索できること(self, settings):
+
+        # GIVEN
+        settings.USER_DIRECTORY = {'PAGE_SIZE': 50, 'SEARCH': 'trigram'}
+        settings.USERNAME_CASE_INSENSITIVE = True
+        create_users('Alice', 'alfred', 'bob', 'maLICe')
+
+        # WHEN
+        actual = list_users('lic')
+
+        # THEN
+        assert sorted(username for _, username, _ in actual.users) == ['Alice', 'maLICe']
+
+
+class TestSearchIndexesMigration:
+    """ 検索用のインデックスを作成するマイグレーションの検証 """
+
+    def test_PostgreSQLでは設定値によらず検索用のインデックスが作成されること(self, settings):
+
+        # GIVEN
+        settings.USER_DIRECTORY = {'PAGE_SIZE': 50, 'SEARCH': 'prefix'}
+        migration = importlib.import_module('custom_auth.migrations.0004_username_search_indexes')
+        schema_editor = MagicMock()
+        schema_editor.connection.vendor = 'postgresql'
+        schema_editor.connection.cursor.return_value.__enter__.return_value.fetchone.return_value = (1,)
+
+        # WHEN
+        migration.create_search_indexes(None, schema_editor)
+
+        # THEN
+        statements = [call.args[0] for call in schema_editor.execute.call_args_list]
+        assert statements == [
+            'CREATE INDEX IF NOT EXISTS m_user_username_lower_like_idx ON m_user (lower(username) text_pattern_ops)',
+            'CREATE INDEX IF NOT EXISTS m_user_username_trgm_idx ON m_user USING gin (username gin_trgm_ops)',
+        ]
+
+    def test_PostgreSQL以外では何もしないこと(self):
+
+        # GIVEN
+        migration = importlib.import_module('custom_auth.migrations.0004_username_search_indexes')
+        schema_editor = MagicMock()
+        schema_editor.connection.vendor = 'sqlite'
+
+        # WHEN
+        migration.create_search_indexes(None, schema_editor)
+
+        # THEN
+        schema_editor.execute.assert_not_called()
+
+
+@pytest.mark.django_db(transaction=False)
+class TestAdminTopDirectory:
+    """ 管理者用トップ画面のユーザ一覧の検証 """
+
+    def test_管理者用トップ画面にユーザ一覧と次ページへのリンクが表示されること(self, settings, multiple_users):
+
+        # GIVEN
+        settings.USER_DIRECTORY = {'PAGE_SIZE': 2, 'SEARCH': 'prefix'}
+        client = Client()
+        client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        response = client.get(reverse_lazy('login:top'))
+
+        # THEN
+        content = response.content.decode('utf-8')
+        assert 'a-pompom0107' in content
+        assert 'johnDoe__9807' in content
+        assert 'pompomPurin0001' not in content
+        assert 'cursor=' in content
+
+    def test_検索文字列で絞り込まれること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        response = client.get(reverse_lazy('login:top'), {'q': 'pompom'})
+
+        # THEN
+        content = response.content.decode('utf-8')
+        assert 'pompomPurin0001' in content
+        assert 'johnDoe__9807' not in content
@@ -0,0 +1,109 @@
+import csv
+import gzip
+import io
+
+from django.test import Client
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..export import FLUSH_BYTES, iter_csv
+
+
+def read_csv(content: bytes):
+    return list(csv.reader(io.StringIO(content.decode('utf-8'))))
+
+
+class TestIterCsv:
+    """ CSV出力のテストコード
+    """
+
+    def test_ヘッダ行とユーザの行が出力されること(self):
+
+        # WHEN
+        actual = b''.join(iter_csv([(1, 'a-pompom', True, None)]))
+
+        # THEN
+        assert read_csv(actual) == [['id', 'username', 'is_admin', 'last_login'], ['1', 'a-pompom', '1', '']]
+
+    def test_出力が一定のバイト数ごとにまとめられること(self):
+
+        # GIVEN
+        rows = [(i, 'user%06d' % i, False, None) for i in range(20000)]
+
+        # WHEN
+        actual = list(iter_csv(rows))
+
+        # THEN
+        assert len(actual) > 1
+        assert all(len(chunk) >= FLUSH_BYTES for chunk in actual[:-1])
+        assert len(read_csv(b''.join(actual))) == 20001
+
+
+@pytest.mark.django_db(transaction=False)
+class TestUserExportView:
+    """ ユーザ一覧のCSV出力用Viewの検証 """
+
+    def test_管理者には全ユーザのCSVが返ること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        response = client.get(reverse_lazy('login:export'))
+
+        # THEN
+        rows = read_csv(b''.join(response.streaming_content))
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        assert 'attachment' in response['Content-Disposition']
+        assert 'no-store' in response['Cache-Control']
+        assert [row[1] for row in rows[1:]] == [user.username for user in multiple_users]
+
+    def test_パスワードのハッシュ値は出力されないこと(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        response = client.get(reverse_lazy('login:export'))
+
+        # THEN
+        content = b''.join(response.streaming_content).decode('utf-8')
+        assert all(user.password not in content for user in multiple_users)
+
+    def test_gzipを受け付ける場合は圧縮して返ること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        response = client.get(reverse_lazy('login:export'), HTTP_ACCEPT_ENCODING='gzip, br')
+
+        # THEN
+        assert response['Content-Encoding'] == 'gzip'
+        assert len(read_csv(gzip.decompress(b''.join(response.streaming_content)))) == 4
+
+    def test_管理者以外には404が返ること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        response = client.get(reverse_lazy('login:export'))
+
+        # THEN
+        assert response.status_code == 404
+
+    def test_未ログインの場合はログイン画面へ遷移すること(self):
+
+        # WHEN
+        response = Client().get(reverse_lazy('login:export'))
+
+        # THEN
+        assert response['Location'] == reverse_lazy('login:login')
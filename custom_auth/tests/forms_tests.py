@@ -60,7 +60,6 @@ class TestSignUpForm:
             pytest.param({'username': 'a-pompom 105a'}, id='Invalid username'),
             pytest.param({'username': '1234'}, id='Less than valid min length'),
             pytest.param({'username': 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefg'}, id='More than valid max length'),
-            pytest.param({'username': 'a-pompom0107'}, id='Duplicate username'),
         ]
     )
     def test_SignUpFormへ無効なユーザ名を渡すとValidationErrorが送出されること(self, invalid_username: Dict[str,str], multiple_users):
@@ -74,6 +73,31 @@ class TestSignUpForm:
             signup_form.cleaned_data = invalid_username
             signup_form.clean_username()
 
+    def test_事前確認が有効な場合は登録済みのユーザ名でValidationErrorが送出されること(self, multiple_users, settings):
+
+        # GIVEN
+        settings.SIGNUP_USERNAME_PRECHECK = True
+        signup_form = SignUpForm()
+
+        # THEN
+        with pytest.raises(ValidationError):
+            # WHEN
+            signup_form.cleaned_data = {'username': 'a-pompom0107'}
+            signup_form.clean_username()
+
+    def test_事前確認が無効な場合はDBへ問い合わせないこと(self, multiple_users, django_assert_num_queries):
+
+        # GIVEN
+        signup_form = SignUpForm()
+        signup_form.cleaned_data = {'username': 'a-pompom0107'}
+
+        # WHEN
+        with django_assert_num_queries(0):
+            actual = signup_form.clean_username()
+
+        # THEN
+        assert actual == 'a-pompom0107'
+
 
     @pytest.mark.parametrize(
         'cleaned_password',
@@ -0,0 +1,133 @@
+import json
+
+from django.core.management import call_command
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..backend import AuthBackend
+from ..hashers import TunedPBKDF2PasswordHasher, TunedScryptPasswordHasher
+from ..models import User
+
+
+# 計測結果ファイルを生成
+@pytest.fixture()
+def tuned_params_file(settings, tmp_path):
+
+    path = tmp_path / 'hasher_params.json'
+    path.write_text(json.dumps({'pbkdf2_sha256': {'params': {'iterations': 1000}}}))
+    settings.PASSWORD_HASHER_PARAMS_FILE = str(path)
+
+    return path
+
+
+class TestTunedHasher:
+    """ 計算コストを計測結果から決定するハッシャのテストコード
+    """
+
+    def test_計測結果ファイルの反復回数が使われること(self, tuned_params_file):
+
+        # WHEN
+        actual = TunedPBKDF2PasswordHasher().iterations
+
+        # THEN
+        assert actual == 1000
+
+    def test_計測結果ファイルが存在しない場合はDjango標準の反復回数が使われること(self, settings, tmp_path):
+
+        # GIVEN
+        settings.PASSWORD_HASHER_PARAMS_FILE = str(tmp_path / 'nothing.json')
+
+        # WHEN
+        actual = TunedPBKDF2PasswordHasher().iterations
+
+        # THEN
+        assert actual == TunedPBKDF2PasswordHasher.iterations.default
+
+    def test_OpenSSLの既定のメモリ上限を超えるwork_factorでもScryptで計算できること(self):
+
+        # GIVEN
+        sut = TunedScryptPasswordHasher()
+        sut.work_factor = 2 ** 15
+
+        # WHEN
+        encoded = sut.encode('password', sut.salt())
+
+        # THEN
+        assert encoded.startswith('scrypt$32768$')
+        assert sut.verify('password', encoded)
+
+    def test_現在より大きいwork_factorで計算したハッシュ値を検証できること(self):
+
+        # GIVEN
+        stronger = TunedScryptPasswordHasher()
+        stronger.work_factor = 2 ** 15
+        encoded = stronger.encode('password', stronger.salt())
+        sut = TunedScryptPasswordHasher()
+        sut.work_factor = 2 ** 10
+
+        # WHEN
+        actual = sut.verify('password', encoded)
+
+        # THEN
+        assert actual
+
+
+@pytest.mark.django_db(transaction=False)
+class TestRehashOnLogin:
+    """ ログイン時のハッシュ値更新の検証 """
+
+    def test_計算コストが変わるとログイン成功時にハッシュ値が更新されること(self, multiple_users, tuned_params_file):
+
+        # GIVEN
+        sut = AuthBackend()
+        user_info = get_user_info_fixture()
+
+        # WHEN
+        sut.authenticate(None, username=user_info[0]['username'], password=user_info[0]['password'])
+
+        # THEN
+        updated_user = User.objects.get(username=user_info[0]['username'])
+        assert updated_user.password.startswith('pbkdf2_sha256$1000$')
+        assert updated_user.check_password(user_info[0]['password'])
+
+    def test_計算コストが変わらなければハッシュ値は更新されないこと(self, multiple_users):
+
+        # GIVEN
+        sut = AuthBackend()
+        user_info = get_user_info_fixture()
+
+        # WHEN
+        sut.authenticate(None, username=user_info[0]['username'], password=user_info[0]['password'])
+
+        # THEN
+        assert User.objects.get(username=user_info[0]['username']).password == multiple_users[0].password
+
+
+class TestTuneHashersCommand:
+    """ tune_hashersコマンドの検証 """
+
+    def test_目標時間をもとに決定した反復回数がファイルへ出力されること(self, tmp_path):
+
+        # GIVEN
+        output = tmp_path / 'hasher_params.json'
+
+        # WHEN
+        call_command('tune_hashers', '--target-ms', '5', '--repeat', '1', '--hashers', 'pbkdf2_sha256', '--allow-weaker', '--output', str(output))
+
+        # THEN
+        tuned_params = json.loads(output.read_text())
+        assert tuned_params['pbkdf2_sha256']['params']['iterations'] > 0
+
+    def test_Scryptのwork_factorが目標時間をもとに決定されること(self, tmp_path):
+
+        # GIVEN
+        output = tmp_path / 'hasher_params.json'
+
+        # WHEN
+        call_command('tune_hashers', '--target-ms', '300', '--repeat', '1', '--hashers', 'scrypt', '--output', str(output))
+
+        # THEN
+        tuned_params = json.loads(output.read_text())
+        assert tuned_params['scrypt']['params']['work_factor'] >= 2 ** 14
@@ -0,0 +1,90 @@
+import threading
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import Client
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..exceptions import HashingPoolSaturatedException
+from ..hashing import HashingExecutor
+
+
+class TestHashingExecutor:
+    """ パスワードハッシュ計算用ワーカープールのテストコード
+    """
+
+    @pytest.mark.parametrize(
+        'kind',
+        [
+            pytest.param('thread', id='Thread pool'),
+            pytest.param('process', id='Process pool'),
+            pytest.param('inline', id='Inline'),
+        ]
+    )
+    def test_ワーカで生成したハッシュ値でパスワードを検証できること(self, kind: str):
+
+        # GIVEN
+        sut = HashingExecutor(kind=kind, max_workers=1, max_queue=0)
+
+        # WHEN
+        encoded = sut.make_password('strong_password1234')
+
+        # THEN
+        assert check_password('strong_password1234', encoded)
+        assert sut.check_password('strong_password1234', make_password('strong_password1234'))
+        assert sut.stats()['in_flight'] == 0
+
+        sut.shutdown()
+
+    def test_実行中と待機中のタスク数が上限に達するとHashingPoolSaturatedExceptionが送出されること(self):
+
+        # GIVEN
+        sut = HashingExecutor(kind='thread', max_workers=1, max_queue=1)
+        event = threading.Event()
+        sut.submit(event.wait)
+        sut.submit(event.wait)
+
+        # THEN
+        with pytest.raises(HashingPoolSaturatedException):
+            # WHEN
+            sut.submit(event.wait)
+
+        assert sut.stats()['rejected'] == 1
+
+        event.set()
+        sut.shutdown()
+
+
+@pytest.mark.django_db(transaction=False)
+class TestSaturatedView:
+    """ ワーカープール飽和時のViewの検証 """
+
+    # ワーカープールを飽和させる
+    @pytest.fixture()
+    def saturated(self, settings):
+        settings.PASSWORD_HASHING_EXECUTOR = {'KIND': 'thread', 'MAX_WORKERS': 1, 'MAX_QUEUE': 0}
+        from ..hashing import get_hashing_executor
+
+        event = threading.Event()
+        get_hashing_executor().submit(event.wait)
+        yield
+        event.set()
+
+    def test_ログイン時にワーカープールが飽和していると503が返ること(self, saturated, multiple_users):
+
+        # WHEN
+        response = Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+        # THEN
+        assert response.status_code == 503
+
+    def test_ユーザ登録時にワーカープールが飽和していると503が返ること(self, saturated):
+
+        # WHEN
+        response = Client().post(reverse_lazy('login:signup'), {'username': 'a-pompom_User', 'password': 'veryStrong-Password0001'})
+
+        # THEN
+        assert response.status_code == 503
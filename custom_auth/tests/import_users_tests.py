@@ -0,0 +1,76 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..models import User
+
+
+@pytest.mark.django_db(transaction=False)
+class TestImportUsersCommand:
+    """ import_usersコマンドのテストコード
+    """
+
+    def test_CSVの有効な行のみが登録されること(self, multiple_users, tmp_path):
+
+        # GIVEN
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            'username,password,is_admin\n'
+            'importedUser01,importedPassword01,true\n'
+            'importedUser02,importedPassword02,false\n'
+            'importedUser02,importedPassword03,false\n'
+            'a-pompom0107,importedPassword04,false\n'
+            'invalid user,importedPassword05,false\n'
+            'importedUser06,short,false\n'
+        )
+        stderr = StringIO()
+
+        # WHEN
+        call_command('import_users', str(path), '--batch-size', '2', '--workers', '0', stdout=StringIO(), stderr=stderr)
+
+        # THEN
+        assert User.objects.get(username='importedUser01').is_admin
+        assert User.objects.get(username='importedUser02').check_password('importedPassword02')
+        assert User.objects.filter(username__startswith='imported').count() == 2
+        assert len(stderr.getvalue().splitlines()) == 4
+
+    def test_JSONLをプロセスプールでハッシュ化して登録できること(self, tmp_path):
+
+        # GIVEN
+        path = tmp_path / 'users.jsonl'
+        path.write_text('\n'.join(
+            json.dumps({'username': f'jsonlUser{i:02}', 'password': f'jsonlPassword{i:02}'}) for i in range(3)
+        ))
+
+        # WHEN
+        call_command('import_users', str(path), '--workers', '2', stdout=StringIO())
+
+        # THEN
+        assert User.objects.filter(username__startswith='jsonlUser').count() == 3
+        assert User.objects.get(username='jsonlUser01').check_password('jsonlPassword01')
+
+    def test_検証後に登録されたユーザ名の行のみが登録されないこと(self, multiple_users, tmp_path, monkeypatch):
+
+        # GIVEN
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            'username,password\n'
+            'importedUser01,importedPassword01\n'
+            'a-pompom0107,importedPassword02\n'
+            'importedUser03,importedPassword03\n'
+        )
+        stderr = StringIO()
+        # 検証から登録までの間に、同じユーザ名が登録された状態を再現
+        monkeypatch.setattr(User.objects, 'filter_username_taken_in', lambda usernames: User.objects.none())
+
+        # WHEN
+        call_command('import_users', str(path), '--workers', '0', stdout=StringIO(), stderr=stderr)
+
+        # THEN
+        assert User.objects.filter(username__startswith='imported').count() == 2
+        assert stderr.getvalue() == '3: username already exists\n'
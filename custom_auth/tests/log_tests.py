@@ -0,0 +1,246 @@
+import io
+import json
+import logging
+import threading
+
+from django.db import connection
+from django.test import Client
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..log import BackgroundStreamHandler, JSONFormatter, SQLSamplingFilter, auth_logger, sql_logger
+from ..models import User
+
+
+class RecordingHandler(logging.Handler):
+    """ 出力されたログを保持するハンドラ """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def recording_handler():
+    return RecordingHandler()
+
+
+def make_record(**attributes) -> logging.LogRecord:
+    record = logging.LogRecord('test', logging.DEBUG, __file__, 0, 'message', None, None)
+    record.__dict__.update(attributes)
+    return record
+
+
+class TestBackgroundStreamHandler:
+    """ バックグラウンドのスレッドで書き込むハンドラのテストコード
+    """
+
+    def test_書式化したログが書き込み用のスレッドで出力されること(self):
+
+        # GIVEN
+        stream = io.StringIO()
+        sut = BackgroundStreamHandler(stream)
+        sut.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+        written_threads = []
+        original_emit = sut.target.emit
+        sut.target.emit = lambda record: (written_threads.append(threading.current_thread()), original_emit(record))
+
+        # WHEN
+        sut.handle(logging.LogRecord('test', logging.INFO, __file__, 0, 'hello %s', ('world',), None))
+        sut.flush()
+
+        # THEN
+        assert stream.getvalue() == 'INFO hello world\n'
+        assert written_threads[0] is not threading.current_thread()
+
+    def test_flushでは書き込み用のスレッドを止めずにキューが書き込まれること(self):
+
+        # GIVEN
+        stream = io.StringIO()
+        sut = BackgroundStreamHandler(stream)
+        sut.handle(make_record(msg='first'))
+        listener = sut._listener
+
+        # WHEN
+        sut.flush()
+        sut.handle(make_record(msg='second'))
+        sut.flush()
+
+        # THEN
+        assert stream.getvalue() == 'first\nsecond\n'
+        assert sut._listener is listener
+        assert listener._thread is not None and listener._thread.is_alive()
+
+        sut.close()
+        assert sut._listener is None
+        assert not listener._thread
+
+    def test_プロセスが変わると新しいキューで書き込み用のスレッドを開始すること(self, monkeypatch):
+
+        # GIVEN
+        stream = io.StringIO()
+        sut = BackgroundStreamHandler(stream, max_size=5)
+        sut.handle(make_record(msg='parent'))
+        sut.flush()
+        parent_queue = sut.queue
+        parent_listener = sut._listener
+        # fork直後の子プロセスと同様に、書き込まれていないログがキューに残った状態
+        parent_queue.put_nowait(make_record(msg='unwritten'))
+        monkeypatch.setattr('custom_auth.log.os.getpid', lambda: -1)
+
+        # WHEN
+        sut.handle(make_record(msg='child'))
+        sut.flush()
+
+        # THEN
+        assert sut.queue is not parent_queue
+        assert sut.queue.maxsize == 5
+        assert stream.getvalue().endswith('child\n')
+
+        sut.close()
+        # 同じプロセス内で再現しているため、親プロセス側のスレッドも停止
+        parent_listener.stop()
+
+    def test_キューが溢れた場合はログを破棄すること(self):
+
+        # GIVEN
+        sut = BackgroundStreamHandler(io.StringIO(), max_size=1)
+        # 書き込み用のスレッドを開始せずにキューへ積む
+        sut.queue.put_nowait(make_record())
+        sut._ensure_listener = lambda: None
+
+        # WHEN
+        sut.handle(make_record())
+
+        # THEN
+        assert sut.dropped == 1
+
+
+class TestSQLSamplingFilter:
+    """ SQLのログの間引きのテストコード
+    """
+
+    def test_割合が0の場合は実行時間の短いSQLが出力されないこと(self):
+
+        # GIVEN
+        sut = SQLSamplingFilter(rate=0.0, slow_ms=100)
+
+        # WHEN
+        actual = sut.filter(make_record(duration=0.001))
+
+        # THEN
+        assert actual is False
+
+    def test_実行時間の長いSQLは常に出力されること(self):
+
+        # GIVEN
+        sut = SQLSamplingFilter(rate=0.0, slow_ms=100)
+
+        # WHEN
+        actual = sut.filter(make_record(duration=0.2))
+
+        # THEN
+        assert actual is True
+
+    def test_SQL以外のログはそのまま出力されること(self):
+
+        # GIVEN
+        sut = SQLSamplingFilter(rate=0.0, slow_ms=100)
+
+        # WHEN
+        actual = sut.filter(make_record())
+
+        # THEN
+        assert actual is True
+
+
+class TestJSONFormatter:
+    """ JSON形式のフォーマッタのテストコード
+    """
+
+    def test_extraで指定した項目が1行のJSONとして出力されること(self):
+
+        # GIVEN
+        record = make_record(fields={'event': 'login_success', 'user_id': 1})
+
+        # WHEN
+        actual = JSONFormatter().format(record)
+
+        # THEN
+        assert '\n' not in actual
+        assert json.loads(actual)['event'] == 'login_success'
+        assert json.loads(actual)['user_id'] == 1
+
+
+@pytest.mark.django_db(transaction=False)
+class TestAuthEvents:
+    """ ログイン・ユーザ登録の結果の出力の検証 """
+
+    @pytest.fixture(autouse=True)
+    def capture_auth_events(self, recording_handler):
+        level = auth_logger.level
+        auth_logger.setLevel(logging.INFO)
+        auth_logger.addHandler(recording_handler)
+        yield
+        auth_logger.removeHandler(recording_handler)
+        auth_logger.setLevel(level)
+
+    def test_ログイン成功時にユーザIDが出力されること(self, recording_handler, multiple_users):
+
+        # WHEN
+        Client().post(reverse_lazy('login:login'), {'username': 'johnDoe__9807', 'password': 'mYPoWErfUl00PaSSwoRd'})
+
+        # THEN
+        fields = recording_handler.records[-1].fields
+        assert fields['event'] == 'login_success'
+        assert fields['user_id'] == multiple_users[1].pk
+
+    def test_ログイン失敗時にパスワードが出力されないこと(self, recording_handler, multiple_users):
+
+        # WHEN
+        Client().post(reverse_lazy('login:login'), {'username': 'johnDoe__9807', 'password': 'wrongPassword0001'})
+
+        # THEN
+        fields = recording_handler.records[-1].fields
+        assert fields['event'] == 'login_failure'
+        assert fields['username'] == 'johnDoe__9807'
+        assert 'wrongPassword0001' not in json.dumps(fields)
+
+    def test_ユーザ登録の入力誤りのコードが出力されること(self, recording_handler):
+
+        # WHEN
+        Client().post(reverse_lazy('login:signup'), {'username': 'a#', 'password': 'short'})
+
+        # THEN
+        fields = recording_handler.records[-1].fields
+        assert fields['event'] == 'signup_invalid'
+        assert set(fields['errors']) == {'username', 'password'}
+
+
+@pytest.mark.django_db(transaction=False)
+class TestLogQueries:
+    """ DEBUG時以外のSQLの出力の検証 """
+
+    def test_SQLと実行時間が出力されること(self, recording_handler):
+
+        # GIVEN
+        level = sql_logger.level
+        sql_logger.setLevel(logging.DEBUG)
+        sql_logger.addHandler(recording_handler)
+
+        # WHEN
+        try:
+            User.objects.filter(username='a-pompom').exists()
+        finally:
+            sql_logger.removeHandler(recording_handler)
+            sql_logger.setLevel(level)
+
+        # THEN
+        assert not connection.queries_logged
+        assert any('m_user' in record.sql and record.duration >= 0 for record in recording_handler.records)
@@ -0,0 +1,168 @@
+from django.test import Client
+from django.urls import reverse, reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..metrics import Histogram, MetricsRegistry, get_metrics_registry, phase, recording
+
+
+class TestHistogram:
+    """ ヒストグラムのテストコード
+    """
+
+    def test_観測値が区切りごとの累積件数として集計されること(self):
+
+        # GIVEN
+        sut = Histogram((1, 5))
+
+        # WHEN
+        for value in (0.5, 1, 3, 10):
+            sut.observe(value)
+
+        # THEN
+        cumulative, total, count = sut.snapshot()
+        assert cumulative == [2, 3, 4]
+        assert total == 14.5
+        assert count == 4
+
+
+class TestRecording:
+    """ リクエスト内の処理段階の記録の検証 """
+
+    def test_記録中のみ処理段階が記録されること(self):
+
+        # GIVEN
+        with recording() as recorder:
+
+            # WHEN
+            with phase('check_password'):
+                pass
+
+        with phase('render'):
+            pass
+
+        # THEN
+        assert list(recorder.phases) == ['check_password']
+
+    @pytest.mark.django_db(transaction=False)
+    def test_処理段階ごとに問い合わせ数が記録されること(self, multiple_users):
+
+        # GIVEN
+        with recording() as recorder:
+
+            # WHEN
+            with phase('user_lookup'):
+                list(User.objects.all())
+                list(User.objects.all())
+
+        # THEN
+        assert recorder.queries == 2
+        assert recorder.phases['user_lookup'][1] == 2
+
+
+class TestMetricsRegistry:
+    """ 集計値の出力の検証 """
+
+    def test_ラベルごとのヒストグラムがPrometheusのテキスト形式で出力されること(self):
+
+        # GIVEN
+        sut = MetricsRegistry()
+        sut.observe('custom_auth_phase_seconds', 0.003, (0.001, 0.01), view='login:login', phase='render')
+
+        # WHEN
+        actual = sut.render()
+
+        # THEN
+        assert '# TYPE custom_auth_phase_seconds histogram' in actual
+        assert 'custom_auth_phase_seconds_bucket{phase="render",view="login:login",le="0.001"} 0' in actual
+        assert 'custom_auth_phase_seconds_bucket{phase="render",view="login:login",le="+Inf"} 1' in actual
+        assert 'custom_auth_phase_seconds_count{phase="render",view="login:login"} 1' in actual
+
+    def test_コネクションプールの接続待ち時間がDBごとに出力されること(self, monkeypatch):
+
+        # GIVEN
+        class ConnectionPool:
+            def get_stats(self):
+                return {'pool_size': 4, 'pool_available': 3, 'requests_wait_ms': 12}
+
+        monkeypatch.setattr('custom_auth.metrics.get_connection_pools', lambda: [('default', ConnectionPool())])
+
+        # WHEN
+        actual = MetricsRegistry().render()
+
+        # THEN
+        assert 'custom_auth_db_pool_default_requests_wait_ms 12' in actual
+        assert 'custom_auth_db_pool_default_pool_available 3' in actual
+
+    def test_コネクションプールを利用しないDBは出力されないこと(self):
+
+        # WHEN
+        actual = MetricsRegistry().render()
+
+        # THEN
+        assert 'custom_auth_db_pool_' not in actual
+
+
+@pytest.mark.django_db(transaction=False)
+class TestMetricsMiddleware:
+    """ ログイン処理の計測・メトリクスの出力の検証 """
+
+    @pytest.fixture(autouse=True)
+    def enable_metrics(self, settings):
+        settings.METRICS = {'ENABLED': True, 'ALLOWED_IPS': None}
+
+    def test_ログイン処理の処理段階ごとの所要時間が集計されること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+
+        # WHEN
+        client.post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+        # THEN
+        actual = client.get(reverse('metrics')).content.decode('utf-8')
+        for name in ('form_validation', 'user_lookup', 'check_password', 'session_write'):
+            assert f'custom_auth_phase_seconds_count{{phase="{name}",view="login:login"}} 1' in actual
+        assert 'custom_auth_phase_queries_sum{phase="user_lookup",view="login:login"} 1' in actual
+        assert 'custom_auth_request_seconds_count{method="POST",status="3xx",view="login:login"} 1' in actual
+
+    def test_任意のHTTPメソッド_存在しないパスはラベルの種類を増やさないこと(self):
+
+        # GIVEN
+        client = Client()
+
+        # WHEN
+        for index in range(3):
+            client.generic(f'FOO{index}', f'/no-such-path-{index}/')
+
+        # THEN
+        actual = client.get(reverse('metrics')).content.decode('utf-8')
+        assert 'custom_auth_request_seconds_count{method="other",status="4xx",view="unmatched"} 3' in actual
+        assert 'FOO' not in actual
+        assert 'no-such-path' not in actual
+
+    def test_許可されていない接続元には404が返ること(self, settings):
+
+        # GIVEN
+        settings.METRICS = {'ENABLED': True, 'ALLOWED_IPS': ['192.0.2.1']}
+        client = Client()
+
+        # WHEN
+        response = client.get(reverse('metrics'))
+
+        # THEN
+        assert response.status_code == 404
+
+    def test_計測が無効の場合は集計されないこと(self, settings):
+
+        # GIVEN
+        settings.METRICS = {'ENABLED': False}
+        client = Client()
+
+        # WHEN
+        client.get(reverse_lazy('login:login'))
+
+        # THEN
+        assert get_metrics_registry() is None
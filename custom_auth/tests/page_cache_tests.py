@@ -0,0 +1,91 @@
+from django.test import Client
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..page_cache import PageCache, get_page_cache
+
+
+class TestPageCache:
+    """ ページキャッシュのテストコード
+    """
+
+    def test_格納したページがテンプレートと権限の組で得られること(self):
+
+        # GIVEN
+        sut = PageCache()
+        sut.set('top/top.html', 'user', b'user page')
+
+        # WHEN
+        actual = sut.get('top/top.html', 'user')
+
+        # THEN
+        assert actual == b'user page'
+        assert sut.get('top/top.html', 'admin') is None
+
+    def test_バージョンが異なるページは得られないこと(self):
+
+        # GIVEN
+        sut = PageCache(version='1')
+        sut.set('top/top.html', 'user', b'user page')
+
+        # WHEN
+        sut.version = '2'
+        actual = sut.get('top/top.html', 'user')
+
+        # THEN
+        assert actual is None
+
+
+@pytest.mark.django_db(transaction=False)
+class TestTopViewPageCache:
+    """ トップ画面のページキャッシュの検証 """
+
+    @pytest.fixture(autouse=True)
+    def enable_page_cache(self, settings):
+        settings.PAGE_CACHE = {'ENABLED': True, 'VERSION': 'test', 'TIMEOUT': 60}
+
+    def test_2回目以降は描画済みのページが返ること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+        first = client.get(reverse_lazy('login:top'))
+
+        # WHEN
+        actual = client.get(reverse_lazy('login:top'))
+
+        # THEN
+        assert actual.content == first.content
+        assert get_page_cache().stats()['hits'] == 1
+
+    def test_管理者には管理者用のページが返ること(self, multiple_users):
+
+        # GIVEN
+        user_client = Client()
+        user_client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+        user_client.get(reverse_lazy('login:top'))
+        admin_client = Client()
+        admin_client.force_login(multiple_users[0], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        actual = admin_client.get(reverse_lazy('login:top'))
+
+        # THEN
+        assert 'Admin Top' in actual.content.decode('utf-8')
+
+    def test_共有キャッシュへ保持されないヘッダが付与されること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+        # WHEN
+        actual = client.get(reverse_lazy('login:top'))
+
+        # THEN
+        assert 'private' in actual['Cache-Control']
+        assert 'no-cache' in actual['Cache-Control']
+        assert 'Cookie' in actual['Vary']
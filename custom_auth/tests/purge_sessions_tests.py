@@ -0,0 +1,58 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+import pytest # type: ignore
+
+
+def create_sessions(count: int, expire_date) -> None:
+    Session.objects.bulk_create([
+        Session(session_key=f'{expire_date.timestamp():.0f}-{i:06}', session_data='', expire_date=expire_date)
+        for i in range(count)
+    ])
+
+
+@pytest.mark.django_db(transaction=False)
+class TestPurgeSessionsCommand:
+    """ purge_sessionsコマンドのテストコード
+    """
+
+    def test_期限切れのセッションのみがバッチごとに削除されること(self):
+
+        # GIVEN
+        create_sessions(5, timezone.now() - timedelta(days=1))
+        create_sessions(2, timezone.now() + timedelta(days=1))
+        stdout = StringIO()
+
+        # WHEN
+        call_command('purge_sessions', '--batch-size', '2', '--pause', '0', stdout=stdout)
+
+        # THEN
+        assert Session.objects.count() == 2
+        assert Session.objects.filter(expire_date__lt=timezone.now()).count() == 0
+        assert stdout.getvalue().count('batch: deleted=') == 3
+        assert 'deleted=5 batches=3' in stdout.getvalue()
+
+    def test_バッチ数の上限を指定すると上限までで終了すること(self):
+
+        # GIVEN
+        create_sessions(5, timezone.now() - timedelta(days=1))
+
+        # WHEN
+        call_command('purge_sessions', '--batch-size', '2', '--pause', '0', '--max-batches', '1', stdout=StringIO())
+
+        # THEN
+        assert Session.objects.count() == 3
+
+    def test_DBにセッションを格納しない設定では中断すること(self, settings):
+
+        # GIVEN
+        settings.SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+        # WHEN
+        with pytest.raises(CommandError):
+            call_command('purge_sessions', stdout=StringIO())
@@ -0,0 +1,145 @@
+from django.test import Client
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..exceptions import QueryBudgetExceededException
+from ..query_budget import QueryLog, assert_query_budget, capture_queries
+
+
+class TestQueryLog:
+    """ 発行したSQLの記録のテストコード
+    """
+
+    def test_同じSQLを繰り返し発行すると重複として検出されること(self):
+
+        # GIVEN
+        sut = QueryLog()
+        sut.statements = ['SELECT a WHERE id = %s'] * 3 + ['SELECT b']
+
+        # WHEN
+        actual = sut.duplicates()
+
+        # THEN
+        assert actual == [('SELECT a WHERE id = %s', 3)]
+
+    @pytest.mark.django_db(transaction=False)
+    def test_パラメータのみが異なる問い合わせは同じSQLとして記録されること(self, multiple_users):
+
+        # GIVEN
+        with capture_queries() as sut:
+
+            # WHEN
+            for user in multiple_users:
+                User.objects.get(id=user.id)
+
+        # THEN
+        assert len(sut) == 3
+        assert sut.duplicates()[0][1] == 3
+
+
+@pytest.mark.django_db(transaction=False)
+class TestQueryBudget:
+    """ 各Viewの問い合わせ数が宣言された上限以内であることの検証 """
+
+    def test_ログイン画面の表示(self):
+
+        with assert_query_budget('login:login', 'GET'):
+            Client().get(reverse_lazy('login:login'))
+
+    def test_ログイン成功(self, multiple_users):
+
+        with assert_query_budget('login:login', 'POST'):
+            Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+    def test_ユーザ登録(self):
+
+        with assert_query_budget('login:signup', 'POST'):
+            Client().post(reverse_lazy('login:signup'), {'username': 'testUser01', 'password': 'testPassword01'})
+
+    def test_トップ画面の表示(self, multiple_users):
+
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+        with assert_query_budget('login:top', 'GET'):
+            client.get(reverse_lazy('login:top'))
+
+    def test_ログアウト(self, multiple_users):
+
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+        with assert_query_budget('login:logout', 'GET'):
+            client.get(reverse_lazy('login:logout'))
+
+    def test_ログインAPI(self, multiple_users):
+
+        with assert_query_budget('api:login', 'POST'):
+            response = Client().post(reverse_lazy('api:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'}, content_type='application/json')
+            assert response.status_code == 200
+
+    def test_ユーザ登録API(self):
+
+        with assert_query_budget('api:signup', 'POST'):
+            response = Client().post(reverse_lazy('api:signup'), {'username': 'testUser01', 'password': 'testPassword01'}, content_type='application/json')
+            assert response.status_code == 201
+
+    def test_ログアウトAPI(self, multiple_users):
+
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+        with assert_query_budget('api:logout', 'POST'):
+            response = client.post(reverse_lazy('api:logout'), content_type='application/json')
+            assert response.status_code == 204
+
+    def test_ログイン中のユーザの取得API(self, multiple_users):
+
+        client = Client()
+        client.force_login(multiple_users[1], 'custom_auth.backend.AuthBackend')
+
+        with assert_query_budget('api:me', 'GET'):
+            response = client.get(reverse_lazy('api:me'))
+            assert response.status_code == 200
+
+    def test_上限を超過すると検証に失敗すること(self, settings, multiple_users):
+
+        # GIVEN
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'BUDGETS': {'login:login': {'POST': 0}}}
+
+        # WHEN
+        with pytest.raises(AssertionError) as exc_info:
+            with assert_query_budget('login:login', 'POST'):
+                Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'invalid_password1234'})
+
+        # THEN
+        assert 'issued 1 queries (budget 0)' in str(exc_info.value)
+
+
+@pytest.mark.django_db(transaction=False)
+class TestQueryBudgetMiddleware:
+    """ 開発環境での上限超過の検出の検証 """
+
+    def test_raiseモードで上限を超過すると例外が送出されること(self, settings, multiple_users):
+
+        # GIVEN
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'MODE': 'raise', 'BUDGETS': {'login:login': {'POST': 0}}}
+
+        # WHEN
+        with pytest.raises(QueryBudgetExceededException):
+            Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'invalid_password1234'})
+
+    def test_warnモードで上限を超過すると警告が出力されること(self, settings, caplog, multiple_users):
+
+        # GIVEN
+        settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'MODE': 'warn', 'BUDGETS': {'login:login': {'POST': 0}}}
+
+        # WHEN
+        response = Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'invalid_password1234'})
+
+        # THEN
+        assert response.status_code == 200
+        assert 'POST login:login issued 1 queries (budget 0)' in caplog.text
@@ -0,0 +1,195 @@
+import time
+
+from django.core.signing import get_cookie_signer
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..middleware import PrimaryPinningMiddleware
+from ..models import User
+from ..routers import PIN_COOKIE_SALT, PrimaryReplicaRouter, routing
+
+ROUTING_WITH_REPLICA = {'REPLICAS': ['replica1'], 'PIN_SECONDS': 5, 'COOKIE_NAME': 'db_primary_pin'}
+
+
+def signed_pin(pinned_until: float) -> str:
+    """ set_signed_cookieと同様に、固定期間の終了時刻へ署名 """
+
+    return get_cookie_signer(salt='db_primary_pin' + PIN_COOKIE_SALT).sign(f'{pinned_until:.0f}')
+
+
+class TestPrimaryReplicaRouter:
+    """ プライマリ・レプリカへの振り分けのテストコード
+    """
+
+    def test_レプリカがない場合は振り分けないこと(self, settings):
+
+        # GIVEN
+        settings.DB_ROUTING = {**ROUTING_WITH_REPLICA, 'REPLICAS': []}
+
+        # WHEN
+        actual = PrimaryReplicaRouter().db_for_read(User)
+
+        # THEN
+        assert actual is None
+
+    def test_読み取りはレプリカ_書き込みはプライマリへ振り分けられること(self, settings):
+
+        # GIVEN
+        settings.DB_ROUTING = ROUTING_WITH_REPLICA
+        sut = PrimaryReplicaRouter()
+
+        # WHEN
+        with routing():
+            read_alias = sut.db_for_read(User)
+            write_alias = sut.db_for_write(User)
+
+        # THEN
+        assert read_alias == 'replica1'
+        assert write_alias == 'default'
+
+    def test_書き込んだ後の読み取りはプライマリへ振り分けられること(self, settings):
+
+        # GIVEN
+        settings.DB_ROUTING = ROUTING_WITH_REPLICA
+        sut = PrimaryReplicaRouter()
+
+        # WHEN
+        with routing():
+            sut.db_for_write(User)
+            actual = sut.db_for_read(User)
+
+        # THEN
+        assert actual == 'default'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_トランザクション内の読み取りはプライマリへ振り分けられること(self, settings):
+
+        # GIVEN
+        settings.DB_ROUTING = ROUTING_WITH_REPLICA
+
+        # WHEN
+        with transaction.atomic():
+            actual = PrimaryReplicaRouter().db_for_read(User)
+
+        # THEN
+        assert actual == 'default'
+
+
+class TestPrimaryPinningMiddleware:
+    """ 書き込んだクライアントをプライマリへ固定するミドルウェアの検証 """
+
+    @pytest.fixture(autouse=True)
+    def enable_replica(self, settings):
+        settings.DB_ROUTING = ROUTING_WITH_REPLICA
+
+    def test_書き込んだリクエストでは固定期間を記録したクッキーが返ること(self):
+
+        # GIVEN
+        def write(request):
+            PrimaryReplicaRouter().db_for_write(User)
+            return HttpResponse()
+
+        # WHEN
+        response = PrimaryPinningMiddleware(write)(RequestFactory().post('/login/signup'))
+
+        # THEN
+        request = RequestFactory().get('/login/')
+        request.COOKIES['db_primary_pin'] = response.cookies['db_primary_pin'].value
+        assert float(request.get_signed_cookie('db_primary_pin', salt=PIN_COOKIE_SALT)) > time.time()
+        assert response.cookies['db_primary_pin']['max-age'] == 5
+
+    def test_固定期間中のクライアントの読み取りはプライマリへ振り分けられること(self):
+
+        # GIVEN
+        request = RequestFactory().get('/login/')
+        request.COOKIES['db_primary_pin'] = signed_pin(time.time() + 5)
+        read_aliases = []
+
+        def read(request):
+            read_aliases.append(PrimaryReplicaRouter().db_for_read(User))
+            return HttpResponse()
+
+        # WHEN
+        response = PrimaryPinningMiddleware(read)(request)
+
+        # THEN
+        assert read_aliases == ['default']
+        assert 'db_primary_pin' not in response.cookies
+
+    def test_固定期間を過ぎたクライアントの読み取りはレプリカへ振り分けられること(self):
+
+        # GIVEN
+        request = RequestFactory().get('/login/')
+        request.COOKIES['db_primary_pin'] = signed_pin(time.time() - 1)
+        read_aliases = []
+
+        def read(request):
+            read_aliases.append(PrimaryReplicaRouter().db_for_read(User))
+            return HttpResponse()
+
+        # WHEN
+        PrimaryPinningMiddleware(read)(request)
+
+        # THEN
+        assert read_aliases == ['replica1']
+
+    def test_署名のないクッキーではプライマリへ固定されないこと(self):
+
+        # GIVEN
+        request = RequestFactory().get('/login/')
+        request.COOKIES['db_primary_pin'] = str(time.time() + 3600)
+        read_aliases = []
+
+        def read(request):
+            read_aliases.append(PrimaryReplicaRouter().db_for_read(User))
+            return HttpResponse()
+
+        # WHEN
+        PrimaryPinningMiddleware(read)(request)
+
+        # THEN
+        assert read_aliases == ['replica1']
+
+
+# テスト用のトランザクション内ではすべての読み取りがプライマリで行われるため、トランザクションを張らずに検証
+@pytest.mark.django_db(transaction=True, databases={'default', 'replica1'})
+class TestReadYourWrites:
+    """ レプリカを併用した場合の、書き込んだクライアントの読み取りの検証 """
+
+    @pytest.fixture(autouse=True)
+    def enable_replica(self, settings):
+        settings.DB_ROUTING = ROUTING_WITH_REPLICA
+
+    def test_ユーザ登録直後に登録したユーザでログインできること(self):
+
+        # GIVEN
+        client = Client()
+        signup_response = client.post(reverse_lazy('login:signup'), {'username': 'testUser01', 'password': 'testPassword01'})
+
+        # WHEN
+        with CaptureQueriesContext(connections['replica1']) as replica_context:
+            response = client.post(reverse_lazy('login:login'), {'username': 'testUser01', 'password': 'testPassword01'})
+
+        # THEN
+        assert 'db_primary_pin' in signup_response.cookies
+        assert replica_context.captured_queries == []
+        assert response.status_code == 302
+        assert response['Location'] == reverse_lazy('login:top')
+        assert int(client.session['_auth_user_id']) == User.objects.get(username='testUser01').pk
+
+    def test_固定されていないクライアントの読み取りはレプリカで行われること(self, multiple_users):
+
+        # WHEN
+        with CaptureQueriesContext(connections['replica1']) as replica_context:
+            response = Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+        # THEN
+        assert response.status_code == 302
+        assert any('"m_user"' in query['sql'] for query in replica_context.captured_queries)
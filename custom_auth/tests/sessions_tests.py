@@ -0,0 +1,76 @@
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..query_budget import capture_queries
+from ..sessions import SessionStore
+
+
+@pytest.mark.django_db(transaction=False)
+class TestSessionStore:
+    """ 問い合わせを減らしたセッションのテストコード
+    """
+
+    def test_ログインではセッションを1回のINSERTで保存すること(self, multiple_users):
+
+        # WHEN
+        with capture_queries() as query_log:
+            Client().post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+        # THEN
+        session_queries = [sql for sql in query_log.statements if 'django_session' in sql]
+        assert len(session_queries) == 1
+        assert session_queries[0].startswith('INSERT INTO "django_session"')
+
+    def test_保存したセッションはDBを参照せずに読み込めること(self):
+
+        # GIVEN
+        session = SessionStore()
+        session['key'] = 'value'
+        session.save()
+
+        # WHEN
+        with CaptureQueriesContext(connection) as context:
+            actual = SessionStore(session.session_key)['key']
+
+        # THEN
+        assert actual == 'value'
+        assert len(context) == 0
+
+    def test_鍵が重複した場合は鍵を発行し直して保存すること(self, monkeypatch):
+
+        # GIVEN
+        Session.objects.create(session_key='a' * 32, session_data='', expire_date='2099-01-01T00:00:00Z')
+        keys = iter(['a' * 32, 'b' * 32])
+        sut = SessionStore()
+        monkeypatch.setattr(sut, '_get_new_session_key', lambda: next(keys))
+        sut['key'] = 'value'
+
+        # WHEN
+        sut.save()
+
+        # THEN
+        assert sut.session_key == 'b' * 32
+        assert SessionStore('b' * 32)['key'] == 'value'
+
+    def test_削除は1回のDELETEで行うこと(self):
+
+        # GIVEN
+        session = SessionStore()
+        session['key'] = 'value'
+        session.save()
+
+        # WHEN
+        with CaptureQueriesContext(connection) as context:
+            SessionStore(session.session_key).delete()
+
+        # THEN
+        assert [query['sql'].split()[0] for query in context.captured_queries] == ['DELETE']
+        assert not Session.objects.filter(session_key=session.session_key).exists()
+        assert SessionStore(session.session_key).load() == {}
@@ -0,0 +1,84 @@
+import importlib
+import inspect
+from typing import Any, Dict
+
+import pytest # type: ignore
+
+
+def load_production_settings(monkeypatch, **environ: str) -> Any:
+    """ 環境変数を指定して本番環境用の設定を読み込む """
+
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'test-secret-key')
+    for key, value in environ.items():
+        monkeypatch.setenv(key, value)
+
+    return importlib.reload(importlib.import_module('config.settings_production'))
+
+
+def pool_kwargs(database: Dict[str, Any]) -> Dict[str, Any]:
+    """ DatabaseWrapper.poolと同様に、ConnectionPoolへ渡す引数を組み立てる
+    checkはCONN_HEALTH_CHECKSをもとにDjangoが指定し、OPTIONSのpoolの値が後に展開される
+    """
+
+    return dict(
+        kwargs={},
+        open=False,
+        configure=None,
+        check='check_connection' if database['CONN_HEALTH_CHECKS'] else None,
+        **database['OPTIONS']['pool'],
+    )
+
+
+class TestProductionDatabases:
+    """ 本番環境のDB接続設定 """
+
+    def test_コネクションプールへ渡す引数が重複しないこと(self, monkeypatch):
+
+        # GIVEN
+        sut = load_production_settings(monkeypatch, DJANGO_DB_POOL='1', DB_POOL_MAX_SIZE='32')
+
+        for database in sut.DATABASES.values():
+
+            # WHEN
+            actual = pool_kwargs(database)
+
+            # THEN
+            assert actual['check'] == 'check_connection'
+            assert actual['max_size'] == 32
+            assert database['CONN_MAX_AGE'] == 0
+
+    def test_ConnectionPoolの引数として受け付けられること(self, monkeypatch):
+
+        # GIVEN
+        psycopg_pool = pytest.importorskip('psycopg_pool')
+        sut = load_production_settings(monkeypatch, DJANGO_DB_POOL='1')
+
+        # WHEN
+        actual = inspect.signature(psycopg_pool.ConnectionPool).bind(**pool_kwargs(sut.DATABASES['default']))
+
+        # THEN
+        assert 'check' in actual.arguments
+
+    def test_プールを利用しない場合は接続を保持して再利用すること(self, monkeypatch):
+
+        # GIVEN
+        sut = load_production_settings(monkeypatch, DJANGO_DB_POOL='0')
+
+        # THEN
+        assert 'pool' not in sut.DATABASES['default'].get('OPTIONS', {})
+        assert sut.DATABASES['default']['CONN_MAX_AGE'] == 600
+        assert sut.DATABASES['default']['CONN_HEALTH_CHECKS'] is True
+
+
+class TestProductionCaches:
+    """ 本番環境のキャッシュの設定 """
+
+    def test_プロセス間で共有するキャッシュを利用すること(self, monkeypatch):
+
+        # GIVEN
+        sut = load_production_settings(monkeypatch, DJANGO_REDIS_URL='redis://cache:6379/1')
+
+        # THEN
+        assert sut.CACHES['default']['BACKEND'] == 'django.core.cache.backends.redis.RedisCache'
+        assert sut.CACHES['default']['LOCATION'] == 'redis://cache:6379/1'
+        assert sut.CACHES[sut.SESSION_USER_CLAIMS['CACHE_ALIAS']] is sut.CACHES['default']
@@ -0,0 +1,128 @@
+import gzip
+import json
+import os
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client
+
+import pytest # type: ignore
+
+from ..storage import parse_accept_encoding
+
+
+class TestParseAcceptEncoding:
+    """ Accept-Encodingヘッダの解析のテストコード
+    """
+
+    def test_受け付ける圧縮形式が得られること(self):
+
+        # WHEN
+        actual = parse_accept_encoding('gzip, deflate, br;q=0.9')
+
+        # THEN
+        assert actual == {'gzip', 'deflate', 'br'}
+
+    def test_q0で拒否された圧縮形式は含まれないこと(self):
+
+        # WHEN
+        actual = parse_accept_encoding('gzip;q=0, br')
+
+        # THEN
+        assert actual == {'br'}
+
+
+class TestCompressedManifestStaticFilesStorage:
+    """ ハッシュ値付きの名前で収集し、圧縮版を生成するストレージの検証 """
+
+    @pytest.fixture
+    def static_root(self, settings, tmp_path):
+        settings.STATIC_ROOT = str(tmp_path)
+        settings.STORAGES = {
+            **settings.STORAGES,
+            'staticfiles': {'BACKEND': 'custom_auth.storage.CompressedManifestStaticFilesStorage'},
+        }
+        call_command('collectstatic', interactive=False, verbosity=0, stdout=StringIO())
+
+        return tmp_path
+
+    @pytest.fixture
+    def hashed_style(self, static_root):
+        with open(os.path.join(static_root, 'staticfiles.json')) as manifest:
+            return json.load(manifest)['paths']['style.css']
+
+    def test_ハッシュ値付きの名前とgzip版が生成されること(self, static_root, hashed_style):
+
+        # THEN
+        assert hashed_style != 'style.css'
+        with open(os.path.join(static_root, hashed_style), 'rb') as original, gzip.open(os.path.join(static_root, hashed_style + '.gz')) as compressed:
+            assert compressed.read() == original.read()
+
+    def test_gzipを受け付ける場合は圧縮版が期限なしのキャッシュ指定で返ること(self, hashed_style):
+
+        # WHEN
+        actual = Client().get(f'/static/{hashed_style}', HTTP_ACCEPT_ENCODING='gzip')
+
+        # THEN
+        assert actual.status_code == 200
+        assert actual['Content-Encoding'] == 'gzip'
+        assert actual['Content-Type'].startswith('text/css')
+        assert 'Accept-Encoding' in actual['Vary']
+        assert 'immutable' in actual['Cache-Control']
+        assert 'max-age=31536000' in actual['Cache-Control']
+
+    def test_圧縮を受け付けない場合は元のファイルが返ること(self, static_root, hashed_style):
+
+        # WHEN
+        actual = Client().get(f'/static/{hashed_style}', HTTP_ACCEPT_ENCODING='identity')
+
+        # THEN
+        assert not actual.has_header('Content-Encoding')
+        with open(os.path.join(static_root, hashed_style), 'rb') as original:
+            assert b''.join(actual.streaming_content) == original.read()
+
+    def test_ハッシュ値のない名前は都度再検証させること(self, static_root):
+
+        # WHEN
+        actual = Client().get('/static/style.css')
+
+        # THEN
+        assert actual.status_code == 200
+        assert 'no-cache' in actual['Cache-Control']
+        assert 'immutable' not in actual['Cache-Control']
+
+    def test_更新されていないファイルの再検証には304が返ること(self, static_root):
+
+        # GIVEN
+        client = Client()
+        last_modified = client.get('/static/style.css')['Last-Modified']
+
+        # WHEN
+        actual = client.get('/static/style.css', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        # THEN
+        assert actual.status_code == 304
+        assert actual.content == b''
+        assert 'no-cache' in actual['Cache-Control']
+
+    def test_更新されたファイルの再検証には200が返ること(self, static_root):
+
+        # GIVEN
+        client = Client()
+        last_modified = client.get('/static/style.css')['Last-Modified']
+        modified_at = os.stat(os.path.join(static_root, 'style.css')).st_mtime + 60
+        os.utime(os.path.join(static_root, 'style.css'), (modified_at, modified_at))
+
+        # WHEN
+        actual = client.get('/static/style.css', HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        # THEN
+        assert actual.status_code == 200
+
+    def test_STATIC_ROOTの外のファイルは返らないこと(self, static_root):
+
+        # WHEN
+        actual = Client().get('/static/../config/settings.py')
+
+        # THEN
+        assert actual.status_code == 404
@@ -0,0 +1,113 @@
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse_lazy
+
+import pytest # type: ignore
+
+from .fixture import *
+
+from ..throttle import LocalThrottleBackend
+
+
+class TestLocalThrottleBackend:
+    """ プロセス内のトークンバケットのテストコード
+    """
+
+    def test_容量までは消費でき超過すると再試行までの秒数が返ること(self):
+
+        # GIVEN
+        sut = LocalThrottleBackend()
+
+        # WHEN
+        results = [sut.consume('key', 0.5, 3) for _ in range(4)]
+
+        # THEN
+        assert results[:3] == [0.0, 0.0, 0.0]
+        assert 0 < results[3] <= 2
+
+    def test_キーごとに独立して消費されること(self):
+
+        # GIVEN
+        sut = LocalThrottleBackend()
+        sut.consume('key', 0.5, 1)
+
+        # WHEN
+        actual = sut.consume('other key', 0.5, 1)
+
+        # THEN
+        assert actual == 0.0
+
+    def test_保持するキー数の上限を超えると古いキーから破棄されること(self):
+
+        # GIVEN
+        sut = LocalThrottleBackend(max_keys=1)
+        sut.consume('key', 0.5, 1)
+        sut.consume('other key', 0.5, 1)
+
+        # WHEN
+        actual = sut.consume('key', 0.5, 1)
+
+        # THEN
+        assert actual == 0.0
+
+
+@pytest.mark.django_db(transaction=False)
+class TestLoginThrottle:
+    """ ログイン画面での試行回数制限の検証 """
+
+    @pytest.fixture(autouse=True)
+    def strict_throttle(self, settings):
+        settings.LOGIN_THROTTLE = {
+            'ENABLED': True,
+            'BACKEND': 'local',
+            'IP_RATE': 0.01,
+            'IP_BURST': 3,
+            'USERNAME_RATE': 0.01,
+            'USERNAME_BURST': 2,
+        }
+
+    def test_同じユーザ名で上限を超えると429が返りDBへ問い合わせないこと(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        post_params = {'username': 'a-pompom0107', 'password': 'validButIncorrectPassword'}
+        for _ in range(2):
+            client.post(reverse_lazy('login:login'), post_params)
+
+        # WHEN
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(reverse_lazy('login:login'), post_params)
+
+        # THEN
+        assert response.status_code == 429
+        assert int(response['Retry-After']) > 0
+        assert len(context.captured_queries) == 0
+
+    def test_同じIPアドレスで上限を超えると別のユーザ名でも429が返ること(self, multiple_users):
+
+        # GIVEN
+        client = Client()
+        for username in ['nobody1', 'nobody2', 'nobody3']:
+            client.post(reverse_lazy('login:login'), {'username': username, 'password': 'validPasswordString'})
+
+        # WHEN
+        response = client.post(reverse_lazy('login:login'), {'username': 'a-pompom0107', 'password': 'strong_password1234'})
+
+        # THEN
+        assert response.status_code == 429
+
+    def test_共有キャッシュのバックエンドでも上限を超えると429が返ること(self, multiple_users, settings):
+
+        # GIVEN
+        settings.LOGIN_THROTTLE = {**settings.LOGIN_THROTTLE, 'BACKEND': 'cache'}
+        client = Client()
+        post_params = {'username': 'johnDoe__9807', 'password': 'validButIncorrectPassword'}
+        for _ in range(2):
+            client.post(reverse_lazy('login:login'), post_params)
+
+        # WHEN
+        response = client.post(reverse_lazy('login:login'), post_params)
+
+        # THEN
+        assert response.status_code == 429
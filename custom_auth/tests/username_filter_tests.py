@@ -0,0 +1,143 @@
+import threading
+
+import pytest # type: ignore
+from django.core.exceptions import ValidationError
+from django.test import Client
+from django.urls import reverse_lazy
+
+from .fixture import *
+
+from ..forms import SignUpForm
+from ..models import User
+from ..username_filter import BloomFilter, UsernameFilter, get_username_filter
+
+
+class TestBloomFilter:
+    """ Bloomフィルタのテストコード
+    """
+
+    def test_追加した要素はすべて存在すると判定されること(self):
+
+        # GIVEN
+        sut = BloomFilter(1000, 0.01)
+        values = [f'user{i}' for i in range(1000)]
+
+        # WHEN
+        for value in values:
+            sut.add(value)
+
+        # THEN
+        assert all(value in sut for value in values)
+
+    def test_偽陽性率が目標値の近傍に収まること(self):
+
+        # GIVEN
+        sut = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            sut.add(f'user{i}')
+
+        # WHEN
+        false_positives = sum(f'other{i}' in sut for i in range(10000))
+
+        # THEN
+        assert false_positives / 10000 < 0.03
+        assert sut.false_positive_rate < 0.03
+        assert sut.memory_bytes == (sut.bit_size + 7) // 8
+
+
+@pytest.mark.django_db(transaction=False)
+class TestUsernameFilterRebuild:
+    """ フィルタの作り直しの検証 """
+
+    def test_作り直しの間隔が経過しても完了を待たずに従来のフィルタで判定すること(self, multiple_users, monkeypatch):
+
+        # GIVEN
+        sut = UsernameFilter(min_capacity=1000, rebuild_interval=0)
+        sut.build()
+        release = threading.Event()
+        monkeypatch.setattr(sut, '_build', lambda: release.wait(5))
+
+        # WHEN
+        actual = sut.might_exist('a-pompom0107')
+
+        # THEN
+        assert actual
+        assert sut._rebuild_thread.is_alive()
+        release.set()
+        sut._rebuild_thread.join(5)
+        assert not sut._build_lock.locked()
+
+    def test_構築中に追加したユーザ名が新しいフィルタに含まれること(self, multiple_users, monkeypatch):
+
+        # GIVEN
+        sut = UsernameFilter(min_capacity=1000)
+        sut.build()
+
+        def iter_usernames():
+            yield 'a-pompom0107'
+            # 読み込み済みの範囲より後に登録されたユーザ名
+            sut.add('addedDuringBuild')
+            yield 'johnDoe__9807'
+
+        monkeypatch.setattr(sut, '_iter_usernames', iter_usernames)
+
+        # WHEN
+        sut.build()
+
+        # THEN
+        assert sut.might_exist('addedDuringBuild')
+        assert sut._pending is None
+
+
+@pytest.mark.django_db(transaction=False)
+class TestUsernameFilter:
+    """ ユニークチェックからの利用の検証 """
+
+    # フィルタを有効化
+    @pytest.fixture(autouse=True)
+    def enable_filter(self, settings):
+        settings.USERNAME_FILTER = {'ENABLED': True, 'ERROR_RATE': 0.01, 'MIN_CAPACITY': 1000, 'REBUILD_INTERVAL': 3600}
+        settings.SIGNUP_USERNAME_PRECHECK = True
+
+    def test_確実に登録されていないユーザ名はDBへ問い合わせないこと(self, multiple_users, django_assert_num_queries):
+
+        # GIVEN
+        get_username_filter().build()
+        signup_form = SignUpForm()
+        signup_form.cleaned_data = {'username': 'brandNewUser'}
+
+        # WHEN
+        with django_assert_num_queries(0):
+            signup_form.clean_username()
+
+        # THEN
+        assert get_username_filter().stats()['definite_misses'] == 1
+
+    def test_登録したユーザ名は重複として検出されること(self, multiple_users):
+
+        # GIVEN
+        get_username_filter().build()
+        User.objects.create(username='createdAfterBuild', password='password', is_admin=False)
+        signup_form = SignUpForm()
+        signup_form.cleaned_data = {'username': 'createdAfterBuild'}
+
+        # THEN
+        with pytest.raises(ValidationError):
+            # WHEN
+            signup_form.clean_username()
+
+    def test_他のプロセスで登録されたユーザ名でも一意制約違反としてユーザ登録画面へ遷移すること(self, multiple_users, monkeypatch):
+
+        # GIVEN
+        get_username_filter().build()
+        monkeypatch.setattr(get_username_filter(), 'might_exist', lambda username: False)
+        post_params = {
+            'username': 'a-pompom0107',
+            'password': 'strongMockPassword_1234'
+        }
+
+        # WHEN
+        response = Client().post(reverse_lazy('login:signup'), post_params)
+
+        # THEN
+        assert 'ユーザ名はすでに使用されています。' in response.content.decode('utf-8')
@@ -105,4 +105,44 @@ class TestValidatorAlphaNumeric:
         is_valid = is_valid_alpha_numeric(value)
 
         # THEN
-        assert is_valid == False
\ No newline at end of file
+        assert is_valid == False
+
+
+class TestRuleSet:
+    """ 文字種別・文字長の規則 """
+
+    @pytest.mark.parametrize(
+        'value,expected',
+        [
+            pytest.param('a-pom', None, id='Equal to min length'),
+            pytest.param('a_pompom', None, id='Valid'),
+            pytest.param('a' * 10, None, id='Equal to max length'),
+            pytest.param('a-po', TOO_SHORT, id='Too short'),
+            pytest.param('a' * 11, TOO_LONG, id='Too long'),
+            pytest.param('日本語文字列', INVALID_CHARSET, id='Japanese character'),
+            pytest.param('a#', INVALID_CHARSET, id='Invalid character takes priority over length'),
+            pytest.param('', INVALID_CHARSET, id='Empty'),
+            pytest.param('a-pompom\n', INVALID_CHARSET, id='Trailing newline'),
+        ]
+    )
+    def test_違反した規則が返ること(self, value: str, expected: str):
+
+        # GIVEN
+        sut = RuleSet(5, 10)
+
+        # WHEN
+        actual = sut.check(value)
+
+        # THEN
+        assert actual == expected
+
+    def test_まとめて検証すると値ごとの結果が返ること(self):
+
+        # GIVEN
+        sut = RuleSet(5, 10)
+
+        # WHEN
+        actual = sut.check_many(['a-pompom', 'a-po', 'user a-pompom'])
+
+        # THEN
+        assert actual == [None, TOO_SHORT, INVALID_CHARSET]
@@ -1,5 +1,7 @@
+from django.db import connection
 from django.http import HttpResponse, HttpResponseRedirect
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse_lazy
 
 import pytest # type: ignore
@@ -193,6 +195,24 @@ class TestView:
                 # THEN
                 assert '<title>ユーザ登録</title>' in response.content.decode('utf-8')
 
+            def test_存在するユーザ名で登録すると一意制約違反がユーザ名の入力誤りとして表示されること(self, props: Props, multiple_users):
+
+                # GIVEN
+                post_params = {
+                    'username': 'a-pompom0107',
+                    'password': 'strongMockPassword_1234'
+                }
+
+                # WHEN
+                with CaptureQueriesContext(connection) as context:
+                    response: HttpResponse = props['client'].post(props['sign_up_path'], post_params)
+
+                # THEN
+                statements = [query['sql'] for query in context.captured_queries if 'm_user' in query['sql']]
+                assert 'ユーザ名はすでに使用されています。' in response.content.decode('utf-8')
+                assert len(statements) == 1
+                assert statements[0].startswith('INSERT')
+
 
     class TestTopView:
         """ TOP画面View """
@@ -0,0 +1,32 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from ..template_warmup import compile_templates
+
+
+class TestWarmTemplates:
+    """ テンプレートの事前解析のテストコード
+    """
+
+    def test_テンプレートディレクトリ配下のテンプレートが解析されること(self):
+
+        # WHEN
+        compiled, failed = compile_templates()
+
+        # THEN
+        assert 'django:login/login.html' in compiled
+        assert 'django:top/top_admin.html' in compiled
+        assert failed == []
+
+    def test_コマンドで解析した件数が出力されること(self):
+
+        # GIVEN
+        stdout = StringIO()
+
+        # WHEN
+        call_command('warm_templates', stdout=stdout)
+
+        # THEN
+        assert 'compiled=' in stdout.getvalue()
+        assert 'skipped=0' in stdout.getvalue()
@@ -0,0 +1,198 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest
+
+# トークンバケットの状態 (残りトークン数, 最終更新時刻)
+BucketState = Tuple[float, float]
+
+
+def _refill(state: Optional[BucketState], rate: float, burst: int, now: float) -> float:
+    """ 経過時間に応じてトークンを補充した後の残りトークン数 """
+
+    if state is None:
+        return float(burst)
+
+    tokens, updated_at = state
+
+    return min(float(burst), tokens + (now - updated_at) * rate)
+
+
+class LocalThrottleBackend:
+    """ プロセス内でトークンバケットを保持するバックエンド
+    保持するキー数に上限を設け、古いものから破棄する
+    """
+
+    def __init__(self, max_keys: int=100000):
+        self.max_keys = max_keys
+        self._buckets: 'OrderedDict[str, BucketState]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, burst: int) -> float:
+        """ トークンを1つ消費
+
+        Parameters
+        ----------
+        key: str
+            バケットの識別子
+        rate: float
+            1秒あたりに補充されるトークン数
+        burst: int
+            バケットの容量
+
+        Returns
+        -------
+        retry_after: float
+            消費できた場合は0 できなかった場合は次のトークンが補充されるまでの秒数
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            tokens = _refill(self._buckets.get(key), rate, burst, now)
+
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / rate
+
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return 0.0
+
+    def clear(self) -> None:
+        """ すべてのバケットを破棄 """
+
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheThrottleBackend:
+    """ Djangoのキャッシュフレームワークでトークンバケットを共有するバックエンド 複数台構成向け
+    読み込みと書き込みは不可分ではないため、同時に到着したリクエストでは上限をわずかに超え得る
+    """
+
+    KEY_PREFIX = 'custom_auth:throttle:'
+
+    def __init__(self, cache_alias: str='default'):
+        self._cache_alias = cache_alias
+
+    def consume(self, key: str, rate: float, burst: int) -> float:
+        """ トークンを1つ消費 LocalThrottleBackend.consumeと同様 """
+
+        cache = caches[self._cache_alias]
+        # キャッシュのキーとして使えない文字・長さを避けるため、ハッシュ値をキーとする
+        cache_key = self.KEY_PREFIX + hashlib.sha256(key.encode('utf-8')).hexdigest()
+        now = time.time()
+        tokens = _refill(cache.get(cache_key), rate, burst, now)
+        # バケットが満杯へ戻るまでの時間だけ保持
+        timeout = int(burst / rate) + 1
+
+        if tokens < 1:
+            cache.set(cache_key, (tokens, now), timeout)
+            return (1 - tokens) / rate
+
+        cache.set(cache_key, (tokens - 1, now), timeout)
+
+        return 0.0
+
+    def clear(self) -> None:
+        """ 共有キャッシュのバケットはTTLで失効させる """
+
+
+class LoginThrottle:
+    """ ログイン試行をクライアントのIPアドレス・ユーザ名ごとに制限する
+    パスワード検証の前に評価し、総当たり攻撃のリクエストでハッシュ計算・DBへの問い合わせを発生させない
+
+    Attributes
+    ----------
+    config: Dict[str, Any]
+        設定値LOGIN_THROTTLE
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.backend: Any = (
+            CacheThrottleBackend(config.get('CACHE_ALIAS', 'default'))
+            if config.get('BACKEND', 'local') == 'cache'
+            else LocalThrottleBackend(config.get('MAX_KEYS', 100000))
+        )
+
+    def check(self, request: HttpRequest, username: str) -> float:
+        """ ログイン試行を許可するか
+
+        Parameters
+        ----------
+        request: HttpRequest
+            ログインのリクエスト情報
+        username: str
+            ログインを試行するユーザ名
+
+        Returns
+        -------
+        retry_after: float
+            許可する場合は0 許可しない場合は再試行までの秒数
+        """
+
+        ip_address = request.META.get(self.config.get('IP_META_KEY', 'REMOTE_ADDR'), '')
+
+        retry_after = self.backend.consume(
+            f'ip:{ip_address}',
+            self.config.get('IP_RATE', 1.0),
+            self.config.get('IP_BURST', 30),
+        )
+
+        # 大文字小文字を変えた試行も同じユーザ名として数える
+        if retry_after == 0 and username:
+            retry_after = self.backend.consume(
+                f'username:{username.lower()}',
+                self.config.get('USERNAME_RATE', 0.1),
+                self.config.get('USERNAME_BURST', 10),
+            )
+
+        return retry_after
+
+
+_login_throttle: Optional[LoginThrottle] = None
+_login_throttle_lock = threading.Lock()
+
+
+def get_login_throttle() -> Optional[LoginThrottle]:
+    """ 設定値LOGIN_THROTTLEをもとにログイン試行の制限を取得
+
+    Returns
+    -------
+    login_throttle: LoginThrottle
+        制限が無効化されている場合はNone
+    """
+
+    global _login_throttle
+
+    config: Dict[str, Any] = getattr(settings, 'LOGIN_THROTTLE', {})
+
+    if not config.get('ENABLED', False):
+        return None
+
+    if _login_throttle is None:
+        with _login_throttle_lock:
+            if _login_throttle is None:
+                _login_throttle = LoginThrottle(config)
+
+    return _login_throttle
+
+
+def reset_login_throttle() -> None:
+    """ 設定変更時などに制限の状態を作り直す """
+
+    global _login_throttle
+
+    with _login_throttle_lock:
+        _login_throttle = None
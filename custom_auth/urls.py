@@ -10,6 +10,8 @@ urlpatterns = [
     path('signup', views.SignUpView.as_view(), name='signup'),
     # トップ
     path('top', views.TopView.as_view(), name='top'),
+    # ユーザ一覧のCSV出力(管理者のみ)
+    path('export', views.UserExportView.as_view(), name='export'),
     # ログアウト
     path('logout', views.LogoutView.as_view(), name='logout'),
 ]
\ No newline at end of file
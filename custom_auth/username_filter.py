@@ -0,0 +1,290 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from .models import User, normalize_username_key
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """ 文字列の集合に対するBloomフィルタ
+    「存在しない」と判定したものは確実に存在しないが、「存在する」と判定したものは偽陽性を含む
+
+    Attributes
+    ----------
+    capacity: int
+        想定する要素数 超過すると偽陽性率が上がる
+    bit_size: int
+        ビット配列の長さ
+    hash_count: int
+        1要素あたりに立てるビット数
+    count: int
+        追加した要素数
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.bit_size = max(8, math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.bit_size + 7) // 8)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        """ 2つのハッシュ値の線形結合で、要素に対応するビット位置を求める """
+
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+
+        return ((h1 + i * h2) % self.bit_size for i in range(self.hash_count))
+
+    def add(self, value: str) -> None:
+        """ 要素を追加 """
+
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def memory_bytes(self) -> int:
+        """ ビット配列が占めるメモリ量(バイト) """
+
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """ 追加済みの要素数から見積もった偽陽性率 """
+
+        return (1 - math.exp(-self.hash_count * self.count / self.bit_size)) ** self.hash_count
+
+
+class UsernameFilter:
+    """ 登録済みユーザ名のBloomフィルタ
+    ユーザ登録時のユニークチェックで先に参照し、確実に存在しないユーザ名はDBへの問い合わせを省略する
+    他のプロセスで登録されたユーザ名は反映されないため、一定間隔でm_userから作り直す
+    作り直しはバックグラウンドのスレッドで行い、完了までは従来のフィルタで判定する
+
+    Attributes
+    ----------
+    error_rate: float
+        目標とする偽陽性率
+    min_capacity: int
+        フィルタの最小容量
+    rebuild_interval: float
+        m_userから作り直す間隔(秒)
+    """
+
+    # 作り直す際の容量 登録済みユーザ数に対する倍率
+    GROWTH_FACTOR = 2
+    # m_userを読み込む単位
+    CHUNK_SIZE = 10000
+
+    def __init__(self, error_rate: float=0.01, min_capacity: int=100000, rebuild_interval: float=3600):
+        self.error_rate = error_rate
+        self.min_capacity = min_capacity
+        self.rebuild_interval = rebuild_interval
+        self._bloom: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # 構築中にadd()されたユーザ名 構築中以外はNone
+        self._pending: Optional[List[str]] = None
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self.checks = 0
+        self.definite_misses = 0
+
+    def build(self) -> None:
+        """ m_userのユーザ名を逐次読み込み、フィルタを作り直す 他のスレッドが構築中の場合は完了を待つ """
+
+        with self._build_lock:
+            self._build()
+
+    def _build(self) -> None:
+        """ フィルタを作り直す 呼び出し元で_build_lockを取得する
+        読み込み中にadd()されたユーザ名は控えておき、入れ替える直前に新しいフィルタへ反映する
+        """
+
+        with self._lock:
+            self._pending = []
+
+        try:
+            count = User.objects.count()
+            bloom = BloomFilter(max(self.min_capacity, count * self.GROWTH_FACTOR), self.error_rate)
+
+            for username in self._iter_usernames():
+                bloom.add(normalize_username_key(username))
+
+            with self._lock:
+                for key in self._pending:
+                    bloom.add(key)
+
+                self._bloom = bloom
+                self._built_at = time.monotonic()
+
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _iter_usernames(self) -> Iterator[str]:
+        """ m_userのユーザ名を一定件数ずつ読み込む """
+
+        return User.objects.values_list('username', flat=True).iterator(chunk_size=self.CHUNK_SIZE)
+
+    def _rebuild_in_background(self) -> None:
+        """ バックグラウンドのスレッドでフィルタを作り直す 呼び出し元で取得した_build_lockを完了時に解放する """
+
+        try:
+            self._build()
+        except Exception:
+            logger.exception('Failed to rebuild the username filter')
+        finally:
+            # スレッドごとに確立したDBへの接続を閉じる
+            connections.close_all()
+            self._build_lock.release()
+
+    def _get_bloom(self) -> BloomFilter:
+        """ 未構築の場合はフィルタを構築し、作り直す間隔の経過・容量の超過時はバックグラウンドで作り直す """
+
+        if self._bloom is None:
+            # 同時に構築しないよう、他のスレッドの構築完了を待ってから再確認
+            with self._build_lock:
+                if self._bloom is None:
+                    self._build()
+
+        elif self._needs_build() and self._build_lock.acquire(blocking=False):
+            # 取得までの間に他のスレッドが作り直し終えた場合は不要
+            if not self._needs_build():
+                self._build_lock.release()
+                return self._bloom
+
+            # 作り直している間も、リクエストは従来のフィルタで判定する
+            self._rebuild_thread = threading.Thread(target=self._rebuild_in_background, name='username-filter-rebuild', daemon=True)
+            self._rebuild_thread.start()
+
+        return self._bloom
+
+    def _needs_build(self) -> bool:
+        """ 未構築・作り直す間隔の経過・容量の超過のいずれかに該当するか """
+
+        bloom = self._bloom
+
+        return bloom is None or time.monotonic() - self._built_at > self.rebuild_interval or bloom.count > bloom.capacity
+
+    def might_exist(self, username: str) -> bool:
+        """ ユーザ名が登録済みの可能性があるか
+
+        Parameters
+        ----------
+        username: str
+            検査対象のユーザ名
+
+        Returns
+        -------
+        bool
+            True -> 登録済みの可能性がある DBで確認が必要
+            False -> 確実に登録されていない
+        """
+
+        might_exist = normalize_username_key(username) in self._get_bloom()
+
+        with self._lock:
+            self.checks += 1
+            if not might_exist:
+                self.definite_misses += 1
+
+        return might_exist
+
+    def add(self, username: str) -> None:
+        """ 登録したユーザ名をフィルタへ反映 未構築の場合は構築時に読み込まれる """
+
+        key = normalize_username_key(username)
+
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(key)
+
+            # 構築中のフィルタは読み込み済みのユーザ名を含まない場合があるため、入れ替え時に反映
+            if self._pending is not None:
+                self._pending.append(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """ 偽陽性率・メモリ量などの統計情報
+
+        Returns
+        -------
+        stats: Dict[str, Any]
+            capacity, count, memory_bytes, hash_count, false_positive_rate, checks, definite_misses
+        """
+
+        with self._lock:
+            bloom = self._bloom
+
+            return {
+                'capacity': bloom.capacity if bloom else 0,
+                'count': bloom.count if bloom else 0,
+                'memory_bytes': bloom.memory_bytes if bloom else 0,
+                'hash_count': bloom.hash_count if bloom else 0,
+                'false_positive_rate': bloom.false_positive_rate if bloom else 0.0,
+                'checks': self.checks,
+                'definite_misses': self.definite_misses,
+            }
+
+
+_username_filter: Optional[UsernameFilter] = None
+_username_filter_lock = threading.Lock()
+
+
+def get_username_filter() -> Optional[UsernameFilter]:
+    """ 設定値USERNAME_FILTERをもとにユーザ名のフィルタを取得
+
+    Returns
+    -------
+    username_filter: UsernameFilter
+        フィルタが無効化されている場合はNone
+    """
+
+    global _username_filter
+
+    config: Dict[str, Any] = getattr(settings, 'USERNAME_FILTER', {})
+
+    if not config.get('ENABLED', False):
+        return None
+
+    if _username_filter is None:
+        with _username_filter_lock:
+            if _username_filter is None:
+                _username_filter = UsernameFilter(
+                    error_rate=config.get('ERROR_RATE', 0.01),
+                    min_capacity=config.get('MIN_CAPACITY', 100000),
+                    rebuild_interval=config.get('REBUILD_INTERVAL', 3600),
+                )
+
+    return _username_filter
+
+
+def reset_username_filter() -> None:
+    """ 設定変更時などにフィルタを作り直す """
+
+    global _username_filter
+
+    with _username_filter_lock:
+        _username_filter = None
+
+
+def warm_username_filter() -> None:
+    """ プロセスの起動時にフィルタを構築し、最初のユーザ登録でm_userを読み込まないようにする """
+
+    username_filter = get_username_filter()
+
+    if username_filter is not None:
+        username_filter.build()
@@ -1,4 +1,13 @@
 import re
+from typing import Iterable, List, Optional
+
+# ユーザ名の文字長
+USERNAME_MIN_LENGTH = 5
+USERNAME_MAX_LENGTH = 32
+
+# パスワードの文字長
+PASSWORD_MIN_LENGTH = 10
+PASSWORD_MAX_LENGTH = 64
 
 def is_valid_min_length(value: str, length: int) -> bool:
     """ 最小文字数チェック
@@ -61,3 +70,78 @@ def is_valid_alpha_numeric(value: str) -> bool:
 
     return re.search('^[0-9a-zA-Z-_]+$', value) is not None
 
+
+# 検証エラーの種別
+INVALID_CHARSET = 'invalid_charset'
+TOO_SHORT = 'too_short'
+TOO_LONG = 'too_long'
+
+# 半角英数と-_
+ALPHA_NUMERIC_CHARSET = '0-9a-zA-Z_-'
+
+
+class RuleSet:
+    """ 文字種別・文字長の規則を1つの正規表現へまとめたもの
+    規則を満たす値は1回の走査で判定し、満たさない値のみ違反した規則を特定する
+    ユーザ登録画面・ユーザの一括登録で共有する
+
+    Attributes
+    ----------
+    min_length: int
+        許容される最小文字数
+    max_length: int
+        許容される最大文字数
+    """
+
+    def __init__(self, min_length: int, max_length: int, charset: str=ALPHA_NUMERIC_CHARSET):
+        self.min_length = min_length
+        self.max_length = max_length
+        self._valid = re.compile(f'[{charset}]{{{min_length},{max_length}}}')
+        self._charset = re.compile(f'[{charset}]+')
+
+    def check(self, value: str) -> Optional[str]:
+        """ 値を検証
+
+        Parameters
+        ----------
+        value : str
+            検査対象文字列
+
+        Returns
+        -------
+        code: str
+            違反した規則 INVALID_CHARSET -> TOO_SHORT -> TOO_LONGの順に判定
+            規則を満たす場合はNone
+        """
+
+        if self._valid.fullmatch(value) is not None:
+            return None
+
+        if self._charset.fullmatch(value) is None:
+            return INVALID_CHARSET
+
+        return TOO_SHORT if len(value) < self.min_length else TOO_LONG
+
+    def check_many(self, values: Iterable[str]) -> List[Optional[str]]:
+        """ 複数の値をまとめて検証
+
+        Parameters
+        ----------
+        values : Iterable[str]
+            検査対象文字列
+
+        Returns
+        -------
+        codes: List[str]
+            値ごとの違反した規則 規則を満たす値はNone
+        """
+
+        valid = self._valid.fullmatch
+        check = self.check
+
+        return [None if valid(value) is not None else check(value) for value in values]
+
+
+# ユーザ名・パスワードの規則
+USERNAME_RULES = RuleSet(USERNAME_MIN_LENGTH, USERNAME_MAX_LENGTH)
+PASSWORD_RULES = RuleSet(PASSWORD_MIN_LENGTH, PASSWORD_MAX_LENGTH)
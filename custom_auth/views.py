@@ -1,16 +1,37 @@
-from custom_auth.exceptions import LoginFailureException
+from custom_auth.exceptions import HashingPoolSaturatedException, LoginFailureException
 from django.shortcuts import render, redirect
 from django.views import View
 from django.contrib.auth import login, logout
-from django.contrib.auth.hashers import make_password
 from django.conf import settings
-from django.http import HttpRequest, HttpResponse
-
+from django.db import IntegrityError, transaction
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+import logging
+import math
+import mimetypes
+import os
+import posixpath
+from typing import Any, Optional
 from typing import cast
 
-from .forms import LoginForm, SignUpForm
+from .forms import USERNAME_TAKEN_MESSAGE, LoginForm, SignUpForm
 from .backend import AuthBackend
-from .models import User
+from .claims import store_claims
+from .directory import list_users
+from .export import gzip_stream, iter_users_csv
+from .hashing import get_hashing_executor
+from .log import form_error_codes, log_auth_event, posted_username
+from .metrics import get_metrics_registry, phase
+from .page_cache import get_page_cache
+from .storage import is_hashed_name, parse_accept_encoding, select_encoding
+from .throttle import get_login_throttle
+from .validator import USERNAME_MAX_LENGTH
+from .models import User, is_username_conflict
 
 
 class LoginView(View):
@@ -50,6 +71,8 @@ class LoginView(View):
         HttpResponse
             ログイン失敗 -> ログイン画面
             ログイン成功 -> トップ画面
+            ログイン試行回数の上限を超過 -> 429
+            パスワード検証用のワーカープールが飽和 -> 503
 
         Raises
         ------
@@ -57,12 +80,18 @@ class LoginView(View):
             ユーザ名・パスワードがDBに存在するものと合致しなかった場合に送出 ログイン画面へ再遷移
         """
 
+        # 試行回数の制限 パスワード検証・DBへの問い合わせより先に評価
+        retry_after = check_login_throttle(request)
+        if retry_after:
+            return login_throttled_response(request, retry_after)
+
         form = LoginForm(request.POST)
         
         # ユーザ認証
         try:
-            if not form.is_valid():
-                raise LoginFailureException()
+            with phase('form_validation'):
+                if not form.is_valid():
+                    raise LoginFailureException()
             
             user = AuthBackend().authenticate(
                 request, 
@@ -72,14 +101,17 @@ class LoginView(View):
         
         # ログイン失敗
         except LoginFailureException:
+            return login_failure_response(request, form)
 
-            form.add_error(None, 'ユーザ名またはパスワードが間違っています。')
-            context = {'form': form}
-            return render(request, 'login/login.html', context)
+        # 混雑時はハッシュ計算を待たずに応答
+        except HashingPoolSaturatedException:
+            return unavailable_response(request, 'login_unavailable')
 
-        login(request, user, 'custom_auth.backend.AuthBackend')
+        with phase('session_write'):
+            login(request, user, 'custom_auth.backend.AuthBackend')
+            store_claims(request, user)
 
-        return redirect(settings.LOGIN_SUCCESS_URL)
+        return login_success_response(request, user)
 
 
 class SignUpView(View):
@@ -119,27 +151,38 @@ class SignUpView(View):
         HttpResponse
             ユーザ登録失敗 -> ユーザ登録画面
             ユーザ登録成功 -> ログイン画面
+            パスワードハッシュ計算用のワーカープールが飽和 -> 503
         """        
 
         form = SignUpForm(request.POST)
 
+        with phase('form_validation'):
+            is_valid = form.is_valid()
+
         # 登録失敗
-        if not form.is_valid():
+        if not is_valid:
+            return signup_invalid_response(request, form)
+
+        # パスワードのハッシュ化 同時に計算する数を制限するため、ワーカープールで計算
+        try:
+            with phase('hash_password'):
+                password = get_hashing_executor().make_password(form.cleaned_data['password'])
 
-            context = {
-                'form': form
-            }
-            return render(request, 'signup/signup.html', context)
+        except HashingPoolSaturatedException:
+            return unavailable_response(request, 'signup_unavailable')
 
         # ユーザ登録
-        user = User(
-            username=form.cleaned_data['username'],
-            password=make_password(form.cleaned_data['password']),
-            is_admin=False,
-        )
-        user.save()
+        user = build_signup_user(form, password)
 
-        return redirect('login:login')
+        # 登録済みのユーザ名は一意制約違反として検出 同時に同じユーザ名で登録された場合も1件のみ登録される
+        try:
+            with phase('user_insert'):
+                insert_user(user)
+
+        except IntegrityError as error:
+            return signup_duplicate_response(request, form, error)
+
+        return signup_success_response(request, user)
 
 class TopView(View):
     """ トップ画面用View
@@ -157,7 +200,7 @@ class TopView(View):
         -------
         HttpResponse
             未ログイン -> ログイン画面
-            ログイン済み -> トップ画面 権限に応じて出しわけ
+            ログイン済み -> トップ画面 権限に応じて出しわけ 描画済みのページがあればそれを返す
         """        
 
         user = cast(User, request.user)
@@ -167,10 +210,8 @@ class TopView(View):
             return redirect('login:login')
         
         # 管理者か
-        if user.is_admin:
-            return render(request, 'top/top_admin.html')
-
-        return render(request, 'top/top.html')
+        with phase('render'):
+            return render_top_page(request, user)
 
 class LogoutView(View):
     """ ログアウト処理用View
@@ -190,11 +231,511 @@ class LogoutView(View):
             ログイン画面
         """        
 
-        logout(request)
+        with phase('session_write'):
+            logout(request)
 
         return redirect('login:login')
 
 
+class UserExportView(View):
+    """ ユーザ一覧のCSV出力用View 管理者のみ利用できる
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        """ 全ユーザをCSV形式で出力
+        DBから一定の行数ずつ読み込みながら送信するため、ユーザ数によらず使用メモリは一定
+
+        Parameters
+        ----------
+        request : HttpRequest
+            GETリクエスト
+
+        Returns
+        -------
+        HttpResponse
+            未ログイン -> ログイン画面
+            管理者以外 -> 404
+            管理者 -> ユーザ一覧のCSV gzipを受け付ける場合は圧縮して送信
+        """
+
+        user = cast(User, request.user)
+
+        if not user.is_authenticated:
+            return redirect('login:login')
+
+        if not user.is_admin:
+            return handler404(request, Http404())
+
+        content = iter_users_csv()
+        gzipped = accepts_gzip_export(request)
+
+        return export_response(gzip_stream(content) if gzipped else content, gzipped)
+
+
+def login_throttled_response(request: HttpRequest, retry_after: float) -> HttpResponse:
+    """ ログイン試行回数の上限を超えたことを記録し、429レスポンスを返す
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ログインのリクエスト情報
+    retry_after : float
+        再試行までの秒数
+
+    Returns
+    -------
+    HttpResponse
+        429レスポンス
+    """
+
+    log_auth_event('login_throttled', request, logging.WARNING, username=posted_username(request), retry_after=retry_after)
+
+    return too_many_requests(retry_after)
+
+
+def login_failure_response(request: HttpRequest, form: LoginForm) -> HttpResponse:
+    """ ログイン失敗を記録し、エラーメッセージ付きのログイン画面を返す
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ログインのリクエスト情報
+    form : LoginForm
+        入力値を保持したフォーム
+
+    Returns
+    -------
+    HttpResponse
+        ログイン画面
+    """
+
+    log_auth_event('login_failure', request, username=posted_username(request))
+    form.add_error(None, 'ユーザ名またはパスワードが間違っています。')
+    context = {'form': form}
+
+    with phase('render'):
+        return render(request, 'login/login.html', context)
+
+
+def login_success_response(request: HttpRequest, user: User) -> HttpResponse:
+    """ ログイン成功を記録し、トップ画面へ遷移させる
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ログインのリクエスト情報
+    user : User
+        ログインしたユーザ
+
+    Returns
+    -------
+    HttpResponse
+        ログイン後の画面へのリダイレクト
+    """
+
+    log_auth_event('login_success', request, user_id=user.pk, username=user.username)
+
+    return redirect(settings.LOGIN_SUCCESS_URL)
+
+
+def unavailable_response(request: HttpRequest, event: str) -> HttpResponse:
+    """ ハッシュ計算用のワーカープールの飽和を記録し、503レスポンスを返す
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ログイン・ユーザ登録のリクエスト情報
+    event : str
+        記録するイベント名 login_unavailable・signup_unavailable
+
+    Returns
+    -------
+    HttpResponse
+        503レスポンス
+    """
+
+    log_auth_event(event, request, logging.WARNING, username=posted_username(request))
+
+    return service_unavailable()
+
+
+def signup_invalid_response(request: HttpRequest, form: SignUpForm) -> HttpResponse:
+    """ 入力値の不備による登録失敗を記録し、ユーザ登録画面を返す
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ユーザ登録のリクエスト情報
+    form : SignUpForm
+        検証済みのフォーム
+
+    Returns
+    -------
+    HttpResponse
+        ユーザ登録画面
+    """
+
+    log_auth_event('signup_invalid', request, username=posted_username(request), errors=form_error_codes(form))
+    context = {
+        'form': form
+    }
+
+    with phase('render'):
+        return render(request, 'signup/signup.html', context)
+
+
+def build_signup_user(form: SignUpForm, password: str) -> User:
+    """ 登録するユーザを生成
+
+    Parameters
+    ----------
+    form : SignUpForm
+        検証済みのフォーム
+    password : str
+        ハッシュ化済みのパスワード
+
+    Returns
+    -------
+    User
+        未保存のユーザ 管理者権限は持たない
+    """
+
+    return User(
+        username=form.cleaned_data['username'],
+        password=password,
+        is_admin=False,
+    )
+
+
+def signup_duplicate_response(request: HttpRequest, form: SignUpForm, error: IntegrityError) -> HttpResponse:
+    """ ユーザ名の一意制約違反による登録失敗を記録し、ユーザ登録画面を返す
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ユーザ登録のリクエスト情報
+    form : SignUpForm
+        検証済みのフォーム
+    error : IntegrityError
+        登録時に送出された例外
+
+    Returns
+    -------
+    HttpResponse
+        ユーザ登録画面
+
+    Raises
+    ------
+    IntegrityError
+        ユーザ名の一意制約以外の違反の場合は、そのまま送出
+    """
+
+    if not is_username_conflict(error):
+        raise error
+
+    log_auth_event('signup_duplicate', request, username=posted_username(request))
+    form.add_error('username', USERNAME_TAKEN_MESSAGE)
+    context = {
+        'form': form
+    }
+
+    with phase('render'):
+        return render(request, 'signup/signup.html', context)
+
+
+def signup_success_response(request: HttpRequest, user: User) -> HttpResponse:
+    """ ユーザ登録の成功を記録し、ログイン画面へ遷移させる
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ユーザ登録のリクエスト情報
+    user : User
+        登録したユーザ
+
+    Returns
+    -------
+    HttpResponse
+        ログイン画面へのリダイレクト
+    """
+
+    log_auth_event('signup_success', request, user_id=user.pk, username=user.username)
+
+    return redirect('login:login')
+
+
+def insert_user(user: User) -> None:
+    """ ユーザを1回のINSERTで登録
+
+    自動コミットでは失敗したINSERTのみが取り消されるため、トランザクションを開始しない
+    外側のトランザクション内では、一意制約違反でトランザクション全体が無効とならないよう、セーブポイント内で登録
+
+    Parameters
+    ----------
+    user : User
+        登録するユーザ
+
+    Raises
+    ------
+    IntegrityError
+        ユーザ名が登録済みの場合などに送出
+    """
+
+    if transaction.get_connection().in_atomic_block:
+        with transaction.atomic():
+            user.save(force_insert=True)
+        return
+
+    user.save(force_insert=True)
+
+
+def render_top_page(request: HttpRequest, user: User) -> HttpResponse:
+    """ 権限に応じたトップ画面を描画
+    ユーザトップ画面は内容が権限のみで決まるため、ページキャッシュが有効な場合は描画済みのページを返す
+    管理者用トップ画面はユーザ一覧の検索条件・ページにより内容が変わるため、毎回描画する
+
+    Parameters
+    ----------
+    request : HttpRequest
+        トップ画面へのリクエスト 管理者用トップ画面では、クエリパラメータqで検索文字列、cursorでページを指定
+    user : User
+        ログイン済みのユーザ
+
+    Returns
+    -------
+    HttpResponse
+        管理者 -> 管理者用トップ画面 それ以外 -> ユーザトップ画面
+    """
+
+    if user.is_admin:
+        query = request.GET.get('q', '').strip()[:USERNAME_MAX_LENGTH]
+        page = list_users(query, request.GET.get('cursor'))
+        response = render(request, 'top/top_admin.html', {'page': page, 'query': query})
+
+    else:
+        template_name = 'top/top.html'
+        page_cache = get_page_cache()
+        content = page_cache.get(template_name, 'user') if page_cache is not None else None
+
+        if content is not None:
+            response = HttpResponse(content)
+
+        else:
+            response = render(request, template_name)
+
+            if page_cache is not None:
+                page_cache.set(template_name, 'user', response.content)
+
+    # ログイン状態・権限により内容が変わるため、共有キャッシュへ保持させず、ブラウザでもCookieごとに区別させる
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+
+    return response
+
+
+def accepts_gzip_export(request: HttpRequest) -> bool:
+    """ CSV出力をgzipで圧縮して送信するか
+
+    Parameters
+    ----------
+    request : HttpRequest
+        CSV出力のリクエスト
+
+    Returns
+    -------
+    bool
+        圧縮が有効かつクライアントがgzipを受け付ける場合はTrue
+    """
+
+    if not getattr(settings, 'USER_EXPORT', {}).get('GZIP', True):
+        return False
+
+    return 'gzip' in parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+
+def export_response(streaming_content: Any, gzipped: bool) -> StreamingHttpResponse:
+    """ CSV出力用のレスポンスを生成
+
+    Parameters
+    ----------
+    streaming_content : Any
+        CSVを出力するイテレータ 非同期版のViewでは非同期イテレータ
+    gzipped : bool
+        出力がgzipで圧縮されているか
+
+    Returns
+    -------
+    StreamingHttpResponse
+        添付ファイルとしてダウンロードさせるレスポンス
+    """
+
+    response = StreamingHttpResponse(streaming_content, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="users.csv"'
+
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding', 'Cookie'))
+    # 個人情報を含むため、ブラウザ・共有キャッシュのいずれにも保存させない
+    patch_cache_control(response, private=True, no_store=True)
+
+    return response
+
+
+def check_login_throttle(request: HttpRequest, username: Optional[str]=None) -> float:
+    """ ログイン試行回数の制限を評価
+
+    Parameters
+    ----------
+    request : HttpRequest
+        ログインのリクエスト情報
+    username : Optional[str]
+        入力されたユーザ名 Noneの場合はPOSTの値
+
+    Returns
+    -------
+    float
+        許可する場合は0 許可しない場合は再試行までの秒数
+    """
+
+    login_throttle = get_login_throttle()
+
+    if login_throttle is None:
+        return 0.0
+
+    if username is None:
+        username = request.POST.get('username', '')
+
+    return login_throttle.check(request, username)
+
+
+def too_many_requests(retry_after: float) -> HttpResponse:
+    """ ログイン試行回数の上限を超えたときに返す429レスポンス
+    テンプレートの描画・DBへの問い合わせを伴わないよう、固定の文字列を返す
+
+    Parameters
+    ----------
+    retry_after : float
+        再試行までの秒数
+
+    Returns
+    -------
+    HttpResponse
+        429レスポンス
+    """
+
+    response = HttpResponse('ログインの試行回数が上限を超えました。しばらくしてから再度お試しください。', status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(math.ceil(retry_after))
+
+    return response
+
+
+def service_unavailable() -> HttpResponse:
+    """ 混雑時に返す503レスポンス
+    テンプレートの描画・DBへの問い合わせを伴わないよう、固定の文字列を返す
+
+    Returns
+    -------
+    HttpResponse
+        503レスポンス
+    """
+
+    response = HttpResponse('混雑しています。しばらくしてから再度お試しください。', status=503, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = '1'
+
+    return response
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """ 集計したメトリクスをPrometheusのテキスト形式で出力
+
+    Parameters
+    ----------
+    request : HttpRequest
+        メトリクス収集サーバからのリクエスト
+
+    Returns
+    -------
+    HttpResponse
+        計測が無効・許可されていない接続元 -> 404
+        それ以外 -> Prometheusのテキスト形式のメトリクス
+    """
+
+    registry = get_metrics_registry()
+    allowed_ips = getattr(settings, 'METRICS', {}).get('ALLOWED_IPS')
+
+    if registry is None or (allowed_ips is not None and request.META.get('REMOTE_ADDR') not in allowed_ips):
+        return handler404(request, Http404())
+
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ハッシュ値付きの静的ファイルをキャッシュさせる期間(1年)
+STATIC_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def static_file(request: HttpRequest, path: str) -> HttpResponse:
+    """ collectstaticでSTATIC_ROOTへ収集した静的ファイルを配信
+    事前に圧縮したファイルをAccept-Encodingに応じて選択し、ハッシュ値付きのファイルは期限なしでキャッシュさせる
+
+    Parameters
+    ----------
+    request : HttpRequest
+        静的ファイルへのリクエスト
+    path : str
+        STATIC_URLからの相対パス
+
+    Returns
+    -------
+    HttpResponse
+        GET・HEAD以外 -> 405
+        存在しないファイル -> 404
+        If-Modified-Since以降に更新されていないファイル -> 304
+        それ以外 -> 静的ファイル
+    """
+
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+    name = posixpath.normpath(path).lstrip('/')
+
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, name) if settings.STATIC_ROOT else None
+    except SuspiciousFileOperation:
+        full_path = None
+
+    if full_path is None or not os.path.isfile(full_path):
+        raise Http404(path)
+
+    encoding, served_path = select_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), full_path)
+    # Content-Typeは圧縮前のファイルのものを返す
+    content_type, _ = mimetypes.guess_type(name)
+
+    modified_at = os.stat(served_path).st_mtime
+
+    # ヘッダを先に組み立て、再検証で更新されていなければファイルを開かずに304を返す
+    response = HttpResponse(content_type=content_type or 'application/octet-stream')
+    response['Last-Modified'] = http_date(modified_at)
+    if encoding is not None:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    if is_hashed_name(staticfiles_storage, name):
+        patch_cache_control(response, public=True, max_age=STATIC_IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        # ハッシュ値のない名前は内容が変わりうるため、都度再検証させる
+        patch_cache_control(response, public=True, no_cache=True)
+
+    conditional_response = get_conditional_response(request, last_modified=int(modified_at), response=response)
+    if conditional_response is not response:
+        return conditional_response
+
+    file_response = FileResponse(open(served_path, 'rb'))
+    for header, value in response.items():
+        file_response[header] = value
+
+    return file_response
+
+
 def handler404(request: HttpRequest, exception: Exception) -> HttpResponse:
     """ 404ページを表示
 